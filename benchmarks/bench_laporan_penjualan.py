@@ -0,0 +1,92 @@
+"""
+Benchmark DatabaseManager.generate_laporan_penjualan
+
+Menjalankan laporan pada dataset sintetis dengan ukuran berlipat ganda dan
+mencetak waktu per baris. Jika join berjalan linear, kolom "us/baris"
+harus relatif konstan ketika jumlah transaksi naik.
+
+Jalankan dari direktori root:
+    python benchmarks/bench_laporan_penjualan.py
+"""
+import os
+import sys
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.database import CSVHandler, DatabaseManager  # noqa: E402
+
+SIZES = [1000, 2000, 4000, 8000, 16000, 32000]
+REPEAT = 3
+
+
+def generate_dataset(db: DatabaseManager, n_transaksi: int) -> None:
+    """Membuat produk, pesanan dan transaksi sintetis sebanyak n_transaksi"""
+    rng = random.Random(n_transaksi)
+    n_produk = max(50, n_transaksi // 20)
+    start = datetime(2024, 1, 1)
+
+    produk = [
+        {
+            'id_produk': f"PRD{i:08d}",
+            'nama_produk': f"Produk {i}",
+            'kategori': 'Perlengkapan Ibadah',
+            'harga': float(rng.randint(10, 500) * 1000),
+            'stok': rng.randint(0, 100),
+            'created_at': start.isoformat(),
+            'updated_at': start.isoformat()
+        }
+        for i in range(n_produk)
+    ]
+
+    pesanan, transaksi = [], []
+    for i in range(n_transaksi):
+        item = rng.choice(produk)
+        jumlah = rng.randint(1, 5)
+        tanggal = start + timedelta(minutes=i * 10)
+        pesanan.append({
+            'id_pesanan': f"PSN{i:08d}",
+            'id_pelanggan': f"CUST{rng.randint(1, 500):03d}",
+            'id_produk': item['id_produk'],
+            'jumlah_dipesan': jumlah,
+            'total_harga': item['harga'] * jumlah,
+            'status': 'Selesai',
+            'tanggal_pesanan': tanggal.isoformat()
+        })
+        transaksi.append({
+            'id_transaksi': f"TRX{i:08d}",
+            'id_pesanan': f"PSN{i:08d}",
+            'total_harga': item['harga'] * jumlah,
+            'metode_pembayaran': 'Tunai',
+            'tanggal_transaksi': tanggal.isoformat()
+        })
+
+    for file_type, rows in (('produk', produk), ('pesanan', pesanan), ('transaksi', transaksi)):
+        CSVHandler.write_csv(db.file_paths[file_type], rows, db.field_definitions[file_type])
+
+
+def run() -> None:
+    print(f"{'transaksi':>10} {'ms':>10} {'us/baris':>10}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(tmp)
+            generate_dataset(db, size)
+
+            # Laporan pertama sekaligus memanaskan cache tabel dan indeks
+            db.generate_laporan_penjualan(datetime.min, datetime.max)
+
+            best = float('inf')
+            for _ in range(REPEAT):
+                started = time.perf_counter()
+                report = db.generate_laporan_penjualan(datetime.min, datetime.max)
+                best = min(best, time.perf_counter() - started)
+
+            assert report['jumlah_transaksi'] == size
+            print(f"{size:>10} {best * 1000:>10.2f} {best * 1e6 / size:>10.2f}")
+
+
+if __name__ == "__main__":
+    run()
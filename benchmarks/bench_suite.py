@@ -0,0 +1,329 @@
+"""
+Benchmark storage dan controller pada beberapa skala data
+
+Membuat dataset produk/pesanan/transaksi sintetis untuk setiap scale factor
+(jumlah pesanan), lalu mengukur operasi DatabaseManager dan controller yang
+dipakai GUI. Hasil ditulis ke JSON; dengan --baseline hasil dibandingkan dengan
+run sebelumnya dan script keluar dengan kode 1 jika ada operasi yang melambat
+melebihi --threshold.
+
+Distribusi data dibuat mendekati toko sungguhan:
+- popularitas produk mengikuti distribusi Zipf (sedikit produk sangat laris)
+- jumlah per pesanan kebanyakan 1-2 item
+- status pesanan 75% Selesai, 15% Pending, 10% Dibatalkan
+- pesanan tersebar 2 tahun terakhir, makin baru makin padat, pada jam buka toko
+- sebagian kecil produk stoknya menipis
+
+Jalankan dari direktori root:
+    python benchmarks/bench_suite.py --scale 1000 10000 100000 --output hasil.json
+    python benchmarks/bench_suite.py --scale 1000 10000 --baseline hasil.json
+    python benchmarks/bench_suite.py --compare hasil_baru.json hasil.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.database import CSVHandler, DB_BACKEND_ENV, create_database_manager  # noqa: E402
+from utils.schema import TABLE_SCHEMAS  # noqa: E402
+from controllers.pesanan_controller import PesananController  # noqa: E402
+from controllers.produk_controller import ProdukController  # noqa: E402
+
+DEFAULT_SCALES = [1000, 10000, 100000]
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.2
+
+KATEGORI = ['Pakaian Muslim Pria', 'Pakaian Muslim Wanita', 'Perlengkapan Ibadah', 'Aksesoris']
+METODE_PEMBAYARAN = ['Tunai', 'Tunai', 'Tunai', 'Transfer', 'QRIS']
+STATUS_WEIGHTS = [('Selesai', 0.75), ('Pending', 0.15), ('Dibatalkan', 0.10)]
+RIWAYAT_HARI = 730
+
+
+class Dataset:
+    """ID hasil generate yang dipakai operasi benchmark"""
+
+    def __init__(self):
+        self.produk: List[str] = []
+        self.pesanan: List[str] = []
+        self.pending: List[str] = []
+        self.dibatalkan: List[str] = []
+
+
+def generate_dataset(base_path: str, n_pesanan: int, seed: int = 0) -> Dataset:
+    """Menulis produk, pesanan dan transaksi sintetis untuk n_pesanan pesanan"""
+    rng = random.Random(seed + n_pesanan)
+    n_produk = max(50, n_pesanan // 20)
+    now = datetime.now().replace(microsecond=0)
+    start = now - timedelta(days=RIWAYAT_HARI)
+    dataset = Dataset()
+
+    produk = []
+    for i in range(n_produk):
+        # Harga log-normal sekitar Rp 75.000, dibulatkan ke ribuan
+        harga = float(max(5, round(rng.lognormvariate(4.3, 0.7))) * 1000)
+        # Sekitar 10% produk stoknya menipis
+        stok = rng.randint(0, 9) if rng.random() < 0.1 else rng.randint(10, 200)
+        produk.append({
+            'id_produk': f"PRD{i:08d}",
+            'nama_produk': f"Produk {i}",
+            'kategori': rng.choice(KATEGORI),
+            'harga': harga,
+            'stok': stok,
+            'created_at': start.isoformat(),
+            'updated_at': start.isoformat()
+        })
+    dataset.produk = [item['id_produk'] for item in produk]
+
+    # Popularitas Zipf: produk ke-i dipilih dengan bobot 1 / (i + 1)
+    popular = rng.choices(produk, cum_weights=_cumulative([1 / (i + 1) for i in range(n_produk)]), k=n_pesanan)
+    statuses = rng.choices(
+        [status for status, _ in STATUS_WEIGHTS],
+        weights=[weight for _, weight in STATUS_WEIGHTS],
+        k=n_pesanan
+    )
+
+    # Hari dalam riwayat, makin baru makin padat; diurutkan seperti urutan input
+    offsets = sorted(RIWAYAT_HARI * rng.random() ** 0.7 for _ in range(n_pesanan))
+
+    pesanan, transaksi = [], []
+    for i in range(n_pesanan):
+        item = popular[i]
+        status = statuses[i]
+        jumlah = min(10, int(rng.expovariate(1.2)) + 1)
+        tanggal = (start + timedelta(days=int(offsets[i]))).replace(
+            hour=rng.randint(8, 20), minute=rng.randint(0, 59), second=rng.randint(0, 59)
+        )
+        id_pesanan = f"PSN{i:08d}"
+        total = item['harga'] * jumlah
+        pesanan.append({
+            'id_pesanan': id_pesanan,
+            'id_pelanggan': f"CUST{int(rng.paretovariate(1.5)) % 5000:04d}",
+            'id_produk': item['id_produk'],
+            'jumlah_dipesan': jumlah,
+            'total_harga': total,
+            'status': status,
+            'tanggal_pesanan': tanggal.isoformat()
+        })
+        dataset.pesanan.append(id_pesanan)
+
+        if status == 'Selesai':
+            transaksi.append({
+                'id_transaksi': f"TRX{i:08d}",
+                'id_pesanan': id_pesanan,
+                'total_harga': total,
+                'metode_pembayaran': rng.choice(METODE_PEMBAYARAN),
+                'tanggal_transaksi': (tanggal + timedelta(minutes=rng.randint(1, 120))).isoformat()
+            })
+        elif status == 'Pending':
+            dataset.pending.append(id_pesanan)
+        else:
+            dataset.dibatalkan.append(id_pesanan)
+
+    for file_type, rows in (('produk', produk), ('pesanan', pesanan), ('transaksi', transaksi)):
+        CSVHandler.write_csv(
+            os.path.join(base_path, f"{file_type}.csv"),
+            rows,
+            TABLE_SCHEMAS[file_type].fieldnames,
+            durable=True
+        )
+
+    rng.shuffle(dataset.pending)
+    return dataset
+
+
+def _cumulative(weights: List[float]) -> List[float]:
+    """Bobot kumulatif untuk random.choices"""
+    total, result = 0.0, []
+    for weight in weights:
+        total += weight
+        result.append(total)
+    return result
+
+
+def build_operations(db, dataset: Dataset, seed: int) -> List[Tuple[str, int, Callable[[], None]]]:
+    """Daftar (nama, jumlah panggilan per sampel, fungsi satu panggilan)"""
+    rng = random.Random(seed)
+    produk_controller = ProdukController(db=db)
+    pesanan_controller = PesananController(db=db)
+    now = datetime.now()
+    pending = iter(dataset.pending)
+    counter = iter(range(10 ** 9))
+
+    def buat_pesanan():
+        produk = produk_controller.get_produk(rng.choice(dataset.produk))
+        pesanan_controller.buat_pesanan({
+            'id_pesanan': f"BENCH{next(counter):08d}",
+            'id_pelanggan': 'CUST0001',
+            'id_produk': produk.id_produk,
+            'jumlah_dipesan': 1
+        }, produk)
+
+    return [
+        ('get_all_produk', 1, lambda: db.get_all_produk()),
+        ('get_all_pesanan', 1, lambda: db.get_all_pesanan()),
+        ('get_all_transaksi', 1, lambda: db.get_all_transaksi()),
+        ('get_produk', 200, lambda: db.get_produk(rng.choice(dataset.produk))),
+        ('update_produk', 20, lambda: db.update_produk(
+            rng.choice(dataset.produk), {'harga': float(rng.randint(10, 500) * 1000)}
+        )),
+        ('update_pesanan_status', 20, lambda: db.update_pesanan_status(
+            rng.choice(dataset.dibatalkan), 'Dibatalkan'
+        )),
+        ('generate_laporan_penjualan', 1, lambda: db.generate_laporan_penjualan(
+            now - timedelta(days=30), now
+        )),
+        ('get_produk_terlaris', 1, lambda: db.get_produk_terlaris()),
+        ('get_stok_menipis', 1, lambda: db.get_stok_menipis()),
+        ('PesananController.buat_pesanan', 10, buat_pesanan),
+        ('PesananController.mark_as_done', 5, lambda: pesanan_controller.mark_as_done(next(pending))),
+        ('PesananController.cancel_pesanan', 5, lambda: pesanan_controller.cancel_pesanan(next(pending))),
+        ('ProdukController.update_stok', 20, lambda: produk_controller.update_stok(
+            rng.choice(dataset.produk), 1
+        )),
+    ]
+
+
+def measure(call: Callable[[], None], calls: int, repeat: int) -> Dict[str, float]:
+    """Waktu per panggilan (ms) dari `repeat` sampel setelah satu pemanasan"""
+    samples = []
+    # Pesan print dari controller tidak ikut diukur dan tidak memenuhi output
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        call()
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(calls):
+                call()
+            samples.append((time.perf_counter() - started) * 1000 / calls)
+    return {
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'max_ms': max(samples),
+        'calls': calls,
+        'repeat': repeat
+    }
+
+
+def run_scale(scale: int, repeat: int, backend: str, seed: int) -> Dict[str, Dict[str, float]]:
+    """Menjalankan semua operasi pada satu scale factor di direktori sementara"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        dataset = generate_dataset(tmp, scale, seed)
+        print(f"  dataset {scale} pesanan dibuat dalam {time.perf_counter() - started:.1f}s")
+
+        if backend == 'sqlite':
+            from utils.sqlite_database import migrate_csv_to_sqlite
+            migrate_csv_to_sqlite(tmp)
+
+        # Pemanasan dan mutasi memakai pesanan Pending yang berbeda-beda
+        needed = 2 * 5 * (repeat + 1)
+        if len(dataset.pending) < needed or not dataset.dibatalkan:
+            raise ValueError(f"Scale {scale} terlalu kecil untuk repeat={repeat}")
+
+        db = create_database_manager(tmp)
+        try:
+            # Muat tabel dari disk sebelum cache terisi
+            started = time.perf_counter()
+            db.get_all_pesanan()
+            results['muat_pesanan_dingin'] = {
+                'median_ms': (time.perf_counter() - started) * 1000,
+                'calls': 1,
+                'repeat': 1
+            }
+
+            for name, calls, call in build_operations(db, dataset, seed):
+                results[name] = measure(call, calls, repeat)
+                print(f"  {name:<36} {results[name]['median_ms']:>12.3f} ms")
+        finally:
+            CSVHandler.flush()
+            if hasattr(db, 'close'):
+                db.close()
+    return results
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Tuple[str, str, float, float, float]]:
+    """Membandingkan median per (scale, operasi); mengembalikan daftar yang melambat"""
+    regressions = []
+    print(f"\n{'scale':>8} {'operasi':<36} {'baseline':>12} {'sekarang':>12} {'ubah':>8}")
+    for scale, operations in current['results'].items():
+        base_operations = baseline.get('results', {}).get(scale)
+        if base_operations is None:
+            continue
+        for name, result in operations.items():
+            base = base_operations.get(name)
+            if base is None or base['median_ms'] <= 0:
+                continue
+            change = result['median_ms'] / base['median_ms'] - 1
+            flag = ' <-- lambat' if change > threshold else ''
+            print(f"{scale:>8} {name:<36} {base['median_ms']:>12.3f} {result['median_ms']:>12.3f} "
+                  f"{change * 100:>7.1f}%{flag}")
+            if change > threshold:
+                regressions.append((scale, name, base['median_ms'], result['median_ms'], change))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark HalalHub pada beberapa skala data")
+    parser.add_argument('--scale', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help="jumlah pesanan per dataset (1000 s.d. 1000000)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="jumlah sampel per operasi")
+    parser.add_argument('--backend', choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="file JSON untuk menyimpan hasil")
+    parser.add_argument('--baseline', help="file JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="batas perlambatan relatif sebelum dianggap regresi (0.2 = 20%%)")
+    parser.add_argument('--compare', nargs=2, metavar=('HASIL', 'BASELINE'),
+                        help="hanya membandingkan dua file hasil tanpa menjalankan benchmark")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], encoding='utf-8') as file:
+            current = json.load(file)
+        with open(args.compare[1], encoding='utf-8') as file:
+            baseline = json.load(file)
+        return 1 if compare(current, baseline, args.threshold) else 0
+
+    os.environ[DB_BACKEND_ENV] = args.backend
+    current = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'backend': args.backend,
+            'repeat': args.repeat,
+            'seed': args.seed
+        },
+        'results': {}
+    }
+    for scale in args.scale:
+        print(f"Scale {scale}:")
+        current['results'][str(scale)] = run_scale(scale, args.repeat, args.backend, args.seed)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(current, file, indent=2)
+        print(f"\nHasil disimpan ke {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} operasi melambat lebih dari {args.threshold * 100:.0f}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
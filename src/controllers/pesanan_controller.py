@@ -2,36 +2,57 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from models.pesanan import Pesanan
 from models.produk import Produk
-from utils.database import DatabaseManager
+from utils.database import get_database_manager
+from utils.metrics import instrumented
+from utils.stock_ledger import ALASAN_PEMBATALAN, ALASAN_PESANAN, ALASAN_UBAH_PESANAN
 
+@instrumented
 class PesananController:
     """Controller untuk manajemen pesanan"""
    
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None):
+        # DatabaseManager bersama per direktori data, kecuali diberikan secara eksplisit
+        self.db = db or get_database_manager()
         self.daftar_pesanan = []
         self._load_pesanan()
    
     def _load_pesanan(self):
         """Load pesanan dari database"""
         try:
-            pesanan_data = self.db.get_all_pesanan()
-            self.daftar_pesanan = []
-            for data in pesanan_data:
-                pesanan = Pesanan(
-                    id_pesanan=data['id_pesanan'],
-                    id_pelanggan=data['id_pelanggan'],
-                    id_produk=data['id_produk'],
-                    jumlah_dipesan=int(data['jumlah_dipesan']),
-                    total_harga=float(data['total_harga']),
-                    status=data['status'],
-                    tanggal_pesanan=data['tanggal_pesanan']
-                )
-                self.daftar_pesanan.append(pesanan)
+            # Jumlah, harga dan tanggal sudah di-decode sekali saat tabel dimuat
+            pesanan_data = self.db.get_all_pesanan_typed()
+            self.daftar_pesanan = [self._typed_to_pesanan(data) for data in pesanan_data]
         except Exception as e:
             print(f"Error loading pesanan: {str(e)}")
             self.daftar_pesanan = []
 
+    @staticmethod
+    def _to_pesanan(data: Dict) -> Pesanan:
+        """Mengubah baris database menjadi objek Pesanan"""
+        return Pesanan(
+            id_pesanan=data['id_pesanan'],
+            id_pelanggan=data['id_pelanggan'],
+            id_produk=data['id_produk'],
+            jumlah_dipesan=int(data['jumlah_dipesan']),
+            total_harga=float(data['total_harga']),
+            status=data['status'],
+            tanggal_pesanan=data['tanggal_pesanan']
+        )
+
+    @staticmethod
+    def _typed_to_pesanan(data: Dict) -> Pesanan:
+        """Mengubah baris bertipe menjadi objek Pesanan (tanggal tetap disimpan sebagai string)"""
+        tanggal = data['tanggal_pesanan']
+        return Pesanan(
+            id_pesanan=data['id_pesanan'],
+            id_pelanggan=data['id_pelanggan'],
+            id_produk=data['id_produk'],
+            jumlah_dipesan=data['jumlah_dipesan'],
+            total_harga=data['total_harga'],
+            status=data['status'],
+            tanggal_pesanan=tanggal.isoformat() if tanggal else ''
+        )
+
     def buat_pesanan(self, data_pesanan: Dict, produk: Produk) -> Optional[Pesanan]:
         """Membuat pesanan baru dengan validasi stok"""
         try:
@@ -53,15 +74,18 @@ class PesananController:
                 'tanggal_pesanan': datetime.now().isoformat()
             }
     
-            # Simpan ke database
-            if self.db.add_pesanan(pesanan_data):
-                # Update stok produk
-                stok_baru = current_stok - jumlah_pesan
-                if self.db.update_produk(produk.id_produk, {'stok': stok_baru}):
-                    pesanan = Pesanan(**pesanan_data)
-                    self.daftar_pesanan.append(pesanan)
-                    print(f"Pesanan berhasil dibuat: {pesanan.id_pesanan}")
-                    return pesanan
+            # Simpan pesanan dan mutasi stok dalam satu transaksi; saldo dicek ulang di buku besar
+            with self.db.transaction() as uow:
+                if not (self.db.add_pesanan(pesanan_data)
+                        and self.db.add_mutasi_stok(produk.id_produk, -jumlah_pesan,
+                                                    ALASAN_PESANAN, pesanan_data['id_pesanan'])):
+                    uow.rollback()
+
+            if uow.committed:
+                pesanan = Pesanan(**pesanan_data)
+                self.daftar_pesanan.append(pesanan)
+                print(f"Pesanan berhasil dibuat: {pesanan.id_pesanan}")
+                return pesanan
                     
             return None
     
@@ -71,14 +95,53 @@ class PesananController:
         
     def lihat_daftar_pesanan(self, filter_status: Optional[str] = None) -> List[Pesanan]:
         """Melihat daftar pesanan dengan optional filter status"""
+        if filter_status:
+            # Indeks status: hanya pesanan dengan status tersebut yang dibaca
+            return [
+                self._typed_to_pesanan(data)
+                for data in self.db.get_pesanan_by_status(filter_status, typed=True)
+            ]
         self._load_pesanan()  # Refresh data from database
-        if not filter_status:
-            return self.daftar_pesanan
-        return [p for p in self.daftar_pesanan if p.status == filter_status]
+        return self.daftar_pesanan
+
+    def lihat_daftar_pesanan_typed(self, filter_status: Optional[str] = None) -> List[Dict]:
+        """Baris pesanan bertipe (tanggal sudah datetime) untuk tabel, dengan optional filter status"""
+        if filter_status:
+            # Indeks status: hanya pesanan dengan status tersebut yang dibaca
+            return self.db.get_pesanan_by_status(filter_status, typed=True)
+        return self.db.get_all_pesanan_typed()
+
+    def get_nama_produk(self) -> Dict[str, str]:
+        """id_produk -> nama produk, untuk menampilkan nama produk di daftar pesanan"""
+        return {p['id_produk']: p['nama_produk'] for p in self.db.get_all_produk()}
+
+    def lihat_pesanan_produk(self, id_produk: str) -> List[Pesanan]:
+        """Melihat semua pesanan untuk satu produk"""
+        return [
+            self._typed_to_pesanan(data)
+            for data in self.db.get_pesanan_by_produk(id_produk, typed=True)
+        ]
+
+    def jumlah_pesanan_pending(self) -> int:
+        """Jumlah pesanan yang masih Pending"""
+        return self.db.count_pesanan_by_status('Pending')
         
     def get_pesanan(self, id_pesanan: str) -> Optional[Pesanan]:
         """Mendapatkan detail pesanan berdasarkan ID"""
-        return next((p for p in self.daftar_pesanan if p.id_pesanan == id_pesanan), None)
+        data = self.db.get_pesanan_by_id(id_pesanan)
+        return self._to_pesanan(data) if data else None
+        
+    def get_riwayat_status(self, id_pesanan: str) -> List[Dict]:
+        """Riwayat perubahan status satu pesanan, terlama lebih dulu"""
+        return self.db.get_riwayat_status(id_pesanan)
+
+    def waktu_penyelesaian(self, start_date: datetime, end_date: datetime) -> List[Dict]:
+        """Rata-rata waktu dari Pending sampai Selesai per hari"""
+        return self.db.get_waktu_penyelesaian(start_date, end_date)
+
+    def tingkat_pembatalan(self, limit: Optional[int] = None) -> List[Dict]:
+        """Tingkat pembatalan pesanan per produk, tertinggi lebih dulu"""
+        return self.db.get_tingkat_pembatalan(limit)
         
     def cancel_pesanan(self, id_pesanan: str) -> bool:
         """Membatalkan pesanan dan mengembalikan stok"""
@@ -86,18 +149,16 @@ class PesananController:
         if not pesanan or pesanan.status == "Selesai":
             return False
             
-        # Update status pesanan di database
-        if self.db.update_pesanan_status(id_pesanan, "Dibatalkan"):
-            # Kembalikan stok
-            produk = next(
-                (p for p in self.db.get_all_produk() if p['id_produk'] == pesanan.id_produk),
-                None
-            )
-            if produk:
-                self.db.update_produk(
-                    pesanan.id_produk,
-                    {'stok': int(produk['stok']) + pesanan.jumlah_dipesan}
-                )
+        # Update status pesanan dan kembalikan stok dalam satu transaksi
+        with self.db.transaction() as uow:
+            if not self.db.update_pesanan_status(id_pesanan, "Dibatalkan"):
+                uow.rollback()
+            elif self.db.get_produk_by_id(pesanan.id_produk) and not self.db.add_mutasi_stok(
+                pesanan.id_produk, pesanan.jumlah_dipesan, ALASAN_PEMBATALAN, id_pesanan
+            ):
+                uow.rollback()
+
+        if uow.committed:
             self._load_pesanan()  # Reload daftar pesanan
             return True
         return False
@@ -114,33 +175,33 @@ class PesananController:
         if pesanan.status == "Selesai":
             return False, "Pesanan sudah selesai"
 
-        # Update status pesanan ke Selesai
-        if self.db.update_pesanan_status(id_pesanan, "Selesai"):
-            try:
-                # Buat data transaksi baru
-                transaksi_data = {
-                    'id_transaksi': f"TRX{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                    'id_pesanan': id_pesanan,
-                    'total_harga': pesanan.total_harga,
-                    'metode_pembayaran': 'Tunai',  # Default ke Tunai untuk saat ini
-                    'tanggal_transaksi': datetime.now().isoformat()
-                }
-
-                # Simpan transaksi ke database
-                if self.db.add_transaksi(transaksi_data):
-                    self._load_pesanan()  # Reload daftar pesanan
-                    return True, "Pesanan berhasil diselesaikan"
-                else:
-                    # Rollback status pesanan jika gagal membuat transaksi
-                    self.db.update_pesanan_status(id_pesanan, "Pending")
+        try:
+            # Buat data transaksi baru
+            transaksi_data = {
+                'id_transaksi': self.db.new_id('TRX'),
+                'id_pesanan': id_pesanan,
+                'total_harga': pesanan.total_harga,
+                'metode_pembayaran': 'Tunai',  # Default ke Tunai untuk saat ini
+                'tanggal_transaksi': datetime.now().isoformat()
+            }
+
+            # Status Selesai dan transaksi baru ditulis bersama, atau tidak sama sekali
+            with self.db.transaction() as uow:
+                if not self.db.update_pesanan_status(id_pesanan, "Selesai"):
+                    uow.rollback()
+                    return False, "Gagal menyelesaikan pesanan"
+                if not self.db.add_transaksi(transaksi_data):
+                    uow.rollback()
                     return False, "Gagal membuat transaksi"
 
-            except Exception as e:
-                # Rollback status pesanan jika terjadi error
-                self.db.update_pesanan_status(id_pesanan, "Pending")
-                return False, f"Error saat membuat transaksi: {str(e)}"
+            if not uow.committed:
+                return False, "Gagal menyimpan transaksi"
 
-        return False, "Gagal menyelesaikan pesanan"
+            self._load_pesanan()  # Reload daftar pesanan
+            return True, "Pesanan berhasil diselesaikan"
+
+        except Exception as e:
+            return False, f"Error saat membuat transaksi: {str(e)}"
 
     def update_pesanan(self, data_pesanan: Dict) -> Tuple[bool, str]:
         """Memperbarui data pesanan yang sudah ada"""
@@ -151,22 +212,18 @@ class PesananController:
                 return False, "Pesanan tidak ditemukan"
 
             # Get product info
-            product = next(
-                (p for p in self.db.get_all_produk() 
-                 if p['id_produk'] == data_pesanan['id_produk']),
-                None
-            )
+            product = self.db.get_produk_by_id(data_pesanan['id_produk'])
             if not product:
                 return False, "Produk tidak ditemukan"
 
-            # Calculate stock changes
+            # Calculate stock changes: jumlah lama dikembalikan ke produk lama, jumlah baru diambil dari produk baru
             old_qty = old_pesanan.jumlah_dipesan
             new_qty = int(data_pesanan['jumlah_dipesan'])
-            stock_change = old_qty - new_qty
+            stock_changes = {product['id_produk']: -new_qty}
+            stock_changes[old_pesanan.id_produk] = stock_changes.get(old_pesanan.id_produk, 0) + old_qty
 
             # Validate new stock
-            current_stock = int(product['stok'])
-            if current_stock + stock_change < 0:
+            if self.db.get_stok(product['id_produk']) + stock_changes[product['id_produk']] < 0:
                 return False, "Stok tidak mencukupi"
 
             # Prepare update data
@@ -180,11 +237,16 @@ class PesananController:
                 'tanggal_pesanan': datetime.now().isoformat()
             }
 
-            # Update order in database
-            if self.db.update_pesanan(update_data):
-                # Update product stock
-                new_stock = current_stock + stock_change
-                self.db.update_produk(product['id_produk'], {'stok': new_stock})
+            # Update order and stock movements in one transaction
+            with self.db.transaction() as uow:
+                if not (self.db.update_pesanan(update_data) and all(
+                    self.db.add_mutasi_stok(id_produk, delta, ALASAN_UBAH_PESANAN, update_data['id_pesanan'])
+                    for id_produk, delta in stock_changes.items()
+                    if delta and self.db.get_produk_by_id(id_produk)
+                )):
+                    uow.rollback()
+
+            if uow.committed:
                 self._load_pesanan()  # Reload orders
                 return True, "Pesanan berhasil diperbarui"
 
@@ -1,14 +1,74 @@
+import csv
+import math
+import time
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from models.produk import Produk
-from utils.database import DatabaseManager
+from utils.database import get_database_manager
+from utils.metrics import instrumented
+from utils.stock_ledger import ALASAN_PENYESUAIAN
 
+# Periode penjualan terakhir untuk kecepatan penjualan di peringkat pencarian (hari)
+VELOCITY_DAYS = 30
+# Kecepatan penjualan dihitung ulang paling cepat setiap VELOCITY_TTL detik
+VELOCITY_TTL = 60
+# Bobot kecepatan penjualan terhadap skor kecocokan (0..1)
+VELOCITY_WEIGHT = 0.15
+
+@instrumented
 class ProdukController:
-    def __init__(self, db_path=None):
-        self.db = DatabaseManager(db_path)
+    def __init__(self, db_path=None, db=None):
+        # DatabaseManager bersama per direktori data, kecuali diberikan secara eksplisit
+        self.db = db or get_database_manager(db_path)
+        # (waktu hitung, id_produk -> bobot kecepatan penjualan)
+        self._velocity = None
 
     def get_all_produk(self) -> List[Dict]:
         """Mengambil semua data produk"""
         return self.db.get_all_produk()
+
+    def get_all_produk_typed(self) -> List[Dict]:
+        """Mengambil semua data produk dengan harga dan stok sudah bertipe"""
+        return self.db.get_all_produk_typed()
+
+    def cari_produk(self, keyword: str, kategori: Optional[str] = None) -> List[Dict]:
+        """
+        Mencari produk bertipe berdasarkan awalan kata di nama atau kategori,
+        opsional dibatasi satu kategori
+        """
+        return self.db.search_produk(keyword, kategori, typed=True)
+
+    def cari_produk_ranking(self, keyword: str, kategori: Optional[str] = None,
+                            limit: Optional[int] = 20) -> List[Dict]:
+        """
+        Mencari produk bertipe dengan toleransi salah ketik ("kokoh" menemukan
+        "Koko"), diurutkan berdasarkan kecocokan lalu kecepatan penjualan.
+        Keyword kosong mengembalikan produk terlaris lebih dulu.
+        """
+        return self.db.search_produk_ranked(
+            keyword, kategori, limit, self._kecepatan_penjualan(), typed=True
+        )
+
+    def _kecepatan_penjualan(self) -> Dict[str, float]:
+        """Unit terjual per produk dalam VELOCITY_DAYS terakhir, diskalakan log ke 0..VELOCITY_WEIGHT"""
+        now = time.monotonic()
+        if self._velocity is not None and now - self._velocity[0] < VELOCITY_TTL:
+            return self._velocity[1]
+
+        end_date = datetime.now()
+        units: Dict[str, int] = {}
+        for hari in self.db.get_penjualan_harian(end_date - timedelta(days=VELOCITY_DAYS), end_date):
+            for id_produk, unit in hari['unit_produk'].items():
+                units[id_produk] = units.get(id_produk, 0) + unit
+
+        top = max(units.values(), default=0)
+        popularity = {
+            id_produk: VELOCITY_WEIGHT * math.log1p(unit) / math.log1p(top)
+            for id_produk, unit in units.items()
+            if unit > 0
+        } if top > 0 else {}
+        self._velocity = (now, popularity)
+        return popularity
         
     def get_produk(self, id_produk: str) -> Optional[Produk]:
         """Mengambil detail satu produk"""
@@ -27,6 +87,28 @@ class ProdukController:
             data_produk['deskripsi'] = ""
         return self.db.add_produk(data_produk)
         
+    def import_csv(self, path: str) -> int:
+        """
+        Mengimpor katalog produk dari file CSV dengan kolom nama_produk, kategori,
+        harga, stok (id_produk opsional). Semua baris ditulis dalam satu penulisan;
+        jika ada baris yang tidak valid tidak ada yang diimpor. Mengembalikan
+        jumlah produk yang diimpor.
+        """
+        try:
+            # utf-8-sig agar BOM dari file hasil ekspor Excel ikut terbaca
+            with open(path, mode='r', newline='', encoding='utf-8-sig') as file:
+                rows = [
+                    {field: (value or '').strip() for field, value in row.items() if field}
+                    for row in csv.DictReader(file)
+                ]
+        except (OSError, csv.Error) as e:
+            print(f"Error reading import file: {str(e)}")
+            return 0
+
+        if not self.db.add_produk_many(rows):
+            return 0
+        return len(rows)
+        
     def update_produk(self, id_produk: str, data_produk: Dict) -> bool:
         """Memperbarui data produk"""
         if 'deskripsi' not in data_produk:
@@ -46,19 +128,19 @@ class ProdukController:
         if not produk:
             return False
             
-        stok_baru = produk.stok + jumlah_perubahan
-        if stok_baru < 0:
-            return False
-            
-        # Update stok
-        success = self.update_produk(id_produk, {'stok': stok_baru})
+        # Dicatat sebagai mutasi di buku besar; gagal jika stok menjadi negatif
+        success = self.db.add_mutasi_stok(id_produk, jumlah_perubahan, ALASAN_PENYESUAIAN)
         
         # Cek notifikasi stok jika berhasil update
         if success and hasattr(self, 'notification'):
             self.notification.check_stock_notification({
                 'id_produk': id_produk,
                 'nama_produk': produk.nama_produk,
-                'stok': stok_baru
+                'stok': self.db.get_stok(id_produk)
             })
             
-        return success
\ No newline at end of file
+        return success
+        
+    def get_riwayat_stok(self, id_produk: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Riwayat mutasi stok (terbaru lebih dulu) untuk satu produk atau semua produk"""
+        return self.db.get_riwayat_stok(id_produk, limit)
\ No newline at end of file
@@ -1,4 +1,5 @@
 """
 Package initialization for utils
 """
-from .database import DatabaseManager, CSVHandler
\ No newline at end of file
+from .database import DatabaseManager, CSVHandler, TableCache, create_database_manager, get_database_manager
+from .metrics import dump_metrics, enable_metrics, disable_metrics
@@ -1,60 +1,934 @@
+import atexit
+import bisect
 import csv
+import gc
+import itertools
 import os
-from typing import List, Dict, Optional
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Dict, Optional, Set, Tuple
 from datetime import datetime
-import pandas as pd
+from .id_allocator import get_id_allocator
+from .metrics import instrumented, is_recording, record_io
+from .rollup import ROLLUP_FILENAME, ROLLUP_TABLES, DailySalesRollup
+from .schema import PARSERS, TABLE_SCHEMAS, TableSchema
+from .search_index import SearchIndex
+from .snapshot import atomic_write, load_snapshot, save_snapshot
+from .status_history import (
+    STATS_FILENAME, STATUS_HISTORY_TABLE, STATUS_PENDING, STATUS_SELESAI, OrderStatusStats
+)
+from .stock_ledger import (
+    ALASAN_KOREKSI, ALASAN_SALDO_AWAL, BALANCES_FILENAME, STOCK_LEDGER_TABLE, StockBalances
+)
 
 DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
 
+# Backend storage yang dipakai: 'csv' (default) atau 'sqlite'
+DB_BACKEND_ENV = 'HALALHUB_DB_BACKEND'
+
+# Kolom produk yang diindeks untuk pencarian teks
+PRODUK_SEARCH_FIELDS = ('nama_produk', 'kategori')
+
+class DateIndex:
+    """Indeks terurut tanggal -> baris untuk range query dengan bisect"""
+
+    def __init__(self, entries: List[Tuple[Optional[datetime], Dict]]):
+        # sorted() stabil, baris dengan tanggal sama tetap sesuai urutan file
+        entries = sorted((e for e in entries if e[0] is not None), key=lambda e: e[0])
+        self.keys = [key for key, _ in entries]
+        self.rows = [row for _, row in entries]
+
+    def add(self, key: Optional[datetime], row: Dict) -> None:
+        """Menambahkan baris; baris baru hampir selalu yang terbaru sehingga cukup append"""
+        if key is None:
+            return
+        if not self.keys or key >= self.keys[-1]:
+            self.keys.append(key)
+            self.rows.append(row)
+        else:
+            position = bisect.bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.rows.insert(position, row)
+
+    def remove(self, key: Optional[datetime], row: Dict) -> None:
+        """Menghapus satu baris dengan tanggal tertentu"""
+        if key is None:
+            return
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_right(self.keys, key)
+        for position in range(start, end):
+            if self.rows[position] is row:
+                del self.keys[position]
+                del self.rows[position]
+                return
+
+    def range(self, start: datetime, end: datetime) -> List[Dict]:
+        """Mengambil baris dengan start <= tanggal <= end, urut berdasarkan tanggal"""
+        low = bisect.bisect_left(self.keys, start)
+        high = bisect.bisect_right(self.keys, end)
+        return self.rows[low:high]
+
+
+class CachedTable:
+    """Isi satu tabel CSV di memori beserta indeks hash per kolom kunci"""
+
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        self._indexes: Dict[str, Dict[str, Dict]] = {}
+        # Jumlah entri change log yang sudah digabung ke tabel ini
+        self.log_entries = 0
+        # Baris bertipe hasil decode schema (id baris -> baris bertipe), dibangun sekali per load
+        self._schema: Optional[TableSchema] = None
+        self._typed: Optional[Dict[int, Dict]] = None
+        self._decode_errors: Dict[int, List[str]] = {}
+        # Indeks tanggal terurut per kolom, dibangun dari baris bertipe
+        self._date_indexes: Dict[str, DateIndex] = {}
+        # Indeks sekunder per kolom: nilai -> {id baris: baris}, urut penyisipan
+        self._groups: Dict[str, Dict[str, Dict[int, Dict]]] = {}
+        # Indeks pencarian teks per kombinasi kolom
+        self._search_indexes: Dict[Tuple[str, ...], SearchIndex] = {}
+        # rows[:disk_rows] sama persis dengan isi CSV utama; None setelah baris lama diubah/dihapus
+        self.disk_rows: Optional[int] = len(rows)
+
+    def group(self, field: str, value: str) -> List[Dict]:
+        """Semua baris dengan nilai kolom tertentu, biayanya sebanding dengan jumlah hasil"""
+        return list(self._group_index(field).get(value, {}).values())
+
+    def group_count(self, field: str, value: str) -> int:
+        """Jumlah baris dengan nilai kolom tertentu"""
+        return len(self._group_index(field).get(value, ()))
+
+    def _group_index(self, field: str) -> Dict[str, Dict[int, Dict]]:
+        """Indeks sekunder satu kolom, dibangun sekali per load lalu dijaga saat tabel berubah"""
+        groups = self._groups.get(field)
+        if groups is None:
+            groups = {}
+            for row in self.rows:
+                groups.setdefault(row.get(field), {})[id(row)] = row
+            self._groups[field] = groups
+        return groups
+
+    def search_index(self, fields: Tuple[str, ...]) -> SearchIndex:
+        """Indeks pencarian teks untuk kombinasi kolom, dibangun sekali per load lalu dijaga saat tabel berubah"""
+        index = self._search_indexes.get(fields)
+        if index is None:
+            with CSVHandler._gc_paused():
+                index = self._search_indexes[fields] = SearchIndex.build(self.rows, fields)
+        return index
+
+    def search(self, fields: Tuple[str, ...], query: str) -> List[Dict]:
+        """Baris yang teks kolomnya cocok dengan query, melalui indeks token yang dijaga saat tabel berubah"""
+        return self.search_index(fields).search(query)
+
+    def index(self, key_field: str) -> Dict[str, Dict]:
+        """Mengambil indeks key -> baris, dibangun sekali per load"""
+        index = self._indexes.get(key_field)
+        if index is None:
+            index = {}
+            for row in self.rows:
+                # Baris pertama menang, sama seperti pencarian linear sebelumnya
+                index.setdefault(row.get(key_field), row)
+            self._indexes[key_field] = index
+        return index
+
+    def decode_all(self, schema: TableSchema) -> None:
+        """Decode semua baris sesuai schema sekali; setelah itu dijaga saat tabel berubah"""
+        if self._typed is None or self._schema is not schema:
+            self._schema = schema
+            self._typed = {}
+            self._decode_errors = {}
+            for row in self.rows:
+                self._decode(row)
+
+    def typed_rows(self, schema: TableSchema) -> List[Dict]:
+        """Mengambil baris bertipe sesuai schema, di-decode sekali lalu dijaga saat tabel berubah"""
+        self.decode_all(schema)
+        typed = self._typed
+        return [typed[id(row)] for row in self.rows]
+
+    def date_index(self, field: str, schema: TableSchema) -> DateIndex:
+        """Mengambil indeks tanggal terurut untuk satu kolom datetime"""
+        index = self._date_indexes.get(field)
+        if index is None:
+            typed_rows = self.typed_rows(schema)
+            index = DateIndex([
+                (typed[field], row) for typed, row in zip(typed_rows, self.rows)
+            ])
+            self._date_indexes[field] = index
+        return index
+
+    def typed_row(self, row: Dict) -> Dict:
+        """
+        Baris bertipe untuk satu baris mentah (decode_all harus sudah dipanggil).
+        Baris yang sudah dihapus dari tabel di-decode langsung.
+        """
+        typed = self._typed.get(id(row))
+        return typed if typed is not None else self._schema.decode(row)[0]
+
+    @property
+    def decode_errors(self) -> List[str]:
+        """Error parsing dari decode terakhir, urut sesuai baris"""
+        errors = self._decode_errors
+        return [error for row in self.rows for error in errors.get(id(row), ())]
+
+    def _decode(self, row: Dict) -> None:
+        """Decode satu baris jika baris bertipe sudah pernah dibangun"""
+        if self._typed is None:
+            return
+        self._typed[id(row)], errors = self._schema.decode(row)
+        if errors:
+            self._decode_errors[id(row)] = errors
+        else:
+            self._decode_errors.pop(id(row), None)
+
+    def lookup(self, key_field: str, key: str) -> Optional[Dict]:
+        """Mencari satu baris berdasarkan nilai kolom kunci"""
+        return self.index(key_field).get(key)
+
+    def insert(self, row: Dict) -> None:
+        """Menambahkan baris baru dan memperbarui indeks yang sudah dibangun"""
+        self.rows.append(row)
+        for key_field, index in self._indexes.items():
+            index.setdefault(row.get(key_field), row)
+        for field, groups in self._groups.items():
+            groups.setdefault(row.get(field), {})[id(row)] = row
+        for search_index in self._search_indexes.values():
+            search_index.add(row)
+        self._decode(row)
+        for field, date_index in self._date_indexes.items():
+            date_index.add(self._typed[id(row)][field], row)
+
+    def remove_last(self, row: Dict) -> None:
+        """Membatalkan insert() baris terakhir beserta entri indeksnya"""
+        self.rows.pop()
+        for key_field, index in self._indexes.items():
+            if index.get(row.get(key_field)) is row:
+                del index[row.get(key_field)]
+        for field, groups in self._groups.items():
+            group = groups.get(row.get(field))
+            if group is not None:
+                group.pop(id(row), None)
+                if not group:
+                    del groups[row.get(field)]
+        for search_index in self._search_indexes.values():
+            search_index.remove_last(row)
+        if self._typed is not None:
+            typed = self._typed.pop(id(row))
+            self._decode_errors.pop(id(row), None)
+            for field, date_index in self._date_indexes.items():
+                date_index.remove(typed[field], row)
+
+    def restore(self, rows: List[Dict], disk_rows: Optional[int]) -> None:
+        """Mengembalikan isi tabel sebelum delete(); indeks dibangun ulang saat dibutuhkan"""
+        self.rows[:] = rows
+        self.disk_rows = disk_rows
+        self._drop_indexes()
+
+    def _drop_indexes(self) -> None:
+        """Membuang semua indeks turunan setelah baris dihapus"""
+        self._indexes.clear()
+        self._typed = None
+        self._date_indexes.clear()
+        self._groups.clear()
+        self._search_indexes.clear()
+
+    def upsert(self, key_field: str, row: Dict) -> None:
+        """Mengganti baris dengan kunci yang sama, atau menambahkannya jika belum ada"""
+        if not self.update(key_field, row.get(key_field), row):
+            self.insert(row)
+
+    def update(self, key_field: str, key: str, new_row: Dict) -> bool:
+        """Mengganti isi baris secara in-place dan memperbarui indeks"""
+        row = self.lookup(key_field, key)
+        if row is None:
+            return False
+
+        self.disk_rows = None
+        old_row = dict(row)
+        old_dates = {
+            field: self._typed[id(row)][field] for field in self._date_indexes
+        }
+        row.clear()
+        row.update(new_row)
+
+        for field, index in self._indexes.items():
+            old_value, new_value = old_row.get(field), row.get(field)
+            if old_value != new_value:
+                if index.get(old_value) is row:
+                    del index[old_value]
+                index.setdefault(new_value, row)
+        for field, groups in self._groups.items():
+            old_value, new_value = old_row.get(field), row.get(field)
+            if old_value != new_value:
+                group = groups.get(old_value)
+                if group is not None:
+                    group.pop(id(row), None)
+                    if not group:
+                        del groups[old_value]
+                groups.setdefault(new_value, {})[id(row)] = row
+        for search_index in self._search_indexes.values():
+            search_index.update(row)
+        self._decode(row)
+
+        for field, date_index in self._date_indexes.items():
+            new_date = self._typed[id(row)][field]
+            if old_dates[field] != new_date:
+                date_index.remove(old_dates[field], row)
+                date_index.add(new_date, row)
+        return True
+
+    def delete(self, key_field: str, key: str) -> int:
+        """Menghapus semua baris dengan nilai kunci tertentu"""
+        initial_length = len(self.rows)
+        self.rows[:] = [row for row in self.rows if row.get(key_field) != key]
+        removed = initial_length - len(self.rows)
+        if removed:
+            self.disk_rows = None
+            # Penghapusan jarang terjadi, indeks cukup dibangun ulang saat dibutuhkan
+            self._drop_indexes()
+        return removed
+
+
+class TableCache:
+    """Cache isi file CSV di memori, divalidasi dengan (st_mtime_ns, st_size)"""
+
+    def __init__(self):
+        # file_path -> (stempel per file sumber, tabel, daftar file sumber)
+        self._entries: Dict[str, Tuple[Tuple, CachedTable, Tuple]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def file_stamp(file_path: str) -> Optional[Tuple[int, int]]:
+        """Mengambil stempel (mtime_ns, size) file, None jika file tidak ada"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, file_path: str, stamp: Tuple) -> Optional[CachedTable]:
+        """Mengambil tabel dari cache jika stempel file masih sama"""
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def peek(self, file_path: str, stamp: Tuple) -> Optional[CachedTable]:
+        """Mengambil tabel yang masih segar tanpa menghitung hit/miss"""
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == stamp:
+                return entry[1]
+            return None
+
+    def put(self, file_path: str, stamp: Tuple, table: CachedTable,
+            files: Optional[Tuple] = None) -> None:
+        """Menyimpan tabel ke cache beserta file sumber yang membentuk stempelnya"""
+        with self._lock:
+            self._entries[file_path] = (stamp, table, files or (file_path,))
+
+    def touch(self, file_path: str, before: Optional[Tuple[int, int]],
+              after: Optional[Tuple[int, int]]) -> None:
+        """
+        Memperbarui stempel tabel yang bergantung pada file yang baru ditulis oleh
+        proses ini. Tabel yang stempelnya tidak cocok dengan kondisi sebelum
+        penulisan (atau jika penulisan gagal) dihapus dari cache.
+        """
+        with self._lock:
+            for key, (stamp, table, files) in list(self._entries.items()):
+                if file_path not in files:
+                    continue
+                position = files.index(file_path)
+                if after is not None and stamp[position] == before:
+                    stamp = stamp[:position] + (after,) + stamp[position + 1:]
+                    self._entries[key] = (stamp, table, files)
+                else:
+                    del self._entries[key]
+
+    def invalidate(self, file_path: Optional[str] = None) -> None:
+        """Menghapus cache satu file, atau semua file jika path tidak diberikan"""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(file_path, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Mengembalikan statistik hit/miss cache"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries)
+            }
+
+
+class ChangeLog:
+    """
+    Log mutasi append-only bersama untuk semua tabel, dilipat ke CSV utama saat
+    kompaksi. Entri milik satu transaksi hanya berlaku jika diakhiri baris commit.
+    """
+
+    OP_FIELD = 'op'
+    TABLE_FIELD = 'tabel'
+    TXN_FIELD = 'txn'
+    COMMIT_OP = 'commit'
+
+    def __init__(self, file_path: str, field_definitions: Dict[str, List[str]],
+                 primary_keys: Dict[str, str]):
+        self.file_path = os.path.abspath(file_path)
+        self.field_definitions = field_definitions
+        self.primary_keys = primary_keys
+
+        # Header log berisi gabungan kolom semua tabel
+        self.fieldnames = [self.OP_FIELD, self.TABLE_FIELD, self.TXN_FIELD]
+        for fields in field_definitions.values():
+            self.fieldnames.extend(f for f in fields if f not in self.fieldnames)
+
+    def apply(self, table: CachedTable, table_name: str, op: str, row: Dict,
+              upsert: bool = False) -> bool:
+        """
+        Menerapkan satu mutasi ke tabel di memori. Insert dengan key yang sudah
+        ada ditolak, kecuali upsert=True (replay log yang mungkin sudah dilipat)
+        """
+        key_field = self.primary_keys[table_name]
+        key = row.get(key_field)
+        if op == 'insert':
+            if upsert:
+                table.upsert(key_field, row)
+                return True
+            if table.lookup(key_field, key) is not None:
+                return False
+            table.insert(row)
+            return True
+        if op == 'update':
+            return table.update(key_field, key, row)
+        if op == 'delete':
+            return table.delete(key_field, key) > 0
+        return False
+
+    def append(self, changes: List[Tuple[str, str, Dict]], txn_id: str = '') -> bool:
+        """Menambahkan entri (tabel, op, baris) ke akhir log dalam satu penulisan"""
+        entries = []
+        for table_name, op, row in changes:
+            entry = dict(row)
+            entry[self.OP_FIELD] = op
+            entry[self.TABLE_FIELD] = table_name
+            entry[self.TXN_FIELD] = txn_id
+            entries.append(entry)
+        if txn_id:
+            # Tanpa baris ini (misalnya crash di tengah penulisan) transaksi diabaikan
+            entries.append({self.OP_FIELD: self.COMMIT_OP, self.TXN_FIELD: txn_id})
+        return CSVHandler.append_rows(self.file_path, entries, self.fieldnames)
+
+    def entries(self, table_name: str) -> Iterator[Tuple[str, Dict]]:
+        """(op, baris) milik satu tabel yang sudah di-commit, urut sesuai log"""
+        if not os.path.exists(self.file_path):
+            return
+        fields = self.field_definitions[table_name]
+        staged: Dict[str, List[Tuple[str, str, Dict]]] = {}
+
+        with open(self.file_path, mode='r', encoding='utf-8') as file:
+            for entry in csv.DictReader(file):
+                op = entry.pop(self.OP_FIELD, '')
+                entry_table = entry.pop(self.TABLE_FIELD, '')
+                txn_id = entry.pop(self.TXN_FIELD, '')
+
+                if op == self.COMMIT_OP:
+                    changes = staged.pop(txn_id, [])
+                elif txn_id:
+                    # Tunggu baris commit sebelum entri transaksi diterapkan
+                    staged.setdefault(txn_id, []).append((entry_table, op, entry))
+                    continue
+                else:
+                    changes = [(entry_table, op, entry)]
+
+                for entry_table, op, entry in changes:
+                    if entry_table == table_name:
+                        yield op, {field: entry.get(field) or '' for field in fields}
+
+    def replay(self, table: CachedTable, table_name: str, upsert_updates: bool = False) -> None:
+        """
+        Menerapkan entri log milik satu tabel ke tabel hasil parsing CSV utama.
+        Jika upsert_updates=True, update untuk baris yang belum ada ikut ditambahkan
+        (dipakai saat tabel hanya berisi sebagian data).
+        """
+        for op, row in self.entries(table_name):
+            if upsert_updates and op == 'update':
+                op = 'insert'
+            # Upsert agar replay tetap idempoten jika log sudah pernah dilipat
+            self.apply(table, table_name, op, row, upsert=True)
+            table.log_entries += 1
+
+    def overlay(self, table_name: str) -> Dict[str, Tuple[str, Optional[Dict]]]:
+        """
+        Kondisi akhir setiap baris yang disentuh log tanpa memuat CSV utama:
+        key -> ('insert' atau 'update', baris terbaru atau None jika dihapus).
+        Baris 'update' hanya berlaku jika baris itu memang ada di CSV utama.
+        """
+        key_field = self.primary_keys[table_name]
+        state: Dict[str, Tuple[str, Optional[Dict]]] = {}
+        for op, row in self.entries(table_name):
+            key = row.get(key_field)
+            kind, current = state.get(key, ('update', None))
+            if op == 'insert':
+                state[key] = ('insert', row)
+            elif op == 'update':
+                # Update pada baris yang sudah dihapus tidak berpengaruh, sama seperti apply()
+                if key not in state or current is not None:
+                    state[key] = (kind, row)
+            elif op == 'delete':
+                state[key] = (kind, None)
+        return state
+
+    def touched_keys(self, table_name: str) -> Set[str]:
+        """Primary key semua baris tabel yang disentuh entri log"""
+        if not os.path.exists(self.file_path):
+            return set()
+        key_field = self.primary_keys[table_name]
+        with open(self.file_path, mode='r', encoding='utf-8') as file:
+            return {
+                entry.get(key_field) for entry in csv.DictReader(file)
+                if entry.get(self.TABLE_FIELD) == table_name
+            }
+
+    def has_current_header(self) -> bool:
+        """Apakah header log sama dengan kolom semua tabel saat ini (False setelah tabel baru ditambahkan)"""
+        try:
+            with open(self.file_path, mode='r', newline='', encoding='utf-8') as file:
+                header = next(csv.reader(file), None)
+        except FileNotFoundError:
+            return True
+        return header is None or header == self.fieldnames
+
+    def clear(self) -> None:
+        """Menghapus file log setelah isinya dilipat ke CSV utama"""
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+
+class UnitOfWork:
+    """Perubahan beberapa tabel yang ditulis bersama saat transaksi di-commit"""
+
+    def __init__(self, txn_id: str):
+        self.txn_id = txn_id
+        self.changes: List[Tuple[str, str, Dict]] = []
+        # Pembalik setiap perubahan di memori, dijalankan mundur saat rollback
+        self.undo: List[Callable[[], None]] = []
+        # Data turunan yang perubahannya tidak bisa dibalik per entri, dihitung ulang setelah rollback
+        self.stale: Set[str] = set()
+        self.rolled_back = False
+        self.committed = False
+
+    def rollback(self) -> None:
+        """Membatalkan semua perubahan di dalam blok transaksi"""
+        self.rolled_back = True
+
+
 class CSVHandler:
     """Handler untuk operasi dasar CSV"""
+
+    # Cache dipakai bersama oleh semua instance dalam satu proses
+    cache = TableCache()
+
+    # Group commit: penulisan dalam jendela waktu ini digabung jadi satu flush.
+    # 0 berarti setiap penulisan langsung ke disk.
+    group_commit_window = 0.0
+    _group_depth = 0
+    _pending: Dict[str, Dict] = {}
+    _commit_lock = threading.RLock()
+    _commit_timer: Optional[threading.Timer] = None
+
+    # Snapshot biner (pickle per kolom) di samping file CSV besar untuk cold load cepat.
+    # CSV tetap sumber data; snapshot hanya dipakai jika stempelnya sama dengan CSV.
+    snapshots_enabled = True
+    SNAPSHOT_SUFFIX = '.snapshot'
+    SNAPSHOT_VERSION = 1
+    SNAPSHOT_MIN_BYTES = 64 * 1024
+    _snapshot_jobs: Set[str] = set()
+    _snapshot_lock = threading.Lock()
+
+    @staticmethod
+    def to_row(data: Dict, fieldnames: List[str]) -> Dict[str, str]:
+        """Mengubah record menjadi baris string seperti hasil pembacaan CSV"""
+        return {
+            field: '' if data.get(field) is None else str(data.get(field))
+            for field in fieldnames
+        }
+
+    @staticmethod
+    def table_stamp(file_path: str, change_log: Optional[ChangeLog] = None) -> Tuple:
+        """Stempel gabungan file CSV utama dan change log-nya"""
+        log_stamp = TableCache.file_stamp(change_log.file_path) if change_log else None
+        return (TableCache.file_stamp(file_path), log_stamp)
+
+    @staticmethod
+    def raw_cache_key(file_path: str) -> str:
+        """
+        Key cache untuk isi CSV apa adanya (read_csv/append_csv), terpisah dari
+        tabel DatabaseManager di path yang sama yang digabung dengan change log
+        """
+        return os.path.abspath(file_path) + '#csv'
+
+    @staticmethod
+    def store_table(file_path: str, table: CachedTable, change_log: Optional[ChangeLog] = None,
+                    cache_key: Optional[str] = None) -> None:
+        """Menyimpan tabel yang sudah sinkron dengan isi file ke cache"""
+        file_path = os.path.abspath(file_path)
+        CSVHandler.cache.put(
+            cache_key or file_path,
+            CSVHandler.table_stamp(file_path, change_log),
+            table,
+            (file_path, change_log.file_path if change_log else None)
+        )
+
+    @staticmethod
+    def load_table(file_path: str, change_log: Optional[ChangeLog] = None,
+                   table_name: Optional[str] = None,
+                   known_stamp: Optional[Tuple] = None,
+                   cache_key: Optional[str] = None) -> Optional[CachedTable]:
+        """
+        Memuat tabel dari cache atau parsing ulang jika file berubah. known_stamp
+        dipakai untuk file immutable yang stempelnya sudah diketahui (tanpa stat).
+        cache_key default-nya path file.
+        """
+        file_path = os.path.abspath(file_path)
+        cache_key = cache_key or file_path
+        stamp = known_stamp or CSVHandler.table_stamp(file_path, change_log)
+
+        table = CSVHandler.cache.get(cache_key, stamp)
+        if table is None:
+            # Pastikan penulisan yang masih tertunda sudah ada di disk sebelum parsing
+            if CSVHandler._pending:
+                CSVHandler.flush()
+                if known_stamp is None:
+                    stamp = CSVHandler.table_stamp(file_path, change_log)
+            if stamp[0] is None:
+                return None
+            try:
+                with CSVHandler._gc_paused():
+                    rows = CSVHandler._read_snapshot(file_path, stamp[0])
+                    if rows is None:
+                        with open(file_path, mode='r', encoding='utf-8') as file:
+                            rows = list(csv.DictReader(file))
+                        if stamp[0][1] >= CSVHandler.SNAPSHOT_MIN_BYTES:
+                            CSVHandler._schedule_snapshot(file_path)
+                record_io(rows_read=len(rows), bytes_read=stamp[0][1])
+                table = CachedTable(rows)
+                if change_log:
+                    change_log.replay(table, table_name)
+            except Exception as e:
+                print(f"Error reading CSV file: {str(e)}")
+                return None
+            CSVHandler.cache.put(
+                cache_key,
+                stamp,
+                table,
+                (file_path, change_log.file_path if change_log else None)
+            )
+        return table
     
+    @staticmethod
+    @contextmanager
+    def _gc_paused():
+        """Menonaktifkan GC sementara saat membuat banyak dict sekaligus"""
+        was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            yield
+        finally:
+            if was_enabled:
+                gc.enable()
+
+    @staticmethod
+    def snapshot_path(file_path: str) -> str:
+        """Path snapshot biner untuk satu file CSV"""
+        return file_path + CSVHandler.SNAPSHOT_SUFFIX
+
+    @staticmethod
+    def _read_snapshot(file_path: str, file_stamp: Tuple[int, int]) -> Optional[List[Dict]]:
+        """Membaca baris dari snapshot jika snapshot dibuat dari isi CSV yang sama"""
+        if not CSVHandler.snapshots_enabled:
+            return None
+        # Snapshot yang tidak ada atau rusak tidak fatal, CSV tetap dibaca
+        snapshot = load_snapshot(
+            CSVHandler.snapshot_path(file_path), CSVHandler.SNAPSHOT_VERSION, file_stamp
+        )
+        if snapshot is None:
+            return None
+        fieldnames, columns = snapshot['fieldnames'], snapshot['columns']
+        row_count = len(columns[0]) if columns else 0
+        # map/zip berjalan di level C, jauh lebih cepat daripada list comprehension
+        return list(map(dict, map(zip, itertools.repeat(fieldnames, row_count), zip(*columns))))
+
+    @staticmethod
+    def _schedule_snapshot(file_path: str) -> None:
+        """Membangun ulang snapshot satu file CSV di thread background"""
+        if not CSVHandler.snapshots_enabled:
+            return
+        with CSVHandler._snapshot_lock:
+            if file_path in CSVHandler._snapshot_jobs:
+                return
+            CSVHandler._snapshot_jobs.add(file_path)
+
+        def run():
+            try:
+                CSVHandler._write_snapshot(file_path)
+            except Exception as e:
+                print(f"Error writing snapshot: {str(e)}")
+            finally:
+                with CSVHandler._snapshot_lock:
+                    CSVHandler._snapshot_jobs.discard(file_path)
+
+        threading.Thread(target=run, name="csv-snapshot", daemon=True).start()
+
+    @staticmethod
+    def _write_snapshot(file_path: str) -> None:
+        """Membaca CSV lalu menulis snapshot kolomnya secara atomik"""
+        stamp = TableCache.file_stamp(file_path)
+        if stamp is None:
+            return
+        with open(file_path, mode='r', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            rows = list(reader)
+            fieldnames = list(reader.fieldnames or [])
+
+        # File berubah selama dibaca, snapshot dibuat lagi pada load berikutnya
+        if TableCache.file_stamp(file_path) != stamp:
+            return
+
+        data = {
+            'fieldnames': fieldnames,
+            'columns': [[row.get(field) for row in rows] for field in fieldnames]
+        }
+        save_snapshot(CSVHandler.snapshot_path(file_path), CSVHandler.SNAPSHOT_VERSION, stamp, data)
+
     @staticmethod
     def read_csv(file_path: str) -> List[Dict]:
         """Membaca file CSV dan mengembalikan list of dictionaries"""
-        if not os.path.exists(file_path):
+        table = CSVHandler.load_table(file_path, cache_key=CSVHandler.raw_cache_key(file_path))
+        if table is None:
             return []
-            
+        # Kembalikan salinan agar pemanggil tidak mengubah isi cache
+        return [dict(row) for row in table.rows]
+
+    @staticmethod
+    def _fsync_directory(directory: str) -> None:
+        """Memastikan entri direktori hasil os.replace ikut tersimpan ke disk"""
+        if os.name != 'posix':
+            return
         try:
-            with open(file_path, mode='r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                return list(reader)
-        except Exception as e:
-            print(f"Error reading CSV file: {str(e)}")
-            return []
-    
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
     @staticmethod
-    def write_csv(file_path: str, data: List[Dict], fieldnames: List[str]) -> bool:
-        """Menulis data ke file CSV"""
+    def _atomic_write(file_path: str, data: List[Dict], fieldnames: List[str]) -> bool:
+        """Menulis ke file sementara, fsync, lalu os.replace ke file tujuan"""
+        directory = os.path.dirname(os.path.abspath(file_path))
         try:
-            with open(file_path, mode='w', newline='', encoding='utf-8') as file:
+            # Pertahankan permission file lama (mkstemp selalu membuat 0600)
+            mode = os.stat(file_path).st_mode if os.path.exists(file_path) else 0o644
+            with atomic_write(file_path, mode='w', encoding='utf-8', newline='',
+                              chmod=mode & 0o777, durable=True) as file:
                 writer = csv.DictWriter(file, fieldnames=fieldnames)
                 writer.writeheader()
                 writer.writerows(data)
+                if is_recording():
+                    record_io(rows_written=len(data), bytes_written=file.tell())
+            CSVHandler._fsync_directory(directory)
+
+            # Snapshot yang sudah ada langsung dibangun ulang untuk isi baru
+            if os.path.exists(CSVHandler.snapshot_path(file_path)):
+                CSVHandler._schedule_snapshot(file_path)
             return True
         except Exception as e:
             print(f"Error writing to CSV file: {str(e)}")
             return False
-    
-    @staticmethod
+
     @staticmethod
-    def append_csv(file_path: str, data: Dict, fieldnames: List[str]) -> bool:
-        """Menambahkan satu baris data ke file CSV"""
+    def _write_appends(file_path: str, data: List[Dict], fieldnames: List[str], durable: bool) -> bool:
+        """Menambahkan beberapa baris sekaligus dalam satu open/write"""
         try:
-            file_exists = os.path.exists(file_path)
+            write_header = not os.path.exists(file_path) or os.path.getsize(file_path) == 0
             with open(file_path, mode='a', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=fieldnames, delimiter=',')  
-                if not file_exists:
+                # tell() mem-flush buffer, jadi hanya dipanggil saat pengukuran aktif
+                recording = is_recording()
+                start = file.tell() if recording else 0
+                writer = csv.DictWriter(file, fieldnames=fieldnames, delimiter=',')
+                if write_header:
                     writer.writeheader()  # Tulis header jika file belum ada
-                writer.writerow(data)  # Tulis data ke file
+                writer.writerows(data)  # Tulis data ke file
+                if recording:
+                    record_io(rows_written=len(data), bytes_written=file.tell() - start)
+                if durable:
+                    file.flush()
+                    os.fsync(file.fileno())
             return True
         except Exception as e:
             print(f"Error appending to CSV file: {str(e)}")
             return False
 
+    @staticmethod
+    def _buffering() -> bool:
+        """Apakah penulisan sedang ditunda untuk group commit"""
+        return CSVHandler._group_depth > 0 or CSVHandler.group_commit_window > 0
+
+    @staticmethod
+    def _enqueue(file_path: str, data: List[Dict], fieldnames: List[str], rewrite: bool) -> None:
+        """Menunda penulisan sampai flush berikutnya"""
+        # Salin baris karena tabel di cache bisa berubah in-place sebelum flush
+        rows = [dict(row) for row in data]
+        with CSVHandler._commit_lock:
+            pending = CSVHandler._pending.get(file_path)
+            if rewrite or pending is None:
+                # Tulis ulang penuh menggantikan semua penulisan tertunda sebelumnya
+                CSVHandler._pending[file_path] = {
+                    'rewrite': rewrite,
+                    'fieldnames': fieldnames,
+                    'rows': rows
+                }
+            else:
+                pending['rows'].extend(rows)
+
+            if CSVHandler._group_depth == 0 and CSVHandler._commit_timer is None:
+                timer = threading.Timer(CSVHandler.group_commit_window, CSVHandler.flush)
+                timer.daemon = True
+                CSVHandler._commit_timer = timer
+                timer.start()
+
+    @staticmethod
+    def flush() -> bool:
+        """Menulis semua penulisan tertunda ke disk (dengan fsync)"""
+        with CSVHandler._commit_lock:
+            pending, CSVHandler._pending = CSVHandler._pending, {}
+            if CSVHandler._commit_timer is not None:
+                CSVHandler._commit_timer.cancel()
+                CSVHandler._commit_timer = None
+
+            success = True
+            for file_path, entry in pending.items():
+                before = TableCache.file_stamp(file_path)
+                if entry['rewrite']:
+                    written = CSVHandler._atomic_write(file_path, entry['rows'], entry['fieldnames'])
+                else:
+                    written = CSVHandler._write_appends(
+                        file_path, entry['rows'], entry['fieldnames'], durable=True
+                    )
+                # Tabel di cache sudah memuat isi yang baru ditulis, cukup perbarui stempelnya
+                CSVHandler.cache.touch(
+                    file_path,
+                    before,
+                    TableCache.file_stamp(file_path) if written else None
+                )
+                success = success and written
+            return success
+
+    @staticmethod
+    @contextmanager
+    def group_commit():
+        """
+        Menggabungkan semua penulisan di dalam blok menjadi satu flush di akhir blok.
+
+        Contoh:
+            with CSVHandler.group_commit():
+                db.update_produk(...)
+                db.add_pesanan(...)
+        """
+        with CSVHandler._commit_lock:
+            CSVHandler._group_depth += 1
+        try:
+            yield
+        finally:
+            with CSVHandler._commit_lock:
+                CSVHandler._group_depth -= 1
+                outermost = CSVHandler._group_depth == 0
+            if outermost:
+                CSVHandler.flush()
+
+    @staticmethod
+    def set_group_commit(window: float) -> None:
+        """Mengatur jendela group commit dalam detik (0 untuk menonaktifkan)"""
+        CSVHandler.group_commit_window = max(0.0, window)
+        if CSVHandler.group_commit_window == 0:
+            CSVHandler.flush()
+    
+    @staticmethod
+    def write_csv(file_path: str, data: List[Dict], fieldnames: List[str], durable: bool = False) -> bool:
+        """
+        Menulis data ke file CSV secara atomik. Jika durable=True penulisan
+        tidak ditunda oleh group commit.
+        """
+        file_path = os.path.abspath(file_path)
+        CSVHandler.cache.invalidate(file_path)
+        CSVHandler.cache.invalidate(CSVHandler.raw_cache_key(file_path))
+        if CSVHandler._buffering() and not durable:
+            CSVHandler._enqueue(file_path, data, fieldnames, rewrite=True)
+            return True
+        with CSVHandler._commit_lock:
+            # Penulisan tertunda untuk file ini sudah tergantikan
+            CSVHandler._pending.pop(file_path, None)
+        return CSVHandler._atomic_write(file_path, data, fieldnames)
+
+    @staticmethod
+    def append_rows(file_path: str, data: List[Dict], fieldnames: List[str]) -> bool:
+        """Menambahkan beberapa baris ke file CSV, ditunda jika group commit aktif"""
+        file_path = os.path.abspath(file_path)
+        if CSVHandler._buffering():
+            CSVHandler._enqueue(file_path, data, fieldnames, rewrite=False)
+            return True
+        return CSVHandler._write_appends(file_path, data, fieldnames, durable=False)
+
+    @staticmethod
+    def append_csv(file_path: str, data: Dict, fieldnames: List[str]) -> bool:
+        """Menambahkan satu baris data ke file CSV"""
+        file_path = os.path.abspath(file_path)
+        cache_key = CSVHandler.raw_cache_key(file_path)
+        table = CSVHandler.cache.peek(cache_key, CSVHandler.table_stamp(file_path))
+        if not CSVHandler.append_rows(file_path, [data], fieldnames):
+            CSVHandler.cache.invalidate(cache_key)
+            return False
+
+        if table is not None:
+            # Tabel di cache masih segar sebelum append, cukup tambahkan barisnya
+            table.insert(CSVHandler.to_row(data, fieldnames))
+            CSVHandler.store_table(file_path, table, cache_key=cache_key)
+        else:
+            CSVHandler.cache.invalidate(cache_key)
+        return True
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, int]:
+        """Mengembalikan statistik hit/miss cache tabel"""
+        return CSVHandler.cache.get_stats()
+
+
+# Penulisan yang masih tertunda ikut disimpan saat proses berakhir normal
+atexit.register(CSVHandler.flush)
 
+
+@instrumented
 class DatabaseManager:
     """Manager untuk operasi database menggunakan CSV"""
+
+    # Jumlah entri change log sebelum dilipat ke CSV utama di background
+    COMPACTION_THRESHOLD = 500
+
+    # Lock penulisan dan status kompaksi dipakai bersama oleh semua instance
+    _write_lock = threading.RLock()
+    _compacting = set()
     
     def __init__(self, base_path=None):
         """
@@ -72,140 +946,941 @@ class DatabaseManager:
         self.file_paths = {
             'produk': os.path.join(self.base_path, 'produk.csv'),
             'pesanan': os.path.join(self.base_path, 'pesanan.csv'),
-            'transaksi': os.path.join(self.base_path, 'transaksi.csv')
+            'transaksi': os.path.join(self.base_path, 'transaksi.csv'),
+            STOCK_LEDGER_TABLE: os.path.join(self.base_path, 'stok_mutasi.csv'),
+            STATUS_HISTORY_TABLE: os.path.join(self.base_path, 'status_pesanan.csv')
         }
         
+        # Schema bertipe setiap tabel (str/int/float/datetime per kolom)
+        self.schema = TABLE_SCHEMAS
+        
         # Definisi field untuk setiap CSV
         self.field_definitions = {
-            'produk': [
-                'id_produk', 
-                'nama_produk', 
-                'kategori',
-                'harga', 
-                'stok',
-                'created_at',
-                'updated_at'
-            ],
-            'pesanan': [
-                'id_pesanan',
-                'id_pelanggan',
-                'id_produk',
-                'jumlah_dipesan',
-                'total_harga',
-                'status',
-                'tanggal_pesanan'
-            ],
-            'transaksi': [
-                'id_transaksi',
-                'id_pesanan',
-                'total_harga',
-                'metode_pembayaran',
-                'tanggal_transaksi'
-            ]
+            file_type: schema.fieldnames
+            for file_type, schema in self.schema.items()
+        }
+        
+        # Primary key setiap tabel, dipakai untuk indeks hash id -> baris
+        self.primary_keys = {
+            'produk': 'id_produk',
+            'pesanan': 'id_pesanan',
+            'transaksi': 'id_transaksi',
+            STOCK_LEDGER_TABLE: 'id_mutasi',
+            STATUS_HISTORY_TABLE: 'id_status'
         }
         
-        # Inisialisasi file CSV jika belum ada
+        # Change log append-only bersama semua tabel, digabung dengan CSV utama saat dibaca
+        self.change_log = ChangeLog(
+            os.path.join(self.base_path, 'changes.csv'),
+            self.field_definitions,
+            self.primary_keys
+        )
+        
+        # Unit of work yang sedang berjalan, lihat transaction()
+        self._unit_of_work: Optional[UnitOfWork] = None
+        
+        # Pembuat ID unik, dipakai bersama semua instance untuk direktori yang sama
+        self.id_allocator = get_id_allocator(self.base_path)
+        
+        # Tabel yang disimpan per bulan (lihat utils/partitions.py), diisi saat inisialisasi
+        self.partitions = {}
+        
+        # Ringkasan penjualan harian, di-cache bersama tabel dan disimpan saat kompaksi
+        self.rollup_path = os.path.join(os.path.abspath(self.base_path), ROLLUP_FILENAME)
+        
+        # Saldo stok per produk dari buku besar mutasi, di-checkpoint saat kompaksi
+        self.balances_path = os.path.join(os.path.abspath(self.base_path), BALANCES_FILENAME)
+        
+        # Agregat riwayat status pesanan, di-cache dan disimpan dengan cara yang sama
+        self.status_stats_path = os.path.join(os.path.abspath(self.base_path), STATS_FILENAME)
+        
+        # Inisialisasi storage (file CSV jika belum ada)
+        self._initialize_storage()
+
+    def _initialize_storage(self) -> None:
+        """Menyiapkan storage, di-override oleh backend lain"""
+        from .partitions import PARTITIONABLE_TABLES, PartitionedStore
+
+        for file_type in PARTITIONABLE_TABLES:
+            directory = os.path.join(self.base_path, file_type)
+            if PartitionedStore.exists(directory):
+                self.partitions[file_type] = PartitionedStore(directory, self.schema[file_type])
+
+        seed_ledger = not os.path.exists(self.file_paths[STOCK_LEDGER_TABLE])
+        seed_status = not self._storage_exists(STATUS_HISTORY_TABLE)
         self._initialize_csv_files()
-    
+        if seed_ledger:
+            self._seed_stock_ledger()
+        if seed_status:
+            self._seed_status_history()
+
+        # Log dari versi dengan tabel lebih sedikit dilipat dulu sebelum ditambah entri dengan header baru
+        if not self.change_log.has_current_header():
+            self.compact()
+
+    def _storage_exists(self, file_type: str) -> bool:
+        """Mengecek apakah storage untuk tabel tertentu tersedia"""
+        if file_type in self.partitions:
+            return True
+        return os.path.exists(self.file_paths[file_type])
+
     def _initialize_csv_files(self) -> None:
         """Membuat file CSV jika belum ada"""
         os.makedirs(self.base_path, exist_ok=True)
         
         for file_type, file_path in self.file_paths.items():
-            if not os.path.exists(file_path):
+            if file_type not in self.partitions and not os.path.exists(file_path):
                 self.csv_handler.write_csv(
                     file_path,
                     [],
-                    self.field_definitions[file_type]
+                    self.field_definitions[file_type],
+                    durable=True
                 )
 
+    def _seed_stock_ledger(self) -> None:
+        """Membuat buku besar mutasi berisi saldo awal (stok saat ini) setiap produk yang sudah ada"""
+        now = datetime.now().isoformat()
+        records = [
+            self._mutasi_record(product['id_produk'], product['stok'] or 0, ALASAN_SALDO_AWAL,
+                                tanggal=product['created_at'].isoformat() if product['created_at'] else now)
+            for product in self._table('produk').typed_rows(self.schema['produk'])
+        ]
+        if records:
+            self.csv_handler.write_csv(
+                self.file_paths[STOCK_LEDGER_TABLE],
+                records,
+                self.field_definitions[STOCK_LEDGER_TABLE],
+                durable=True
+            )
+
+    def _seed_status_history(self) -> None:
+        """
+        Membuat riwayat status untuk pesanan yang sudah ada: event pembuatan pada
+        tanggal pesanan, lalu status akhirnya pada tanggal transaksi (untuk pesanan
+        Selesai) atau tanpa tanggal jika waktunya tidak diketahui.
+        """
+        selesai_at = {
+            transaksi['id_pesanan']: transaksi['tanggal_transaksi']
+            for transaksi in self._table('transaksi').typed_rows(self.schema['transaksi'])
+        }
+        records = []
+        for pesanan in self._table('pesanan').typed_rows(self.schema['pesanan']):
+            created = pesanan['tanggal_pesanan']
+            records.append(self._status_record(pesanan, '', STATUS_PENDING, created.isoformat() if created else ''))
+            if pesanan['status'] != STATUS_PENDING:
+                tanggal = selesai_at.get(pesanan['id_pesanan']) if pesanan['status'] == STATUS_SELESAI else None
+                records.append(self._status_record(
+                    pesanan, STATUS_PENDING, pesanan['status'], tanggal.isoformat() if tanggal else '',
+                    id_status=f"AWAL-{pesanan['id_pesanan']}"
+                ))
+        if records:
+            self.csv_handler.write_csv(
+                self.file_paths[STATUS_HISTORY_TABLE],
+                records,
+                self.field_definitions[STATUS_HISTORY_TABLE],
+                durable=True
+            )
+
+    def _table(self, file_type: str) -> CachedTable:
+        """
+        Mengambil tabel (CSV utama + change log) untuk dibaca atau diubah in-place.
+        Tabel dipakai bersama semua thread: pemanggil yang membaca isinya harus
+        memegang _write_lock selama membaca agar tidak melihat perubahan transaksi
+        yang belum di-commit atau baris yang sedang diubah.
+        """
+        with self._write_lock:
+            if file_type in self.partitions:
+                return self.partitions[file_type].load(self.change_log, file_type)
+            table = self.csv_handler.load_table(
+                self.file_paths[file_type],
+                self.change_log,
+                file_type
+            )
+            return table if table is not None else CachedTable([])
+
+    def _rows(self, file_type: str) -> List[Dict]:
+        """Mengambil salinan seluruh baris tabel"""
+        # Transaksi memegang lock sampai selesai, jadi salinan hanya berisi perubahan yang sudah di-commit
+        with self._write_lock:
+            return [dict(row) for row in self._table(file_type).rows]
+
+    def _typed_rows(self, file_type: str) -> List[Dict]:
+        """Mengambil salinan baris bertipe (int/float/datetime) sesuai schema"""
+        with self._write_lock:
+            rows = self._table(file_type).typed_rows(self.schema[file_type])
+            return [dict(row) for row in rows]
+
+    def _range_table(self, file_type: str, start: datetime, end: datetime) -> CachedTable:
+        """Tabel yang cukup untuk menjawab range query [start, end]"""
+        store = self.partitions.get(file_type)
+        if store is not None and store.cached(self.change_log) is None:
+            # Tabel gabungan belum dimuat: cukup buka partisi yang beririsan dengan periode
+            return store.load_range(start, end, self.change_log, file_type)
+        return self._table(file_type)
+
+    def _lookup_many(self, file_type: str, keys: Set[str],
+                     end: Optional[datetime] = None) -> Dict[str, Dict]:
+        """
+        Baris per primary key. Tabel berpartisi yang belum dimuat utuh dicari per
+        partisi dari bulan end mundur, bukan dengan memuat semua partisi.
+        """
+        with self._write_lock:
+            store = self.partitions.get(file_type)
+            if store is not None and store.cached(self.change_log) is None:
+                found = store.lookup_many(keys, end, self.change_log, file_type)
+            else:
+                index = self._table(file_type).index(self.primary_keys[file_type])
+                found = {key: index[key] for key in keys if key in index}
+            return {key: dict(row) for key, row in found.items()}
+
+    def _range(self, file_type: str, start: datetime, end: datetime,
+               typed: bool = False) -> List[Dict]:
+        """Mengambil salinan baris dengan tanggal di [start, end] melalui indeks terurut"""
+        schema = self.schema[file_type]
+        # Bisa dipanggil dari thread background: indeks dan baris disalin selama
+        # dikunci agar tidak diubah oleh penulisan dari thread Tk
+        with self._write_lock:
+            table = self._range_table(file_type, start, end)
+            rows = table.date_index(schema.date_field, schema).range(start, end)
+            if typed:
+                rows = [table.typed_row(row) for row in rows]
+            return [dict(row) for row in rows]
+
+    def get_decode_errors(self, file_type: str) -> List[str]:
+        """Mengambil error parsing kolom bertipe untuk satu tabel"""
+        with self._write_lock:
+            table = self._table(file_type)
+            table.decode_all(self.schema[file_type])
+            return table.decode_errors
+
+    def _get_by_id(self, file_type: str, record_id: str) -> Optional[Dict]:
+        """Mencari satu baris berdasarkan primary key melalui indeks hash"""
+        with self._write_lock:
+            row = self._table(file_type).lookup(self.primary_keys[file_type], record_id)
+            return dict(row) if row is not None else None
+
+    def _existing_keys(self, file_type: str, keys: List[str]) -> Set[str]:
+        """Primary key dari keys yang sudah ada di tabel"""
+        with self._write_lock:
+            index = self._table(file_type).index(self.primary_keys[file_type])
+            return {key for key in keys if key in index}
+
+    def _group(self, file_type: str, field: str, value: str, typed: bool = False) -> List[Dict]:
+        """Salinan baris dengan nilai kolom tertentu melalui indeks sekunder"""
+        with self._write_lock:
+            table = self._table(file_type)
+            rows = table.group(field, value)
+            if typed:
+                table.decode_all(self.schema[file_type])
+                rows = [table.typed_row(row) for row in rows]
+            return [dict(row) for row in rows]
+
+    def _group_count(self, file_type: str, field: str, value: str) -> int:
+        """Jumlah baris dengan nilai kolom tertentu tanpa menyalin baris"""
+        with self._write_lock:
+            return self._table(file_type).group_count(field, value)
+
+    @staticmethod
+    def _where(where: Optional[Dict[str, str]]) -> Optional[Callable[[Dict], bool]]:
+        """Predikat baris untuk filter kolom = nilai"""
+        if not where:
+            return None
+        return lambda row: all(row.get(field) == value for field, value in where.items())
+
+    def _search(self, file_type: str, fields: Tuple[str, ...], query: str,
+                where: Optional[Dict[str, str]] = None, typed: bool = False) -> List[Dict]:
+        """Salinan baris yang cocok dengan query teks (dan nilai kolom di where) melalui indeks pencarian"""
+        # Dikunci agar indeks tidak berubah oleh penulisan dari thread lain selama pencarian
+        with self._write_lock:
+            table = self._table(file_type)
+            rows = table.search(fields, query)
+            if where:
+                rows = list(filter(self._where(where), rows))
+            if typed:
+                table.decode_all(self.schema[file_type])
+                rows = [table.typed_row(row) for row in rows]
+            return [dict(row) for row in rows]
+
+    def _search_ranked(self, file_type: str, fields: Tuple[str, ...], query: str,
+                       limit: Optional[int] = None, boost: Optional[Dict[str, float]] = None,
+                       where: Optional[Dict[str, str]] = None, typed: bool = False) -> List[Dict]:
+        """
+        Salinan baris yang cocok dengan query (boleh salah ketik), diurutkan dari
+        kecocokan terbaik; boost adalah bobot tambahan per primary key
+        """
+        with self._write_lock:
+            table = self._table(file_type)
+            rows = table.search_index(fields).ranked(
+                query, limit, boost, self.primary_keys[file_type], self._where(where)
+            )
+            if typed:
+                table.decode_all(self.schema[file_type])
+                rows = [table.typed_row(row) for row in rows]
+            return [dict(row) for row in rows]
+
+    def _cached_table(self, file_type: str) -> Optional[CachedTable]:
+        """Tabel dari cache jika sudah dimuat dan masih segar, tanpa memuatnya"""
+        if self.csv_handler._pending:
+            self.csv_handler.flush()
+        if file_type in self.partitions:
+            return self.partitions[file_type].cached(self.change_log)
+        file_path = os.path.abspath(self.file_paths[file_type])
+        return self.csv_handler.cache.peek(
+            file_path, self.csv_handler.table_stamp(file_path, self.change_log)
+        )
+
+    def _stream_from_disk(self, file_type: str, start: Optional[datetime] = None,
+                          end: Optional[datetime] = None) -> Iterator[Dict]:
+        """
+        Membaca CSV baris demi baris dan menggabungkannya dengan change log tanpa
+        memuat seluruh tabel. Memori yang dipakai sebanding dengan isi change log.
+        start/end hanya dipakai untuk melewati partisi bulan di luar periode.
+        """
+        key_field = self.primary_keys[file_type]
+        overlay = self.change_log.overlay(file_type)
+
+        store = self.partitions.get(file_type)
+        if store is not None:
+            paths = [store.partition_path(name) for name, _ in store.partitions_in_range(start, end)]
+        else:
+            paths = [self.file_paths[file_type]]
+        # Baris yang diubah bisa berasal dari partisi yang dilewati, update diperlakukan sebagai upsert
+        partial = store is not None and (start is not None or end is not None)
+
+        seen = set()
+        for path in paths:
+            try:
+                file = open(path, mode='r', encoding='utf-8')
+            except FileNotFoundError:
+                continue
+            with file:
+                reader = csv.DictReader(file)
+                for row in reader:
+                    key = row.get(key_field)
+                    change = overlay.get(key)
+                    if change is not None:
+                        seen.add(key)
+                        row = change[1]
+                        if row is None:
+                            continue
+                    yield row
+                if is_recording():
+                    record_io(rows_read=max(0, reader.line_num - 1), bytes_read=os.fstat(file.fileno()).st_size)
+
+        for key, (kind, row) in overlay.items():
+            if row is not None and key not in seen and (kind == 'insert' or partial):
+                yield row
+
+    def _iter(self, file_type: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              filters: Optional[Dict[str, str]] = None, typed: bool = False) -> Iterator[Dict]:
+        """
+        Menghasilkan salinan baris satu per satu dengan filter kolom (sama dengan)
+        dan rentang tanggal [start, end] yang diterapkan sebelum baris di-decode.
+        Tabel yang sudah dimuat dibaca dari memori, selain itu di-stream dari disk.
+        """
+        schema = self.schema[file_type]
+        field = schema.date_field
+        filters = list((filters or {}).items())
+        has_range = start is not None or end is not None
+
+        with self._write_lock:
+            table = self._cached_table(file_type)
+            if table is not None:
+                if has_range:
+                    rows = table.date_index(field, schema).range(start or datetime.min, end or datetime.max)
+                elif filters:
+                    # Indeks sekunder: hanya baris dengan nilai filter pertama yang disentuh
+                    rows = table.group(*filters[0])
+                else:
+                    rows = list(table.rows)
+        if table is not None:
+            for row in rows:
+                # Lock hanya dipegang selama satu baris disalin, bukan selama generator dipakai
+                with self._write_lock:
+                    if not all(row.get(column) == value for column, value in filters):
+                        continue
+                    if typed:
+                        # Penghapusan di antara dua baris membuang baris bertipe, decode ulang jika perlu
+                        table.decode_all(schema)
+                    copy = dict(table.typed_row(row)) if typed else dict(row)
+                yield copy
+            return
+
+        for row in self._stream_from_disk(file_type, start, end):
+            if not all(row.get(column) == value for column, value in filters):
+                continue
+            if has_range or typed:
+                typed_row = schema.decode(row)[0]
+                if has_range:
+                    tanggal = typed_row[field]
+                    if (tanggal is None or (start is not None and tanggal < start)
+                            or (end is not None and tanggal > end)):
+                        continue
+                yield typed_row if typed else row
+            else:
+                yield row
+
+    def _log_change(self, file_type: str, op: str, record: Dict) -> bool:
+        """Menerapkan mutasi ke tabel di memori lalu mencatatnya ke change log"""
+        row = self.csv_handler.to_row(record, self.field_definitions[file_type])
+
+        with self._write_lock:
+            table = self._table(file_type)
+            rollup = self._cached_rollup() if file_type in ROLLUP_TABLES else None
+            balances = self._cached_balances() if file_type == STOCK_LEDGER_TABLE else None
+            stats = self._cached_status_stats() if file_type == STATUS_HISTORY_TABLE else None
+            key_field = self.primary_keys[file_type]
+            current = table.lookup(key_field, row[key_field])
+            existed = current is not None
+            uow = self._unit_of_work
+            undo = self._undo_row(table, file_type, op, row, current) if uow is not None else None
+            if not self.change_log.apply(table, file_type, op, row):
+                return False
+            table.log_entries += 1
+
+            # Pembalik per data turunan, None jika data itu dihitung ulang (atau belum di-cache)
+            derived: List[Tuple[str, Optional[Callable[[], None]]]] = []
+            if file_type in ROLLUP_TABLES:
+                derived.append((self.rollup_path, self._update_rollup(rollup, file_type, op, row, existed)))
+            if file_type == STOCK_LEDGER_TABLE:
+                derived.append((self.balances_path, self._update_balances(balances, op, row, existed)))
+            if file_type == STATUS_HISTORY_TABLE:
+                derived.append((self.status_stats_path, self._update_status_stats(stats, op, row, existed)))
+
+            if uow is not None:
+                # Ditulis bersama perubahan lain saat transaksi di-commit, atau dibalik di memori saat rollback
+                uow.changes.append((file_type, op, row))
+                uow.undo.append(undo)
+                for path, undo_derived in derived:
+                    if undo_derived is None:
+                        uow.stale.add(path)
+                    else:
+                        uow.undo.append(undo_derived)
+                return True
+            return self._append_changes([(file_type, op, row)])
+
+    def _undo_row(self, table: CachedTable, file_type: str, op: str, row: Dict,
+                  current: Optional[Dict]) -> Callable[[], None]:
+        """Pembalik satu mutasi tabel di memori, disusun sebelum mutasi diterapkan"""
+        key_field = self.primary_keys[file_type]
+        disk_rows = table.disk_rows
+        # Salinan baris lama (update) atau daftar baris sebelum dihapus (delete, jarang terjadi)
+        previous = dict(current) if op == 'update' and current is not None else None
+        rows = list(table.rows) if op == 'delete' else None
+
+        def undo() -> None:
+            table.log_entries -= 1
+            if op == 'insert':
+                table.remove_last(row)
+            elif op == 'update':
+                table.update(key_field, row[key_field], previous)
+                table.disk_rows = disk_rows
+            else:
+                table.restore(rows, disk_rows)
+        return undo
+
+    def _append_changes(self, changes: List[Tuple[str, str, Dict]], txn_id: str = '') -> bool:
+        """Menulis perubahan ke change log dalam satu append dan menyinkronkan cache"""
+        log_path = self.change_log.file_path
+        before = TableCache.file_stamp(log_path)
+        written = self.change_log.append(changes, txn_id)
+
+        # Tabel di cache sudah memuat perubahan ini, cukup perbarui stempelnya.
+        # Jika penulisan gagal, semua tabel dipaksa dibaca ulang dari disk.
+        self.csv_handler.cache.touch(
+            log_path,
+            before,
+            TableCache.file_stamp(log_path) if written else None
+        )
+        if not written:
+            return False
+
+        file_types = {file_type for file_type, _, _ in changes}
+        if any(self._table(ft).log_entries >= self.COMPACTION_THRESHOLD for ft in file_types):
+            self._schedule_compaction()
+        return True
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: perubahan ke beberapa tabel di dalam blok langsung terlihat
+        di memori, lalu ditulis ke change log dalam satu append di akhir blok.
+        Jika blok melempar exception atau uow.rollback() dipanggil, tidak ada
+        yang ditulis ke disk.
+
+        Contoh:
+            with db.transaction() as uow:
+                if not (db.add_pesanan(...) and db.update_produk(...)):
+                    uow.rollback()
+            if uow.committed:
+                ...
+        """
+        with self._write_lock:
+            if self._unit_of_work is not None:
+                # Transaksi bersarang ikut di-commit bersama transaksi terluar
+                yield self._unit_of_work
+                return
+
+            uow = UnitOfWork(uuid.uuid4().hex)
+            self._unit_of_work = uow
+            try:
+                yield uow
+            except BaseException:
+                uow.rollback()
+                raise
+            finally:
+                self._unit_of_work = None
+                if uow.rolled_back:
+                    self._rollback_unit_of_work(uow)
+                else:
+                    uow.committed = self._commit_unit_of_work(uow)
+
+    def _commit_unit_of_work(self, uow: UnitOfWork) -> bool:
+        """Menulis seluruh perubahan unit of work sebagai satu transaksi di change log"""
+        if not uow.changes:
+            return True
+        return self._append_changes(uow.changes, uow.txn_id)
+
+    def _rollback_unit_of_work(self, uow: UnitOfWork) -> None:
+        """Membalik perubahan di memori dari yang terakhir, tanpa membaca ulang tabel dari disk"""
+        for undo in reversed(uow.undo):
+            undo()
+        for path in uow.stale:
+            self.csv_handler.cache.invalidate(path)
+
+    def _schedule_compaction(self) -> None:
+        """Menjalankan kompaksi change log di thread background"""
+        log_path = self.change_log.file_path
+        with self._write_lock:
+            if log_path in self._compacting:
+                return
+            self._compacting.add(log_path)
+
+        def run():
+            try:
+                self.compact()
+            finally:
+                with self._write_lock:
+                    self._compacting.discard(log_path)
+
+        # Bukan daemon agar proses tidak berhenti di tengah penulisan CSV
+        threading.Thread(target=run, name="compact-changes").start()
+
+    def compact(self) -> bool:
+        """Melipat change log ke file CSV utama lalu mengosongkan log"""
+        with self._write_lock:
+            # Entri log yang masih tertunda oleh group commit harus ada di disk dulu
+            self.csv_handler.flush()
+
+            log_stamp = TableCache.file_stamp(self.change_log.file_path)
+            if log_stamp is None:
+                return True
+            # Isi logis tabel tidak berubah, ringkasan dan saldo yang masih segar cukup distempel ulang
+            rollup = self._cached_rollup()
+            balances = self._cached_balances()
+            stats = self._cached_status_stats()
+
+            tables = {file_type: self._table(file_type) for file_type in self.file_paths}
+            for file_type, table in tables.items():
+                # Tabel tanpa entri di log tidak perlu ditulis ulang
+                if not table.log_entries:
+                    continue
+                if file_type in self.partitions:
+                    # Hanya partisi yang berisi baris yang berubah yang ditulis ulang
+                    written = self.partitions[file_type].compact(
+                        table, self.change_log.touched_keys(file_type)
+                    )
+                elif table.disk_rows is not None:
+                    # Log hanya berisi baris baru (misalnya buku besar mutasi): cukup di-append
+                    written = self.csv_handler._write_appends(
+                        self.file_paths[file_type],
+                        table.rows[table.disk_rows:],
+                        self.field_definitions[file_type],
+                        durable=True
+                    )
+                else:
+                    written = self.csv_handler.write_csv(
+                        self.file_paths[file_type],
+                        table.rows,
+                        self.field_definitions[file_type],
+                        durable=True
+                    )
+                if not written:
+                    return False
+                table.disk_rows = len(table.rows)
+
+            # Log hanya dihapus jika tidak ada proses lain yang menulis selama kompaksi.
+            # Jika ada, log dibiarkan; replay tetap idempoten terhadap CSV yang baru.
+            if TableCache.file_stamp(self.change_log.file_path) == log_stamp:
+                self.change_log.clear()
+                for file_type, table in tables.items():
+                    table.log_entries = 0
+                    if file_type in self.partitions:
+                        self.partitions[file_type].store(table, self.change_log)
+                    else:
+                        self.csv_handler.store_table(
+                            os.path.abspath(self.file_paths[file_type]), table, self.change_log
+                        )
+                if rollup is not None:
+                    self._store_rollup(rollup)
+                if balances is not None:
+                    # Checkpoint saldo: start berikutnya tidak perlu membaca ulang seluruh mutasi
+                    self._store_balances(balances)
+                if stats is not None:
+                    self._store_derived(self.status_stats_path, self._status_stats_files(), stats)
+        return True
+
+    # Data turunan (ringkasan penjualan, saldo stok, agregat status) di-cache dengan
+    # stempel file sumbernya dan disimpan ke disk saat kompaksi
+    def _cached_derived(self, path: str, files: Tuple):
+        """Data turunan di cache jika masih segar, tanpa membangunnya"""
+        return self.csv_handler.cache.peek(path, tuple(map(TableCache.file_stamp, files)))
+
+    def _store_derived(self, path: str, files: Tuple, derived) -> None:
+        """Menyimpan data turunan yang sinkron dengan isi file ke cache dan ke disk"""
+        stamp = tuple(map(TableCache.file_stamp, files))
+        self.csv_handler.cache.put(path, stamp, derived, files)
+        derived.save(path, stamp)
+
+    def _derived(self, path: str, files: Tuple, load: Callable, build: Callable):
+        """Data turunan dari cache, dari disk (load), atau dihitung dari tabel sumber (build)"""
+        with self._write_lock:
+            if self.csv_handler._pending:
+                self.csv_handler.flush()
+            stamp = tuple(map(TableCache.file_stamp, files))
+            derived = self.csv_handler.cache.get(path, stamp)
+            if derived is None:
+                derived = load(path, stamp)
+                if derived is None:
+                    derived = build()
+                self.csv_handler.cache.put(path, stamp, derived, files)
+            return derived
+
+    def _rollup_files(self) -> Tuple:
+        """File sumber ringkasan penjualan: tabel transaksi, pesanan dan change log"""
+        files = []
+        for file_type in ROLLUP_TABLES:
+            store = self.partitions.get(file_type)
+            if store is not None:
+                files += [store.manifest_path, store.partition_path(store.current_partition())]
+            else:
+                files.append(os.path.abspath(self.file_paths[file_type]))
+        files.append(self.change_log.file_path)
+        return tuple(files)
+
+    def _cached_rollup(self) -> Optional[DailySalesRollup]:
+        """Ringkasan penjualan di cache jika masih segar, tanpa membangunnya"""
+        return self._cached_derived(self.rollup_path, self._rollup_files())
+
+    def _store_rollup(self, rollup: DailySalesRollup) -> None:
+        """Menyimpan ringkasan yang sinkron dengan isi file ke cache dan ke disk"""
+        self._store_derived(self.rollup_path, self._rollup_files(), rollup)
+
+    def _build_rollup(self) -> DailySalesRollup:
+        """Menghitung ringkasan penjualan dari seluruh riwayat transaksi"""
+        pesanan_table = self._table('pesanan')
+        pesanan_table.decode_all(self.schema['pesanan'])
+        pesanan_index = pesanan_table.index('id_pesanan')
+
+        def pesanan_of(id_pesanan):
+            pesanan = pesanan_index.get(id_pesanan)
+            return pesanan_table.typed_row(pesanan) if pesanan is not None else None
+
+        transaksi_rows = self._table('transaksi').typed_rows(self.schema['transaksi'])
+        return DailySalesRollup.build(transaksi_rows, pesanan_of)
+
+    def _sales_rollup(self) -> DailySalesRollup:
+        """Ringkasan penjualan dari cache, dari disk, atau dibangun dari transaksi"""
+        return self._derived(self.rollup_path, self._rollup_files(), DailySalesRollup.load, self._build_rollup)
+
+    def _update_rollup(self, rollup: Optional[DailySalesRollup], file_type: str, op: str,
+                       row: Dict, existed: bool) -> Optional[Callable[[], None]]:
+        """
+        Menerapkan satu mutasi yang sudah berhasil ke ringkasan penjualan di cache.
+        Mengembalikan pembaliknya, atau None jika ringkasan belum di-cache atau dibangun ulang.
+        """
+        if rollup is None:
+            return None
+        if file_type == 'transaksi' and op == 'insert' and not existed:
+            # Transaksi baru cukup ditambahkan ke harinya, O(1)
+            pesanan = self._table('pesanan').lookup('id_pesanan', row['id_pesanan'])
+            transaksi = self.schema['transaksi'].decode(row)[0]
+            saved = rollup.checkpoint(transaksi)
+            rollup.add(transaksi, self.schema['pesanan'].decode(pesanan)[0] if pesanan is not None else None)
+            return lambda: rollup.restore(saved)
+        elif file_type == 'pesanan' and self._table('transaksi').lookup('id_pesanan', row['id_pesanan']) is None:
+            # Pesanan yang belum punya transaksi tidak mempengaruhi ringkasan
+            return lambda: None
+        else:
+            # Perubahan lain jarang terjadi, ringkasan dibangun ulang saat dibutuhkan
+            self.csv_handler.cache.invalidate(self.rollup_path)
+            return None
+
+    def rebuild_sales_rollup(self) -> int:
+        """Membangun ulang ringkasan penjualan harian dari riwayat, mengembalikan jumlah hari"""
+        with self._write_lock:
+            self.csv_handler.flush()
+            rollup = self._build_rollup()
+            self._store_rollup(rollup)
+            return len(rollup.dates)
+
+    def _balance_files(self) -> Tuple:
+        """File sumber saldo stok: buku besar mutasi dan change log"""
+        return (os.path.abspath(self.file_paths[STOCK_LEDGER_TABLE]), self.change_log.file_path)
+
+    def _cached_balances(self) -> Optional[StockBalances]:
+        """Saldo stok di cache jika masih segar, tanpa menghitungnya"""
+        return self._cached_derived(self.balances_path, self._balance_files())
+
+    def _store_balances(self, balances: StockBalances) -> None:
+        """Menyimpan saldo yang sinkron dengan isi file ke cache dan ke disk"""
+        self._store_derived(self.balances_path, self._balance_files(), balances)
+
+    def _stock_balances(self) -> StockBalances:
+        """Saldo stok dari cache, dari checkpoint, atau dihitung dari buku besar mutasi"""
+        return self._derived(
+            self.balances_path, self._balance_files(), StockBalances.load,
+            lambda: StockBalances.build(self._table(STOCK_LEDGER_TABLE).typed_rows(self.schema[STOCK_LEDGER_TABLE]))
+        )
+
+    def _update_balances(self, balances: Optional[StockBalances], op: str, row: Dict,
+                         existed: bool) -> Optional[Callable[[], None]]:
+        """Menerapkan satu mutasi yang sudah berhasil ke saldo di cache, mengembalikan pembaliknya"""
+        if balances is None:
+            return None
+        if op == 'insert' and not existed:
+            mutasi = self.schema[STOCK_LEDGER_TABLE].decode(row)[0]
+            saved = balances.get(mutasi['id_produk'])
+            balances.add(mutasi['id_produk'], mutasi['delta'])
+            return lambda: balances.restore(mutasi['id_produk'], saved)
+        # Buku besar append-only; perubahan lain (misalnya replay ulang) dihitung ulang saat dibutuhkan
+        self.csv_handler.cache.invalidate(self.balances_path)
+        return None
+
+    def _status_stats_files(self) -> Tuple:
+        """File sumber agregat status: riwayat status pesanan dan change log"""
+        return (os.path.abspath(self.file_paths[STATUS_HISTORY_TABLE]), self.change_log.file_path)
+
+    def _cached_status_stats(self) -> Optional[OrderStatusStats]:
+        """Agregat status di cache jika masih segar, tanpa menghitungnya"""
+        return self._cached_derived(self.status_stats_path, self._status_stats_files())
+
+    def _status_stats(self) -> OrderStatusStats:
+        """Agregat status dari cache, dari disk, atau dihitung dari riwayat status"""
+        return self._derived(
+            self.status_stats_path, self._status_stats_files(), OrderStatusStats.load,
+            lambda: OrderStatusStats.build(
+                self._table(STATUS_HISTORY_TABLE).typed_rows(self.schema[STATUS_HISTORY_TABLE])
+            )
+        )
+
+    def _update_status_stats(self, stats: Optional[OrderStatusStats], op: str, row: Dict,
+                             existed: bool) -> Optional[Callable[[], None]]:
+        """Menerapkan satu event status yang sudah berhasil ke agregat di cache, mengembalikan pembaliknya"""
+        if stats is None:
+            return None
+        if op == 'insert' and not existed:
+            event = self.schema[STATUS_HISTORY_TABLE].decode(row)[0]
+            saved = stats.checkpoint(event)
+            stats.add(event)
+            return lambda: stats.restore(saved)
+        # Riwayat append-only; perubahan lain dihitung ulang saat dibutuhkan
+        self.csv_handler.cache.invalidate(self.status_stats_path)
+        return None
+
+    def _saldo_stok(self, id_produk: str) -> Optional[int]:
+        """Saldo stok produk dari buku besar, None jika produk belum punya mutasi"""
+        return self._stock_balances().get(id_produk)
+
+    def _tail(self, file_type: str, limit: Optional[int] = None, typed: bool = False) -> List[Dict]:
+        """Salinan baris terakhir tabel sesuai urutan penyisipan"""
+        with self._write_lock:
+            table = self._table(file_type)
+            rows = table.rows[-limit:] if limit else table.rows
+            if typed:
+                table.decode_all(self.schema[file_type])
+                rows = [table.typed_row(row) for row in rows]
+            return [dict(row) for row in rows]
+
+    def _succeeded(self, uow: UnitOfWork) -> bool:
+        """Hasil transaksi: sudah di-commit, atau belum di-rollback jika masih bersarang di transaksi lain"""
+        return uow.committed or (self._unit_of_work is uow and not uow.rolled_back)
+
+    def new_id(self, prefix: str) -> str:
+        """Membuat ID baru yang unik, misalnya new_id('TRX')"""
+        return self.id_allocator.next_id(prefix)
+
     # Operasi Produk
     def get_all_produk(self) -> List[Dict]:
         """Mengambil semua data produk"""
-        return self.csv_handler.read_csv(self.file_paths['produk'])
+        return self._rows('produk')
+
+    def get_all_produk_typed(self) -> List[Dict]:
+        """Mengambil semua data produk dengan harga/stok/tanggal sudah bertipe"""
+        return self._typed_rows('produk')
+
+    def search_produk(self, keyword: str, kategori: Optional[str] = None,
+                      typed: bool = False) -> List[Dict]:
+        """
+        Mencari produk yang nama atau kategorinya memuat awalan setiap kata
+        keyword, sesuai urutan katalog. Keyword kosong mengembalikan semua produk.
+        """
+        where = {'kategori': kategori} if kategori else None
+        return self._search('produk', PRODUK_SEARCH_FIELDS, keyword, where, typed)
+
+    def search_produk_ranked(self, keyword: str, kategori: Optional[str] = None,
+                             limit: Optional[int] = None, popularity: Optional[Dict[str, float]] = None,
+                             typed: bool = False) -> List[Dict]:
+        """
+        Mencari produk dengan toleransi salah ketik, diurutkan dari kecocokan
+        terbaik. popularity (id_produk -> 0..1, misalnya kecepatan penjualan)
+        ditambahkan ke skor kecocokan; keyword kosong mengurutkan berdasarkan
+        popularity saja.
+        """
+        where = {'kategori': kategori} if kategori else None
+        return self._search_ranked('produk', PRODUK_SEARCH_FIELDS, keyword, limit, popularity, where, typed)
+
+    def iter_produk(self, typed: bool = False) -> Iterator[Dict]:
+        """Menghasilkan produk satu per satu tanpa menyalin seluruh tabel"""
+        return self._iter('produk', typed=typed)
 
     def get_produk(self, id_produk: str) -> Optional[List[Dict]]:
         """Mengambil data produk berdasarkan ID"""
-        products = self.get_all_produk()
-        return [product for product in products if product['id_produk'] == id_produk]
+        product = self.get_produk_by_id(id_produk)
+        return [product] if product else []
+
+    def get_produk_by_id(self, id_produk: str) -> Optional[Dict]:
+        """Mengambil satu produk berdasarkan ID"""
+        return self._get_by_id('produk', id_produk)
     
+    def _produk_record(self, produk_data: Dict, now: str) -> Optional[Dict]:
+        """Memvalidasi data produk baru dan menyusun record-nya, None jika tidak valid"""
+        # Validasi data
+        required_fields = ['nama_produk', 'kategori', 'harga', 'stok']
+        for field in required_fields:
+            if not produk_data.get(field):
+                print(f"Missing required field: {field}")
+                return None
+
+        # Gunakan ID yang ada atau generate baru
+        return {
+            'id_produk': produk_data.get('id_produk') or self.new_id('PRD'),
+            'nama_produk': produk_data.get('nama_produk'),
+            'kategori': produk_data.get('kategori'),
+            'harga': float(produk_data.get('harga', 0)),
+            'stok': int(produk_data.get('stok', 0)),
+            'created_at': now,
+            'updated_at': now
+        }
+
+    def _add_many(self, file_type: str, records: List[Optional[Dict]]) -> bool:
+        """
+        Menulis banyak record baru sebagai satu transaksi (satu append ke change
+        log). Jika ada record yang tidak valid atau ID ganda, tidak ada yang ditulis.
+        """
+        if not self._storage_exists(file_type):
+            print("Database file not found")
+            return False
+        if any(record is None for record in records):
+            return False
+
+        key_field = self.primary_keys[file_type]
+        seen = set()
+        for record in records:
+            if record[key_field] in seen:
+                print(f"Duplicate {key_field}: {record[key_field]}")
+                return False
+            seen.add(record[key_field])
+
+        with self.transaction() as uow:
+            # ID yang sudah ada di tabel juga ditolak sebelum apa pun ditulis
+            existing = self._existing_keys(file_type, list(seen))
+            if existing:
+                print(f"Duplicate {key_field}: {', '.join(sorted(existing)[:5])}")
+                uow.rollback()
+                return False
+
+            for record in records:
+                if not self._log_change(file_type, 'insert', record):
+                    uow.rollback()
+                    break
+        return self._succeeded(uow)
+
     def add_produk(self, produk_data: Dict) -> bool:
         """Menambahkan produk baru"""
         try:
-            # Validasi data
-            required_fields = ['nama_produk', 'kategori', 'harga', 'stok']
-            for field in required_fields:
-                if not produk_data.get(field):
-                    print(f"Missing required field: {field}")
-                    return False
-
             # Pastikan file ada
-            if not os.path.exists(self.file_paths['produk']):
+            if not self._storage_exists('produk'):
                 print("Database file not found")
                 return False
 
-            # Gunakan ID yang ada atau generate baru
-            new_id = produk_data.get('id_produk') or f"PRD{datetime.now().strftime('%Y%m%d%H%M%S')}"
-            now = datetime.now().isoformat()
-
-            record = {
-                'id_produk': new_id,
-                'nama_produk': produk_data.get('nama_produk'),
-                'kategori': produk_data.get('kategori'),
-                'harga': float(produk_data.get('harga', 0)),
-                'stok': int(produk_data.get('stok', 0)),
-                'created_at': now,
-                'updated_at': now
-            }
+            record = self._produk_record(produk_data, datetime.now().isoformat())
+            if record is None:
+                return False
 
-            return self.csv_handler.append_csv(
-                self.file_paths['produk'],
-                record,
-                self.field_definitions['produk']
-            )
+            # Produk dan saldo awalnya di buku besar ditulis bersama
+            with self.transaction() as uow:
+                if not (self._log_change('produk', 'insert', record)
+                        and self._add_many(STOCK_LEDGER_TABLE, self._saldo_awal_records([record]))):
+                    uow.rollback()
+            return self._succeeded(uow)
 
         except Exception as e:
             print(f"Error adding product: {str(e)}")
             return False
 
+    def add_produk_many(self, produk_list: List[Dict]) -> bool:
+        """Menambahkan banyak produk sekaligus dalam satu penulisan"""
+        try:
+            now = datetime.now().isoformat()
+            records = [self._produk_record(data, now) for data in produk_list]
+            with self.transaction() as uow:
+                if not (self._add_many('produk', records)
+                        and self._add_many(STOCK_LEDGER_TABLE, self._saldo_awal_records(records))):
+                    uow.rollback()
+            return self._succeeded(uow)
+        except Exception as e:
+            print(f"Error adding products: {str(e)}")
+            return False
+
     def update_produk(self, id_produk: str, updated_data: Dict) -> bool:
         """Memperbarui data produk"""
         try:
-            products = self.get_all_produk()
-            updated = False
+            product = self.get_produk_by_id(id_produk)
+            if product is None:
+                return False
+
             now = datetime.now().isoformat()
 
-            for product in products:
-                if product['id_produk'] == id_produk:
-                    # Only update fields that are in field_definitions
-                    valid_fields = {
-                        k: v for k, v in updated_data.items() 
-                        if k in self.field_definitions['produk']
-                    }
+            # Only update fields that are in field_definitions
+            valid_fields = {
+                k: v for k, v in updated_data.items() 
+                if k in self.field_definitions['produk']
+            }
 
-                    # Ensure all required fields exist
-                    updated_product = {
-                        'id_produk': product['id_produk'],
-                        'nama_produk': valid_fields.get('nama_produk', product['nama_produk']),
-                        'kategori': valid_fields.get('kategori', product['kategori']),
-                        'harga': valid_fields.get('harga', product['harga']),
-                        'stok': valid_fields.get('stok', product['stok']),
-                        'created_at': product.get('created_at', now),
-                        'updated_at': now
-                    }
+            # Ensure all required fields exist
+            updated_product = {
+                'id_produk': product['id_produk'],
+                'nama_produk': valid_fields.get('nama_produk', product['nama_produk']),
+                'kategori': valid_fields.get('kategori', product['kategori']),
+                'harga': valid_fields.get('harga', product['harga']),
+                'stok': product['stok'],
+                'created_at': product.get('created_at', now),
+                'updated_at': now
+            }
 
-                    # Replace the old product data with updated data
-                    products[products.index(product)] = updated_product
-                    updated = True
-                    break
+            if 'stok' in valid_fields:
+                # Parser kolom int schema, sama seperti saat tabel dimuat (menerima '12.0', menolak '12.5')
+                try:
+                    stok = PARSERS[int][0](str(valid_fields['stok']))
+                except ValueError:
+                    print(f"Stok tidak valid: {valid_fields['stok']!r}")
+                    return False
+                # Stok absolut dicatat sebagai koreksi terhadap saldo di buku besar
+                return self._write_mutasi(id_produk, ALASAN_KOREKSI, stok=stok, product=updated_product)
 
-            if updated:
-                return self.csv_handler.write_csv(
-                    self.file_paths['produk'],
-                    products,
-                    self.field_definitions['produk']
-                )
-            return False
+            # Replace the old product data with updated data
+            return self._log_change('produk', 'update', updated_product)
 
         except Exception as e:
             print(f"Error updating product: {str(e)}")
@@ -213,105 +1888,286 @@ class DatabaseManager:
 
     def delete_produk(self, id_produk: str) -> bool:
         """Menghapus produk"""
-        products = self.get_all_produk()
-        initial_length = len(products)
-        products = [p for p in products if p['id_produk'] != id_produk]
-        
-        if len(products) < initial_length:
-            return self.csv_handler.write_csv(
-                self.file_paths['produk'],
-                products,
-                self.field_definitions['produk']
-            )
-        return False
+        return self._log_change('produk', 'delete', {'id_produk': id_produk})
+
+    # Buku Besar Stok
+    def _mutasi_record(self, id_produk: str, delta: int, alasan: str, ref_id: str = '',
+                       tanggal: Optional[str] = None) -> Dict:
+        """Menyusun satu baris mutasi stok; saldo awal memakai ID tetap agar penulisan ulang idempoten"""
+        return {
+            'id_mutasi': f"AWAL-{id_produk}" if alasan == ALASAN_SALDO_AWAL else self.new_id('MUT'),
+            'id_produk': id_produk,
+            'delta': delta,
+            'alasan': alasan,
+            'ref_id': ref_id,
+            'tanggal': tanggal or datetime.now().isoformat()
+        }
+
+    def _saldo_awal_records(self, produk_records: List[Optional[Dict]]) -> List[Optional[Dict]]:
+        """
+        Mutasi yang membawa saldo produk ke stok awalnya: saldo awal untuk produk
+        baru, koreksi jika ID produk sudah punya mutasi. None tetap None agar
+        validasi _add_many gagal.
+        """
+        records = []
+        for record in produk_records:
+            if record is None:
+                records.append(None)
+                continue
+            saldo = self._saldo_stok(record['id_produk'])
+            if saldo is None:
+                records.append(self._mutasi_record(
+                    record['id_produk'], record['stok'], ALASAN_SALDO_AWAL, tanggal=record['created_at']
+                ))
+            elif record['stok'] != saldo:
+                records.append(self._mutasi_record(record['id_produk'], record['stok'] - saldo, ALASAN_KOREKSI))
+        return records
+
+    def _write_mutasi(self, id_produk: str, alasan: str, ref_id: str = '', delta: Optional[int] = None,
+                      stok: Optional[int] = None, product: Optional[Dict] = None) -> bool:
+        """
+        Mencatat mutasi stok (delta, atau stok absolut yang diubah menjadi delta)
+        dan memperbarui kolom stok produk dari saldo baru dalam satu transaksi.
+        Saldo dibaca dan ditambah di bawah write lock sehingga dua perubahan
+        stok yang bersamaan tidak saling menimpa.
+        """
+        with self.transaction() as uow:
+            current = self.get_produk_by_id(id_produk)
+            if current is None:
+                print(f"Produk {id_produk} tidak ditemukan")
+                uow.rollback()
+                return False
+
+            records = []
+            saldo = self._saldo_stok(id_produk)
+            if saldo is None:
+                # Produk tanpa mutasi (misalnya ditambahkan di luar aplikasi): stok saat ini jadi saldo awal
+                saldo = PARSERS[int][0](current['stok'] or '0')
+                records.append(self._mutasi_record(id_produk, saldo, ALASAN_SALDO_AWAL))
+
+            if delta is None:
+                delta = stok - saldo
+            if saldo + delta < 0:
+                print("Stok tidak mencukupi")
+                uow.rollback()
+                return False
+            if delta:
+                records.append(self._mutasi_record(id_produk, delta, alasan, ref_id))
+
+            updated_product = dict(product or current)
+            updated_product['stok'] = saldo + delta
+            updated_product['updated_at'] = datetime.now().isoformat()
+            if not (all(self._log_change(STOCK_LEDGER_TABLE, 'insert', record) for record in records)
+                    and self._log_change('produk', 'update', updated_product)):
+                uow.rollback()
+        return self._succeeded(uow)
+
+    def get_stok(self, id_produk: str) -> Optional[int]:
+        """Stok produk dari saldo buku besar, None jika produk tidak ada"""
+        saldo = self._saldo_stok(id_produk)
+        if saldo is not None:
+            return saldo
+        product = self._get_by_id('produk', id_produk)
+        return self.schema['produk'].decode(product)[0]['stok'] if product is not None else None
+
+    def add_mutasi_stok(self, id_produk: str, delta: int, alasan: str, ref_id: str = '') -> bool:
+        """Menambah (delta positif) atau mengurangi stok produk, gagal jika stok menjadi negatif"""
+        try:
+            return self._write_mutasi(id_produk, alasan, ref_id, delta=int(delta))
+        except Exception as e:
+            print(f"Error updating stock: {str(e)}")
+            return False
+
+    def get_riwayat_stok(self, id_produk: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Riwayat mutasi stok terbaru lebih dulu, satu produk (melalui indeks id_produk)
+        atau semua produk. Setiap baris diberi stok_akhir, yaitu saldo setelah mutasi itu.
+        """
+        if id_produk is not None:
+            rows = self._group(STOCK_LEDGER_TABLE, 'id_produk', id_produk, typed=True)
+            if limit:
+                rows = rows[-limit:]
+        else:
+            rows = self._tail(STOCK_LEDGER_TABLE, limit, typed=True)
+
+        # Saldo akhir dihitung mundur dari saldo saat ini
+        saldo: Dict[str, int] = {}
+        for row in reversed(rows):
+            key = row['id_produk']
+            if key not in saldo:
+                saldo[key] = self._saldo_stok(key) or 0
+            row['stok_akhir'] = saldo[key]
+            saldo[key] -= row['delta']
+        rows.reverse()
+        return rows
     
     # Operasi Pesanan
     def get_all_pesanan(self) -> List[Dict]:
         """Mengambil semua data pesanan"""
-        return self.csv_handler.read_csv(self.file_paths['pesanan'])
+        return self._rows('pesanan')
+
+    def get_all_pesanan_typed(self) -> List[Dict]:
+        """Mengambil semua data pesanan dengan jumlah/harga/tanggal sudah bertipe"""
+        return self._typed_rows('pesanan')
+
+    def get_pesanan_by_status(self, status: str, typed: bool = False) -> List[Dict]:
+        """Mengambil pesanan dengan status tertentu melalui indeks status"""
+        return self._group('pesanan', 'status', status, typed)
+
+    def count_pesanan_by_status(self, status: str) -> int:
+        """Menghitung pesanan dengan status tertentu, misalnya jumlah pesanan Pending"""
+        return self._group_count('pesanan', 'status', status)
+
+    def get_pesanan_by_produk(self, id_produk: str, typed: bool = False) -> List[Dict]:
+        """Mengambil semua pesanan untuk satu produk melalui indeks id_produk"""
+        return self._group('pesanan', 'id_produk', id_produk, typed)
+
+    def iter_pesanan(self, status: Optional[str] = None, since: Optional[datetime] = None,
+                     typed: bool = False) -> Iterator[Dict]:
+        """Menghasilkan pesanan satu per satu, opsional hanya status tertentu dan sejak tanggal tertentu"""
+        return self._iter('pesanan', start=since, filters={'status': status} if status else None, typed=typed)
+
+    def get_pesanan_by_id(self, id_pesanan: str) -> Optional[Dict]:
+        """Mengambil satu pesanan berdasarkan ID"""
+        return self._get_by_id('pesanan', id_pesanan)
+    
+    def get_pesanan_range(self, start: datetime, end: datetime, typed: bool = False) -> List[Dict]:
+        """Mengambil pesanan dengan tanggal_pesanan di antara start dan end (inklusif)"""
+        return self._range('pesanan', start, end, typed)
     
+    def _pesanan_record(self, pesanan_data: Dict) -> Optional[Dict]:
+        """Memvalidasi data pesanan baru dan menyusun record-nya, None jika tidak valid"""
+        # Validasi data
+        required_fields = ['id_pesanan', 'id_pelanggan', 'id_produk', 'jumlah_dipesan', 'total_harga', 'status', 'tanggal_pesanan']
+        for field in required_fields:
+            if field not in pesanan_data:
+                print(f"Missing required field: {field}")
+                return None
+
+        return {
+            'id_pesanan': pesanan_data['id_pesanan'],
+            'id_pelanggan': pesanan_data['id_pelanggan'], 
+            'id_produk': pesanan_data['id_produk'],
+            'jumlah_dipesan': int(pesanan_data['jumlah_dipesan']),
+            'total_harga': float(pesanan_data['total_harga']),
+            'status': pesanan_data['status'],
+            'tanggal_pesanan': pesanan_data['tanggal_pesanan']
+        }
+
     def add_pesanan(self, pesanan_data: Dict) -> bool:
         """Menambahkan pesanan baru"""
         try:
-            # Validasi data
-            required_fields = ['id_pesanan', 'id_pelanggan', 'id_produk', 'jumlah_dipesan', 'total_harga', 'status', 'tanggal_pesanan']
-            for field in required_fields:
-                if field not in pesanan_data:
-                    print(f"Missing required field: {field}")
-                    return False
-    
             # Pastikan file ada
-            if not os.path.exists(self.file_paths['pesanan']):
+            if not self._storage_exists('pesanan'):
                 print("Database file not found")
                 return False
     
-            record = {
-                'id_pesanan': pesanan_data['id_pesanan'],
-                'id_pelanggan': pesanan_data['id_pelanggan'], 
-                'id_produk': pesanan_data['id_produk'],
-                'jumlah_dipesan': int(pesanan_data['jumlah_dipesan']),
-                'total_harga': float(pesanan_data['total_harga']),
-                'status': pesanan_data['status'],
-                'tanggal_pesanan': pesanan_data['tanggal_pesanan']
-            }
+            record = self._pesanan_record(pesanan_data)
+            if record is None:
+                return False
     
-            return self.csv_handler.append_csv(
-                self.file_paths['pesanan'],
-                record,
-                self.field_definitions['pesanan']
-            )
+            # Pesanan dan event pembuatannya di riwayat status ditulis bersama
+            with self.transaction() as uow:
+                if not (self._log_change('pesanan', 'insert', record)
+                        and self._log_change(STATUS_HISTORY_TABLE, 'insert', self._status_record(record))):
+                    uow.rollback()
+            return self._succeeded(uow)
             
         except Exception as e:
             print(f"Error adding order: {str(e)}")
             return False
 
+    def add_pesanan_many(self, pesanan_list: List[Dict]) -> bool:
+        """Menambahkan banyak pesanan sekaligus; pesanan tanpa id_pesanan diberi ID baru"""
+        try:
+            records = [
+                self._pesanan_record(
+                    data if data.get('id_pesanan') else dict(data, id_pesanan=self.new_id('PSN'))
+                )
+                for data in pesanan_list
+            ]
+            with self.transaction() as uow:
+                if not (self._add_many('pesanan', records) and self._add_many(
+                    STATUS_HISTORY_TABLE, [self._status_record(record) for record in records if record is not None]
+                )):
+                    uow.rollback()
+            return self._succeeded(uow)
+        except Exception as e:
+            print(f"Error adding orders: {str(e)}")
+            return False
+
         
+    def _status_record(self, pesanan: Dict, status_lama: str = '', status: Optional[str] = None,
+                       tanggal: Optional[str] = None, id_status: Optional[str] = None) -> Dict:
+        """
+        Menyusun satu event perubahan status. Tanpa status_lama berarti pesanan
+        baru, dicatat pada tanggal pesanan dengan ID tetap agar penulisan ulang idempoten.
+        """
+        if not status_lama:
+            status = status or pesanan['status']
+            tanggal = pesanan['tanggal_pesanan'] if tanggal is None else tanggal
+            id_status = id_status or f"BUAT-{pesanan['id_pesanan']}"
+        return {
+            'id_status': id_status or self.new_id('STS'),
+            'id_pesanan': pesanan['id_pesanan'],
+            'id_produk': pesanan['id_produk'],
+            'status_lama': status_lama,
+            'status': status,
+            'tanggal': datetime.now().isoformat() if tanggal is None else tanggal
+        }
+
+    def _write_pesanan(self, pesanan: Dict, lama: Dict) -> bool:
+        """Menulis pesanan yang diubah beserta event status jika status atau produknya berubah"""
+        changed = pesanan['status'] != lama['status'] or pesanan['id_produk'] != lama['id_produk']
+        with self.transaction() as uow:
+            if not self._log_change('pesanan', 'update', pesanan):
+                uow.rollback()
+            elif changed and not self._log_change(
+                STATUS_HISTORY_TABLE, 'insert', self._status_record(pesanan, lama['status'], pesanan['status'])
+            ):
+                uow.rollback()
+        return self._succeeded(uow)
+
+    def get_riwayat_status(self, id_pesanan: str) -> List[Dict]:
+        """Riwayat status satu pesanan (terlama lebih dulu) melalui indeks id_pesanan"""
+        return self._group(STATUS_HISTORY_TABLE, 'id_pesanan', id_pesanan, typed=True)
+
+    def get_waktu_penyelesaian(self, start_date: datetime, end_date: datetime) -> List[Dict]:
+        """Rata-rata waktu dari Pending sampai Selesai (detik) per tanggal selesai di [start_date, end_date]"""
+        return self._status_stats().waktu_selesai(start_date, end_date)
+
+    def get_tingkat_pembatalan(self, limit: Optional[int] = None) -> List[Dict]:
+        """Jumlah pesanan, jumlah dibatalkan dan tingkat pembatalan per produk, tertinggi lebih dulu"""
+        result = self._status_stats().pembatalan()
+        return result[:limit] if limit else result
+
     def update_pesanan_status(self, id_pesanan: str, status: str) -> bool:
         """Memperbarui status pesanan"""
-        pesanan_list = self.get_all_pesanan()
-        updated = False
-        
-        for pesanan in pesanan_list:
-            if pesanan['id_pesanan'] == id_pesanan:
-                pesanan['status'] = status
-                updated = True
-                break
+        pesanan = self.get_pesanan_by_id(id_pesanan)
+        if pesanan is None:
+            return False
                 
-        if updated:
-            return self.csv_handler.write_csv(
-                self.file_paths['pesanan'],
-                pesanan_list,
-                self.field_definitions['pesanan']
-            )
-        return False
+        return self._write_pesanan(dict(pesanan, status=status), pesanan)
     
     def update_pesanan(self, updated_data: Dict) -> bool:
         """Memperbarui data pesanan"""
         try:
-            pesanan_list = self.get_all_pesanan()
-            updated = False
+            pesanan = self.get_pesanan_by_id(updated_data['id_pesanan'])
+            if pesanan is None:
+                return False
             
-            for pesanan in pesanan_list:
-                if pesanan['id_pesanan'] == updated_data['id_pesanan']:
-                    # Update data yang diperlukan
-                    pesanan.update({
-                        'id_pelanggan': updated_data.get('id_pelanggan', pesanan['id_pelanggan']),
-                        'id_produk': updated_data.get('id_produk', pesanan['id_produk']),
-                        'jumlah_dipesan': updated_data.get('jumlah_dipesan', pesanan['jumlah_dipesan']),
-                        'total_harga': updated_data.get('total_harga', pesanan['total_harga']),
-                        'status': updated_data.get('status', pesanan['status']),
-                        'tanggal_pesanan': updated_data.get('tanggal_pesanan', pesanan['tanggal_pesanan'])
-                    })
-                    updated = True
-                    break
+            # Update data yang diperlukan
+            updated_pesanan = dict(pesanan)
+            updated_pesanan.update({
+                'id_pelanggan': updated_data.get('id_pelanggan', pesanan['id_pelanggan']),
+                'id_produk': updated_data.get('id_produk', pesanan['id_produk']),
+                'jumlah_dipesan': updated_data.get('jumlah_dipesan', pesanan['jumlah_dipesan']),
+                'total_harga': updated_data.get('total_harga', pesanan['total_harga']),
+                'status': updated_data.get('status', pesanan['status']),
+                'tanggal_pesanan': updated_data.get('tanggal_pesanan', pesanan['tanggal_pesanan'])
+            })
                 
-            if updated:
-                return self.csv_handler.write_csv(
-                    self.file_paths['pesanan'],
-                    pesanan_list,
-                    self.field_definitions['pesanan']
-                )
-            return False
+            return self._write_pesanan(updated_pesanan, pesanan)
         
         except Exception as e:
             print(f"Error updating order: {str(e)}")
@@ -320,24 +2176,68 @@ class DatabaseManager:
     # Operasi Transaksi
     def get_all_transaksi(self) -> List[Dict]:
         """Mengambil semua data transaksi"""
-        return self.csv_handler.read_csv(self.file_paths['transaksi'])
+        return self._rows('transaksi')
+
+    def get_all_transaksi_typed(self) -> List[Dict]:
+        """Mengambil semua data transaksi dengan harga/tanggal sudah bertipe"""
+        return self._typed_rows('transaksi')
+
+    def iter_transaksi(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       typed: bool = False) -> Iterator[Dict]:
+        """Menghasilkan transaksi satu per satu, opsional hanya tanggal_transaksi di [start, end]"""
+        return self._iter('transaksi', start=start, end=end, typed=typed)
+
+    def get_transaksi_by_id(self, id_transaksi: str) -> Optional[Dict]:
+        """Mengambil satu transaksi berdasarkan ID"""
+        return self._get_by_id('transaksi', id_transaksi)
+    
+    def get_transaksi_range(self, start: datetime, end: datetime, typed: bool = False) -> List[Dict]:
+        """Mengambil transaksi dengan tanggal_transaksi di antara start dan end (inklusif)"""
+        return self._range('transaksi', start, end, typed)
     
     def add_transaksi(self, transaksi_data: Dict) -> bool:
         """Menambahkan transaksi baru"""
-        return self.csv_handler.append_csv(
-            self.file_paths['transaksi'],
-            transaksi_data,
-            self.field_definitions['transaksi']
-        )
+        return self._log_change('transaksi', 'insert', transaksi_data)
+
+    def add_transaksi_many(self, transaksi_list: List[Dict]) -> bool:
+        """Menambahkan banyak transaksi sekaligus; transaksi tanpa id_transaksi diberi ID baru"""
+        try:
+            required_fields = ['id_pesanan', 'total_harga', 'metode_pembayaran', 'tanggal_transaksi']
+            records = []
+            for data in transaksi_list:
+                missing = [field for field in required_fields if field not in data]
+                if missing:
+                    print(f"Missing required field: {missing[0]}")
+                    return False
+                records.append({
+                    'id_transaksi': data.get('id_transaksi') or self.new_id('TRX'),
+                    'id_pesanan': data['id_pesanan'],
+                    'total_harga': float(data['total_harga']),
+                    'metode_pembayaran': data['metode_pembayaran'],
+                    'tanggal_transaksi': data['tanggal_transaksi']
+                })
+            return self._add_many('transaksi', records)
+        except Exception as e:
+            print(f"Error adding transactions: {str(e)}")
+            return False
     
     # Laporan dan Analisis
     def generate_laporan_penjualan(self, start_date: datetime, end_date: datetime) -> Dict:
         """Membuat laporan penjualan untuk periode tertentu"""
         try:
-            # Load all transactions, orders, and products
-            transaksi_list = self.get_all_transaksi()
-            pesanan_list = self.get_all_pesanan()
-            produk_list = self.get_all_produk()
+            # Dipanggil dari thread background: transaksi, pesanan dan produk disalin
+            # dalam satu lock agar konsisten dan tidak diubah penulisan dari thread Tk
+            with self._write_lock:
+                # Indeks tanggal terurut: hanya transaksi di dalam periode yang disentuh
+                transaksi_list = self._range('transaksi', start_date, end_date)
+                # Indeks hash pesanan dan produk, join cukup O(1) per transaksi. Pesanan
+                # dibuat sebelum transaksinya, jadi cukup partisi sampai end_date.
+                pesanan_index = self._lookup_many(
+                    'pesanan', {transaksi['id_pesanan'] for transaksi in transaksi_list}, end_date
+                )
+                produk_index = self._lookup_many(
+                    'produk', {pesanan['id_produk'] for pesanan in pesanan_index.values()}
+                )
 
             if not transaksi_list:
                 return {
@@ -351,34 +2251,22 @@ class DatabaseManager:
 
             for transaksi in transaksi_list:
                 try:
-                    # Cari data pesanan terkait
-                    pesanan = next(
-                        (p for p in pesanan_list if p['id_pesanan'] == transaksi['id_pesanan']),
-                        None
-                    )
-
-                    if pesanan:
-                        # Cari data produk terkait
-                        produk = next(
-                            (p for p in produk_list if p['id_produk'] == pesanan['id_produk']),
-                            None
-                        )
+                    # Cari data pesanan dan produk terkait
+                    pesanan = pesanan_index.get(transaksi['id_pesanan'])
+                    produk = produk_index.get(pesanan['id_produk']) if pesanan else None
 
-                    tanggal = datetime.fromisoformat(transaksi['tanggal_transaksi'])
-
-                    if start_date <= tanggal <= end_date:
-                        data = {
-                            'id_transaksi': transaksi['id_transaksi'],
-                            'tanggal_transaksi': transaksi['tanggal_transaksi'],
-                            'id_pelanggan': pesanan['id_pelanggan'] if pesanan else '-',
-                            'nama_produk': produk['nama_produk'] if produk else '-',
-                            'jumlah': pesanan['jumlah_dipesan'] if pesanan else 1,
-                            'total_harga': float(transaksi['total_harga']),
-                            'metode_pembayaran': transaksi.get('metode_pembayaran', 'Tunai')
-                        }
+                    data = {
+                        'id_transaksi': transaksi['id_transaksi'],
+                        'tanggal_transaksi': transaksi['tanggal_transaksi'],
+                        'id_pelanggan': pesanan['id_pelanggan'] if pesanan else '-',
+                        'nama_produk': produk['nama_produk'] if produk else '-',
+                        'jumlah': pesanan['jumlah_dipesan'] if pesanan else 1,
+                        'total_harga': float(transaksi['total_harga']),
+                        'metode_pembayaran': transaksi.get('metode_pembayaran', 'Tunai')
+                    }
 
-                        filtered_data.append(data)
-                        total_penjualan += float(transaksi['total_harga'])
+                    filtered_data.append(data)
+                    total_penjualan += data['total_harga']
 
                 except (KeyError, ValueError) as e:
                     print(f"Error processing transaction: {str(e)}, Transaction ID: {transaksi.get('id_transaksi')}")
@@ -398,27 +2286,80 @@ class DatabaseManager:
                 'transaksi_list': []
             }
     
+    def get_penjualan_harian(self, start_date: datetime, end_date: datetime) -> List[Dict]:
+        """
+        Ringkasan penjualan per hari (pendapatan, jumlah_transaksi, unit_produk,
+        metode_pembayaran) untuk tanggal di [start_date, end_date]
+        """
+        # range() menyalin setiap hari; dikunci karena rollup diubah in-place oleh penulisan
+        with self._write_lock:
+            return self._sales_rollup().range(start_date, end_date)
+
+    def get_ringkasan_penjualan(self, start_date: datetime, end_date: datetime) -> Dict:
+        """Total penjualan dan jumlah transaksi per tanggal di [start_date, end_date] dari ringkasan harian"""
+        harian = self.get_penjualan_harian(start_date, end_date)
+        return {
+            'total_penjualan': sum(hari['pendapatan'] for hari in harian),
+            'jumlah_transaksi': sum(hari['jumlah_transaksi'] for hari in harian)
+        }
+
     def get_produk_terlaris(self, limit: int = 5) -> List[Dict]:
         """Mendapatkan daftar produk terlaris"""
-        df_pesanan = pd.DataFrame(self.get_all_pesanan())
-        if df_pesanan.empty:
-            return []
-            
-        # Hitung total penjualan per produk
-        produk_terlaris = df_pesanan.groupby('id_produk').agg({
-            'jumlah_dipesan': 'sum'
-        }).reset_index().sort_values('jumlah_dipesan', ascending=False)
-        
-        return produk_terlaris.head(limit).to_dict('records')
+        # Hitung total penjualan per produk sambil membaca pesanan satu per satu
+        totals: Dict[str, int] = {}
+        for pesanan in self.iter_pesanan(typed=True):
+            totals[pesanan['id_produk']] = totals.get(pesanan['id_produk'], 0) + pesanan['jumlah_dipesan']
+
+        produk_terlaris = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+        return [
+            {'id_produk': id_produk, 'jumlah_dipesan': jumlah}
+            for id_produk, jumlah in produk_terlaris[:limit]
+        ]
 
     def get_stok_menipis(self, batas_minimum: int = 10) -> List[Dict]:
         """Mendapatkan daftar produk dengan stok menipis"""
-        df_produk = pd.DataFrame(self.get_all_produk())
-        if df_produk.empty:
-            return []
-            
-        # Filter produk dengan stok di bawah batas
-        df_produk['stok'] = pd.to_numeric(df_produk['stok'])
-        stok_menipis = df_produk[df_produk['stok'] <= batas_minimum]
-        
-        return stok_menipis.to_dict('records')
\ No newline at end of file
+        parse_int, default = PARSERS[int]
+        stok_menipis = []
+        for produk in self.iter_produk():
+            try:
+                stok = parse_int(produk['stok'])
+            except (TypeError, ValueError):
+                stok = default
+
+            # Filter produk dengan stok di bawah batas
+            if stok <= batas_minimum:
+                produk['stok'] = stok
+                stok_menipis.append(produk)
+        return stok_menipis
+
+
+def create_database_manager(base_path=None) -> DatabaseManager:
+    """Membuat DatabaseManager sesuai backend yang dipilih lewat env HALALHUB_DB_BACKEND"""
+    backend = os.environ.get(DB_BACKEND_ENV, 'csv').strip().lower()
+    if backend == 'sqlite':
+        from .sqlite_database import SQLiteDatabaseManager
+        return SQLiteDatabaseManager(base_path)
+    if backend != 'csv':
+        print(f"Unknown database backend '{backend}', using csv")
+    return DatabaseManager(base_path)
+
+
+_managers: Dict[Tuple[str, str], DatabaseManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_database_manager(base_path=None) -> DatabaseManager:
+    """
+    Mengambil DatabaseManager bersama untuk satu direktori data dan backend.
+    Dipakai oleh controller dan view agar inisialisasi storage, cache dan
+    koneksi cukup dibuat sekali per proses.
+    """
+    key = (
+        os.path.abspath(base_path or DEFAULT_DB_PATH),
+        os.environ.get(DB_BACKEND_ENV, 'csv').strip().lower()
+    )
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = create_database_manager(key[0])
+        return manager
@@ -0,0 +1,137 @@
+import csv
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Format ID: <prefix><YYYYmmddHHMMSS>-<sequence>, misalnya TRX20241220153045-0007
+STAMP_FORMAT = '%Y%m%d%H%M%S'
+SEQUENCE_DIGITS = 4
+MAX_SEQUENCE = 10 ** SEQUENCE_DIGITS - 1
+
+STATE_FILENAME = 'id_sequence.csv'
+LOCK_FILENAME = 'id_sequence.lock'
+STATE_FIELDS = ['prefix', 'stamp', 'sequence']
+
+
+@contextmanager
+def _file_lock(lock_path: str):
+    """Lock eksklusif antar proses pada file lock"""
+    with open(lock_path, 'a+') as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        else:
+            file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK menyerah setelah 10 detik, coba lagi
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class IdAllocator:
+    """
+    Pembuat ID unik untuk produk, pesanan dan transaksi.
+
+    Setiap proses memesan satu blok nomor urut per detik dari file state
+    (di bawah file lock), lalu membagikan ID dari blok itu di memori. Disk
+    hanya disentuh sekali per blok, dan proses lain yang memakai direktori
+    data yang sama selalu mendapat blok berbeda.
+    """
+
+    BLOCK_SIZE = 64
+
+    def __init__(self, base_path: str):
+        self.state_path = os.path.join(base_path, STATE_FILENAME)
+        self.lock_path = os.path.join(base_path, LOCK_FILENAME)
+        self._lock = threading.Lock()
+        # prefix -> [stamp, nomor berikutnya, nomor terakhir dalam blok]
+        self._blocks: Dict[str, list] = {}
+
+    def next_id(self, prefix: str) -> str:
+        """Mengambil ID baru, misalnya next_id('TRX') -> 'TRX20241220153045-0000'"""
+        now = datetime.now().strftime(STAMP_FORMAT)
+        with self._lock:
+            block = self._blocks.get(prefix)
+            # Blok lama dipakai selama masih di detik yang sama (atau jam mundur)
+            if block is None or block[0] < now or block[1] > block[2]:
+                block = list(self._reserve(prefix, now))
+                self._blocks[prefix] = block
+            sequence = block[1]
+            block[1] += 1
+            return f"{prefix}{block[0]}-{sequence:0{SEQUENCE_DIGITS}d}"
+
+    def _reserve(self, prefix: str, now: str) -> Tuple[str, int, int]:
+        """Memesan blok nomor urut berikutnya di file state"""
+        with _file_lock(self.lock_path):
+            state = self._read_state()
+            last_stamp, last_sequence = state.get(prefix, ('', -1))
+
+            # Stempel tidak pernah mundur agar ID tetap monoton
+            stamp = max(now, last_stamp)
+            start = last_sequence + 1 if stamp == last_stamp else 0
+            if start > MAX_SEQUENCE:
+                # Nomor urut detik ini habis, pinjam detik berikutnya
+                stamp = (datetime.strptime(stamp, STAMP_FORMAT) + timedelta(seconds=1)).strftime(STAMP_FORMAT)
+                start = 0
+            end = min(start + self.BLOCK_SIZE - 1, MAX_SEQUENCE)
+
+            state[prefix] = (stamp, end)
+            self._write_state(state)
+        return stamp, start, end
+
+    def _read_state(self) -> Dict[str, Tuple[str, int]]:
+        """Membaca stempel dan nomor urut terakhir per prefix"""
+        if not os.path.exists(self.state_path):
+            return {}
+        state = {}
+        with open(self.state_path, mode='r', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                try:
+                    state[row['prefix']] = (row['stamp'], int(row['sequence']))
+                except (KeyError, TypeError, ValueError):
+                    continue
+        return state
+
+    def _write_state(self, state: Dict[str, Tuple[str, int]]) -> None:
+        """Menulis file state secara atomik"""
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, mode='w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=STATE_FIELDS)
+            writer.writeheader()
+            for prefix, (stamp, sequence) in sorted(state.items()):
+                writer.writerow({'prefix': prefix, 'stamp': stamp, 'sequence': sequence})
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.state_path)
+
+
+_allocators: Dict[str, IdAllocator] = {}
+_allocators_lock = threading.Lock()
+
+
+def get_id_allocator(base_path: str) -> IdAllocator:
+    """Mengambil IdAllocator bersama untuk satu direktori data"""
+    key = os.path.abspath(base_path)
+    with _allocators_lock:
+        allocator = _allocators.get(key)
+        if allocator is None:
+            allocator = _allocators[key] = IdAllocator(key)
+        return allocator
@@ -0,0 +1,361 @@
+"""
+Pengukuran waktu per operasi untuk DatabaseManager dan controller.
+
+Class yang ditandai @instrumented dibungkus hanya saat pengukuran aktif, baik
+lewat env HALALHUB_METRICS=1 saat start maupun enable_metrics() saat berjalan.
+Selama nonaktif method asli dipakai apa adanya sehingga tidak ada overhead.
+
+Untuk setiap method publik dicatat jumlah panggilan, error, histogram latensi
+(p50/p95/p99) serta baris dan byte yang dibaca/ditulis dari storage. I/O yang
+terjadi di dalam panggilan bersarang ikut dihitung pada pemanggil luarnya.
+Method yang mengembalikan iterator (iter_*) hanya diukur sampai iterator dibuat.
+
+Contoh:
+    enable_metrics()
+    ...
+    dump_metrics('metrics.prom', fmt='prometheus')
+"""
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .snapshot import atomic_write
+
+METRICS_ENV = 'HALALHUB_METRICS'
+
+# Kuantil yang dilaporkan
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """Histogram latensi dengan bucket logaritmik (4 bucket per kelipatan dua), memori konstan"""
+
+    MIN_SECONDS = 1e-6
+    BUCKETS_PER_OCTAVE = 4
+    # 1 mikrodetik sampai sekitar 4,7 jam
+    BUCKET_COUNT = 34 * BUCKETS_PER_OCTAVE
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        if seconds <= self.MIN_SECONDS:
+            index = 0
+        else:
+            index = min(
+                self.BUCKET_COUNT - 1,
+                int(math.log2(seconds / self.MIN_SECONDS) * self.BUCKETS_PER_OCTAVE) + 1
+            )
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def bucket_bounds(self, index: int) -> Tuple[float, float]:
+        """Batas bawah dan atas bucket ke-index dalam detik"""
+        if index == 0:
+            return 0.0, self.MIN_SECONDS
+        return (
+            self.MIN_SECONDS * 2 ** ((index - 1) / self.BUCKETS_PER_OCTAVE),
+            self.MIN_SECONDS * 2 ** (index / self.BUCKETS_PER_OCTAVE)
+        )
+
+    def percentile(self, q: float) -> float:
+        """Perkiraan kuantil q, diinterpolasi linear di dalam bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower, upper = self.bucket_bounds(index)
+                value = lower + (upper - lower) * (rank - cumulative) / count
+                return min(value, self.max)
+            cumulative += count
+        return self.max
+
+
+class OperationStats:
+    """Statistik satu operasi"""
+
+    def __init__(self):
+        self.errors = 0
+        self.latency = LatencyHistogram()
+        self.rows_read = 0
+        self.rows_written = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def to_dict(self) -> Dict:
+        latency = self.latency
+        result = {
+            'calls': latency.count,
+            'errors': self.errors,
+            'total_seconds': latency.total,
+            'mean_seconds': latency.total / latency.count if latency.count else 0.0,
+            'max_seconds': latency.max,
+            'rows_read': self.rows_read,
+            'rows_written': self.rows_written,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written
+        }
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}_seconds"] = latency.percentile(q)
+        return result
+
+
+class _Frame:
+    """Penghitung I/O untuk satu panggilan yang sedang berjalan"""
+
+    __slots__ = ('parent', 'rows_read', 'rows_written', 'bytes_read', 'bytes_written')
+
+    def __init__(self, parent: Optional['_Frame']):
+        self.parent = parent
+        self.rows_read = 0
+        self.rows_written = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+
+class MetricsRegistry:
+    """Kumpulan OperationStats per nama operasi, aman dipakai dari beberapa thread"""
+
+    def __init__(self):
+        self._stats: Dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, name: str, seconds: float, frame: _Frame, error: bool) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = OperationStats()
+            stats.latency.add(seconds)
+            stats.errors += error
+            stats.rows_read += frame.rows_read
+            stats.rows_written += frame.rows_written
+            stats.bytes_read += frame.bytes_read
+            stats.bytes_written += frame.bytes_written
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Salinan statistik semua operasi, diurutkan berdasarkan nama"""
+        with self._lock:
+            return {name: self._stats[name].to_dict() for name in sorted(self._stats)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+
+registry = MetricsRegistry()
+
+_local = threading.local()
+_enabled = False
+_classes: List[type] = []
+# (class, nama method) -> atribut asli sebelum dibungkus
+_originals: Dict[tuple, object] = {}
+_state_lock = threading.Lock()
+
+
+def metrics_enabled() -> bool:
+    """Apakah pengukuran sedang aktif"""
+    return _enabled
+
+
+def record_io(rows_read: int = 0, rows_written: int = 0,
+              bytes_read: int = 0, bytes_written: int = 0) -> None:
+    """Mencatat I/O storage ke operasi yang sedang diukur di thread ini (jika ada)"""
+    frame = getattr(_local, 'frame', None)
+    if frame is None:
+        return
+    frame.rows_read += rows_read
+    frame.rows_written += rows_written
+    frame.bytes_read += bytes_read
+    frame.bytes_written += bytes_written
+
+
+def is_recording() -> bool:
+    """Apakah thread ini sedang berada di dalam operasi yang diukur"""
+    return getattr(_local, 'frame', None) is not None
+
+
+def _finish(name: str, frame: _Frame, started: float, error: bool) -> None:
+    """Menutup frame, meneruskan I/O ke pemanggil luar dan mencatat statistik"""
+    seconds = time.perf_counter() - started
+    parent = frame.parent
+    _local.frame = parent
+    if parent is not None:
+        parent.rows_read += frame.rows_read
+        parent.rows_written += frame.rows_written
+        parent.bytes_read += frame.bytes_read
+        parent.bytes_written += frame.bytes_written
+    registry.record(name, seconds, frame, error)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Mengukur satu blok kode (misalnya pembuatan halaman GUI) jika pengukuran aktif"""
+    if not _enabled:
+        yield
+        return
+    frame = _Frame(getattr(_local, 'frame', None))
+    _local.frame = frame
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _finish(name, frame, started, error)
+
+
+def _timed_function(name: str, func: Callable) -> Callable:
+    """Membungkus satu fungsi agar setiap panggilannya dicatat dengan nama name"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        frame = _Frame(getattr(_local, 'frame', None))
+        _local.frame = frame
+        started = time.perf_counter()
+        error = False
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            error = True
+            raise
+        finally:
+            _finish(name, frame, started, error)
+    return wrapper
+
+
+def _wrap_class(cls: type) -> None:
+    """Membungkus method publik yang didefinisikan langsung di cls"""
+    for attr_name, attr in list(vars(cls).items()):
+        if attr_name.startswith('_'):
+            continue
+        name = f"{cls.__name__}.{attr_name}"
+        if isinstance(attr, staticmethod):
+            wrapped = staticmethod(_timed_function(name, attr.__func__))
+        elif isinstance(attr, classmethod):
+            wrapped = classmethod(_timed_function(name, attr.__func__))
+        elif callable(attr) and not isinstance(attr, type):
+            wrapped = _timed_function(name, attr)
+        else:
+            continue
+        _originals[(cls, attr_name)] = attr
+        setattr(cls, attr_name, wrapped)
+
+
+def _unwrap_class(cls: type) -> None:
+    """Mengembalikan method asli cls"""
+    for (owner, attr_name), attr in list(_originals.items()):
+        if owner is cls:
+            setattr(cls, attr_name, attr)
+            del _originals[(owner, attr_name)]
+
+
+def instrumented(cls: type) -> type:
+    """Class decorator: method publik cls diukur selama pengukuran aktif"""
+    with _state_lock:
+        _classes.append(cls)
+        if _enabled:
+            _wrap_class(cls)
+    return cls
+
+
+def enable_metrics() -> None:
+    """Mengaktifkan pengukuran untuk semua class @instrumented"""
+    global _enabled
+    with _state_lock:
+        if _enabled:
+            return
+        for cls in _classes:
+            _wrap_class(cls)
+        _enabled = True
+
+
+def disable_metrics() -> None:
+    """Menonaktifkan pengukuran; statistik yang sudah tercatat tetap disimpan"""
+    global _enabled
+    with _state_lock:
+        if not _enabled:
+            return
+        for cls in _classes:
+            _unwrap_class(cls)
+        _enabled = False
+
+
+def _prometheus_text(snapshot: Dict[str, Dict]) -> str:
+    """Format textfile Prometheus (node_exporter textfile collector)"""
+    lines = []
+
+    def label(name: str) -> str:
+        return name.replace('\\', '\\\\').replace('"', '\\"')
+
+    counters = [
+        ('halalhub_operation_calls_total', 'calls', 'Jumlah panggilan operasi'),
+        ('halalhub_operation_errors_total', 'errors', 'Jumlah panggilan yang melempar exception'),
+        ('halalhub_operation_rows_read_total', 'rows_read', 'Baris yang dibaca dari storage'),
+        ('halalhub_operation_rows_written_total', 'rows_written', 'Baris yang ditulis ke storage'),
+        ('halalhub_operation_bytes_read_total', 'bytes_read', 'Byte yang dibaca dari storage'),
+        ('halalhub_operation_bytes_written_total', 'bytes_written', 'Byte yang ditulis ke storage'),
+    ]
+    for metric, key, help_text in counters:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for name, stats in snapshot.items():
+            lines.append(f'{metric}{{operation="{label(name)}"}} {stats[key]}')
+
+    metric = 'halalhub_operation_latency_seconds'
+    lines.append(f"# HELP {metric} Latensi operasi")
+    lines.append(f"# TYPE {metric} summary")
+    for name, stats in snapshot.items():
+        for q in QUANTILES:
+            value = stats[f"p{int(q * 100)}_seconds"]
+            lines.append(f'{metric}{{operation="{label(name)}",quantile="{q}"}} {value:.9f}')
+        lines.append(f'{metric}_sum{{operation="{label(name)}"}} {stats["total_seconds"]:.9f}')
+        lines.append(f'{metric}_count{{operation="{label(name)}"}} {stats["calls"]}')
+    return "\n".join(lines) + "\n"
+
+
+def dump_metrics(path: Optional[str] = None, fmt: str = 'json') -> str:
+    """
+    Menulis statistik ke disk secara atomik dalam format 'json' atau
+    'prometheus', lalu mengembalikan path file yang ditulis.
+    """
+    if fmt not in ('json', 'prometheus'):
+        raise ValueError(f"Unknown metrics format '{fmt}'")
+    if path is None:
+        path = os.path.join(os.getcwd(), 'halalhub_metrics.' + ('json' if fmt == 'json' else 'prom'))
+
+    snapshot = registry.snapshot()
+    if fmt == 'json':
+        content = json.dumps({
+            'enabled': _enabled,
+            'started_at': registry.started_at,
+            'dumped_at': time.time(),
+            'operations': snapshot
+        }, indent=2)
+    else:
+        content = _prometheus_text(snapshot)
+
+    path = os.path.abspath(path)
+    # Textfile collector membaca file dengan permission biasa, bukan 0600 dari mkstemp
+    with atomic_write(path, mode='w', encoding='utf-8', chmod=0o644) as file:
+        file.write(content)
+    return path
+
+
+if os.environ.get(METRICS_ENV, '').strip().lower() in ('1', 'true', 'yes'):
+    enable_metrics()
@@ -0,0 +1,344 @@
+"""
+Penyimpanan tabel pesanan/transaksi per bulan, misalnya transaksi/2024-12.csv
+
+Layout ini aktif untuk satu tabel jika direktori tabel berisi manifest.csv.
+Data lama dari file tunggal dipindahkan sekali jalan dengan:
+    cd src && python -m utils.partitions [base_path]
+"""
+import csv
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from .database import CachedTable, ChangeLog, CSVHandler, DatabaseManager, TableCache
+from .schema import TableSchema
+
+MANIFEST_FILENAME = 'manifest.csv'
+MANIFEST_FIELDS = ['partition', 'rows', 'mtime_ns', 'size']
+
+# Partisi untuk baris yang tanggalnya kosong atau tidak valid
+UNDATED_PARTITION = 'tanpa-tanggal'
+
+PARTITIONABLE_TABLES = ('pesanan', 'transaksi')
+
+
+class PartitionedTable(CachedTable):
+    """Gabungan semua partisi satu tabel, mencatat partisi asal setiap baris"""
+
+    def __init__(self, rows: List[Dict], sources: Dict[str, str]):
+        super().__init__(rows)
+        # primary key -> nama partisi saat terakhir dibaca/ditulis ke disk
+        self.sources = sources
+
+
+class PartitionedStore:
+    """Satu tabel yang disimpan per bulan di direktori sendiri beserta manifest"""
+
+    def __init__(self, directory: str, schema: TableSchema):
+        self.directory = os.path.abspath(directory)
+        self.schema = schema
+        self.manifest_path = os.path.join(self.directory, MANIFEST_FILENAME)
+        self._manifest: Optional[Tuple[Optional[Tuple[int, int]], Dict[str, Dict]]] = None
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Apakah direktori sudah memakai layout partisi"""
+        return os.path.exists(os.path.join(directory, MANIFEST_FILENAME))
+
+    @staticmethod
+    def current_partition() -> str:
+        """Nama partisi bulan berjalan"""
+        return datetime.now().strftime('%Y-%m')
+
+    def partition_of(self, row: Dict) -> str:
+        """Nama partisi (YYYY-MM) untuk satu baris berdasarkan kolom tanggalnya"""
+        try:
+            return datetime.fromisoformat(row.get(self.schema.date_field)).strftime('%Y-%m')
+        except (TypeError, ValueError):
+            return UNDATED_PARTITION
+
+    def partition_path(self, name: str) -> str:
+        """Path file CSV satu partisi"""
+        return os.path.join(self.directory, f"{name}.csv")
+
+    def read_manifest(self) -> Dict[str, Dict]:
+        """Membaca manifest (nama partisi -> jumlah baris dan stempel file), di-cache per stempel"""
+        stamp = TableCache.file_stamp(self.manifest_path)
+        if self._manifest is not None and self._manifest[0] == stamp:
+            return self._manifest[1]
+
+        manifest = {}
+        if stamp is not None:
+            with open(self.manifest_path, mode='r', encoding='utf-8') as file:
+                for entry in csv.DictReader(file):
+                    try:
+                        manifest[entry['partition']] = {
+                            'rows': int(entry['rows']),
+                            'stamp': (int(entry['mtime_ns']), int(entry['size']))
+                        }
+                    except (KeyError, TypeError, ValueError):
+                        continue
+        self._manifest = (stamp, manifest)
+        return manifest
+
+    def write_manifest(self, manifest: Dict[str, Dict]) -> bool:
+        """Menulis manifest secara atomik"""
+        rows = [
+            {
+                'partition': name,
+                'rows': entry['rows'],
+                'mtime_ns': entry['stamp'][0],
+                'size': entry['stamp'][1]
+            }
+            for name, entry in sorted(manifest.items())
+        ]
+        return CSVHandler.write_csv(self.manifest_path, rows, MANIFEST_FIELDS, durable=True)
+
+    def _load_partition(self, name: str, entry: Dict) -> Optional[CachedTable]:
+        """
+        Memuat satu partisi. Bulan yang sudah lewat dianggap immutable: validasi
+        cache memakai stempel di manifest sehingga file partisi tidak perlu di-stat.
+        """
+        path = self.partition_path(name)
+        if name != UNDATED_PARTITION and name < self.current_partition():
+            return CSVHandler.load_table(path, known_stamp=(entry['stamp'], None))
+        return CSVHandler.load_table(path)
+
+    def _stamp(self, change_log: ChangeLog) -> Tuple:
+        """Stempel tabel gabungan: manifest, change log dan partisi bulan berjalan"""
+        return (
+            TableCache.file_stamp(self.manifest_path),
+            TableCache.file_stamp(change_log.file_path),
+            TableCache.file_stamp(self.partition_path(self.current_partition()))
+        )
+
+    def _files(self, change_log: ChangeLog) -> Tuple:
+        return (
+            self.manifest_path,
+            change_log.file_path,
+            self.partition_path(self.current_partition())
+        )
+
+    def cached(self, change_log: ChangeLog) -> Optional[CachedTable]:
+        """Tabel gabungan dari cache jika masih segar, tanpa memuat partisi"""
+        return CSVHandler.cache.peek(self.directory, self._stamp(change_log))
+
+    def load(self, change_log: ChangeLog, table_name: str) -> CachedTable:
+        """Memuat semua partisi menjadi satu tabel lalu menerapkan change log"""
+        stamp = self._stamp(change_log)
+        table = CSVHandler.cache.get(self.directory, stamp)
+        if table is not None:
+            return table
+
+        if CSVHandler._pending:
+            CSVHandler.flush()
+            stamp = self._stamp(change_log)
+
+        key_field = self.schema.key_field
+        rows, sources = [], {}
+        for name, entry in sorted(self.read_manifest().items()):
+            partition = self._load_partition(name, entry)
+            if partition is None:
+                continue
+            for row in partition.rows:
+                # Salin baris karena tabel gabungan diubah in-place oleh mutasi
+                row = dict(row)
+                rows.append(row)
+                sources[row.get(key_field)] = name
+
+        table = PartitionedTable(rows, sources)
+        change_log.replay(table, table_name)
+        CSVHandler.cache.put(self.directory, stamp, table, self._files(change_log))
+        return table
+
+    def partitions_in_range(self, start: Optional[datetime],
+                            end: Optional[datetime]) -> List[Tuple[str, Dict]]:
+        """
+        Partisi (nama, entri manifest) yang beririsan dengan [start, end], urut per
+        bulan. Batas None berarti tidak dibatasi; partisi tanpa tanggal hanya ikut
+        jika kedua batas None.
+        """
+        partitions = []
+        for name, entry in sorted(self.read_manifest().items()):
+            if name == UNDATED_PARTITION:
+                if start is None and end is None:
+                    partitions.append((name, entry))
+                continue
+            month_start = datetime.strptime(name, '%Y-%m')
+            month_end = month_start.replace(year=month_start.year + month_start.month // 12,
+                                            month=month_start.month % 12 + 1)
+            if (end is not None and month_start > end) or (start is not None and month_end <= start):
+                continue
+            partitions.append((name, entry))
+        return partitions
+
+    def _range_stamp(self, partitions: List[Tuple[str, Dict]], change_log: ChangeLog) -> Tuple:
+        """
+        Stempel tabel range: stempel setiap partisi yang beririsan (dari manifest
+        untuk bulan yang sudah lewat) ditambah stempel change log
+        """
+        current = self.current_partition()
+        stamps = tuple(
+            TableCache.file_stamp(self.partition_path(name))
+            if name == UNDATED_PARTITION or name >= current else entry['stamp']
+            for name, entry in partitions
+        )
+        return stamps + (TableCache.file_stamp(change_log.file_path),)
+
+    def load_range(self, start: datetime, end: datetime, change_log: ChangeLog,
+                   table_name: str) -> CachedTable:
+        """
+        Memuat hanya partisi yang beririsan dengan [start, end] ditambah change log.
+        Hasilnya di-cache per kumpulan partisi dan tidak boleh diubah pemanggil.
+        """
+        partitions = self.partitions_in_range(start, end)
+        # Kunci sintetis per kumpulan partisi. Tabel range tidak ikut diperbarui oleh
+        # mutasi di memori, jadi file sumbernya sengaja tidak didaftarkan ke touch():
+        # setiap penulisan change log membuat stempelnya basi.
+        key = f"{self.directory}#{','.join(name for name, _ in partitions)}"
+        stamp = self._range_stamp(partitions, change_log)
+        table = CSVHandler.cache.get(key, stamp)
+        if table is not None:
+            return table
+
+        rows = []
+        for name, entry in partitions:
+            partition = self._load_partition(name, entry)
+            if partition is not None:
+                rows.extend(dict(row) for row in partition.rows)
+
+        table = CachedTable(rows)
+        # Baris yang diubah bisa berasal dari partisi yang tidak dimuat; entri log
+        # berisi baris lengkap sehingga update cukup diperlakukan sebagai upsert
+        change_log.replay(table, table_name, upsert_updates=True)
+        CSVHandler.cache.put(key, stamp, table)
+        return table
+
+    def lookup_many(self, keys: Set[str], end: Optional[datetime], change_log: ChangeLog,
+                    table_name: str) -> Dict[str, Dict]:
+        """
+        Mencari baris per primary key tanpa memuat tabel gabungan. Partisi dibuka
+        dari bulan end mundur ke belakang (indeks hash per partisi ikut di-cache)
+        sampai semua key ditemukan; kondisi terbaru diambil dari change log.
+        """
+        key_field = self.schema.key_field
+        overlay = change_log.overlay(table_name)
+        found: Dict[str, Dict] = {}
+        remaining = set()
+        for key in keys:
+            kind, row = overlay.get(key, ('update', None))
+            if key in overlay and (kind == 'insert' or row is None):
+                # Disisipkan atau dihapus lewat log, partisi tidak perlu dibuka
+                if row is not None:
+                    found[key] = row
+            else:
+                remaining.add(key)
+
+        partitions = list(reversed(self.partitions_in_range(None, end)))
+        if UNDATED_PARTITION in self.read_manifest():
+            partitions.append((UNDATED_PARTITION, self.read_manifest()[UNDATED_PARTITION]))
+        for name, entry in partitions:
+            if not remaining:
+                break
+            partition = self._load_partition(name, entry)
+            if partition is None:
+                continue
+            index = partition.index(key_field)
+            for key in [key for key in remaining if key in index]:
+                remaining.discard(key)
+                # Update di log berisi baris lengkap
+                found[key] = overlay[key][1] if key in overlay else index[key]
+        return found
+
+    def store(self, table: CachedTable, change_log: ChangeLog) -> None:
+        """Menyimpan tabel gabungan yang sudah sinkron dengan disk ke cache"""
+        CSVHandler.cache.put(self.directory, self._stamp(change_log), table, self._files(change_log))
+
+    def invalidate(self) -> None:
+        """Menghapus tabel gabungan dari cache"""
+        CSVHandler.cache.invalidate(self.directory)
+
+    def compact(self, table: PartitionedTable, touched: Set[str]) -> bool:
+        """
+        Menulis ulang hanya partisi yang berisi baris yang disentuh change log,
+        termasuk partisi asal baris yang dihapus atau pindah bulan.
+        """
+        key_field = self.schema.key_field
+        fieldnames = self.schema.fieldnames
+        dirty = {table.sources[key] for key in touched if key in table.sources}
+
+        groups: Dict[str, List[Dict]] = {}
+        for row in table.rows:
+            name = self.partition_of(row)
+            groups.setdefault(name, []).append(row)
+            if row.get(key_field) in touched:
+                dirty.add(name)
+
+        manifest = dict(self.read_manifest())
+        for name in sorted(dirty):
+            path = self.partition_path(name)
+            rows = groups.get(name, [])
+            if rows:
+                if not CSVHandler.write_csv(path, rows, fieldnames, durable=True):
+                    return False
+                manifest[name] = {'rows': len(rows), 'stamp': TableCache.file_stamp(path)}
+            else:
+                if os.path.exists(path):
+                    os.remove(path)
+                manifest.pop(name, None)
+
+        if dirty and not self.write_manifest(manifest):
+            return False
+
+        table.sources = {
+            row.get(key_field): name for name, rows in groups.items() for row in rows
+        }
+        return True
+
+
+def migrate_to_partitions(base_path=None) -> Dict[str, int]:
+    """
+    Memecah pesanan.csv dan transaksi.csv menjadi partisi bulanan. File lama
+    diganti namanya menjadi .csv.bak. Tabel yang sudah dipartisi dilewati.
+    """
+    db = DatabaseManager(base_path)
+    # Lipat change log dulu agar isi file utama lengkap
+    db.compact()
+
+    counts = {}
+    for file_type in PARTITIONABLE_TABLES:
+        directory = os.path.join(db.base_path, file_type)
+        if PartitionedStore.exists(directory):
+            continue
+
+        os.makedirs(directory, exist_ok=True)
+        store = PartitionedStore(directory, db.schema[file_type])
+        groups: Dict[str, List[Dict]] = {}
+        rows = db._rows(file_type)
+        for row in rows:
+            groups.setdefault(store.partition_of(row), []).append(row)
+
+        manifest = {}
+        for name, partition_rows in groups.items():
+            path = store.partition_path(name)
+            if not CSVHandler.write_csv(path, partition_rows, db.field_definitions[file_type], durable=True):
+                raise IOError(f"Gagal menulis partisi {path}")
+            manifest[name] = {'rows': len(partition_rows), 'stamp': TableCache.file_stamp(path)}
+
+        if not store.write_manifest(manifest):
+            raise IOError(f"Gagal menulis manifest {store.manifest_path}")
+
+        old_path = db.file_paths[file_type]
+        if os.path.exists(old_path):
+            os.replace(old_path, old_path + '.bak')
+        CSVHandler.cache.invalidate(os.path.abspath(old_path))
+        counts[file_type] = len(rows)
+
+    return counts
+
+
+if __name__ == "__main__":
+    result = migrate_to_partitions(sys.argv[1] if len(sys.argv) > 1 else None)
+    for table_name, total in result.items():
+        print(f"{table_name}: {total} baris dipartisi")
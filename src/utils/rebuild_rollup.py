@@ -0,0 +1,12 @@
+"""
+Membangun ulang ringkasan penjualan harian dari seluruh riwayat transaksi:
+    cd src && python -m utils.rebuild_rollup [base_path]
+"""
+import sys
+
+from .database import create_database_manager
+
+if __name__ == "__main__":
+    db = create_database_manager(sys.argv[1] if len(sys.argv) > 1 else None)
+    days = db.rebuild_sales_rollup()
+    print(f"Ringkasan penjualan dibangun ulang: {days} hari")
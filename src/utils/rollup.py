@@ -0,0 +1,180 @@
+"""
+Ringkasan penjualan harian (pendapatan, jumlah transaksi, unit per produk dan
+pendapatan per metode pembayaran) yang diperbarui setiap ada transaksi baru.
+
+Ringkasan dibangun ulang dari seluruh riwayat transaksi dengan:
+    cd src && python -m utils.rebuild_rollup [base_path]
+"""
+import bisect
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .snapshot import load_snapshot, save_snapshot
+
+ROLLUP_FILENAME = 'penjualan_harian.snapshot'
+ROLLUP_VERSION = 1
+
+# Tabel yang isinya mempengaruhi ringkasan
+ROLLUP_TABLES = ('transaksi', 'pesanan')
+
+
+def _to_date(value: Union[date, datetime]) -> date:
+    """Menerima date atau datetime, ringkasan hanya mengenal tanggal"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def period_end(tanggal: date, periode: str) -> date:
+    """Tanggal akhir periode (D harian, W mingguan s.d. Minggu, M bulanan, Y tahunan)"""
+    if periode == 'W':
+        return tanggal + timedelta(days=6 - tanggal.weekday())
+    if periode == 'M':
+        return (tanggal.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    if periode == 'Y':
+        return date(tanggal.year, 12, 31)
+    return tanggal
+
+
+def group_by_period(harian: List[Tuple[date, float, int]], periode: str) -> List[Tuple[date, float, int]]:
+    """
+    Menjumlahkan (tanggal, pendapatan, jumlah_transaksi) per periode, diberi label
+    tanggal akhir periode. Periode kosong di antaranya diisi nol, sama seperti
+    pd.Grouper. Fungsi murni, cukup murah untuk dijalankan di thread mana pun.
+    """
+    totals: Dict[date, List] = {}
+    for tanggal, pendapatan, jumlah in harian:
+        total = totals.setdefault(period_end(tanggal, periode), [0.0, 0])
+        total[0] += pendapatan
+        total[1] += jumlah
+    if not totals:
+        return []
+
+    result = []
+    label, last = min(totals), max(totals)
+    while label <= last:
+        pendapatan, jumlah = totals.get(label, (0.0, 0))
+        result.append((label, pendapatan, jumlah))
+        label = period_end(label + timedelta(days=1), periode)
+    return result
+
+
+class DailySales:
+    """Agregat penjualan satu hari"""
+
+    __slots__ = ('pendapatan', 'jumlah_transaksi', 'unit_produk', 'metode_pembayaran')
+
+    def __init__(self):
+        self.pendapatan = 0.0
+        self.jumlah_transaksi = 0
+        # id_produk -> jumlah unit terjual
+        self.unit_produk: Dict[str, int] = {}
+        # metode pembayaran -> pendapatan
+        self.metode_pembayaran: Dict[str, float] = {}
+
+    def to_dict(self, tanggal: date) -> Dict:
+        return {
+            'tanggal': tanggal,
+            'pendapatan': self.pendapatan,
+            'jumlah_transaksi': self.jumlah_transaksi,
+            'unit_produk': dict(self.unit_produk),
+            'metode_pembayaran': dict(self.metode_pembayaran)
+        }
+
+    def copy(self) -> 'DailySales':
+        day = DailySales()
+        day.pendapatan = self.pendapatan
+        day.jumlah_transaksi = self.jumlah_transaksi
+        day.unit_produk = dict(self.unit_produk)
+        day.metode_pembayaran = dict(self.metode_pembayaran)
+        return day
+
+
+class DailySalesRollup:
+    """Agregat penjualan per tanggal, tanggal disimpan terurut untuk range query"""
+
+    def __init__(self):
+        self.days: Dict[date, DailySales] = {}
+        self.dates: List[date] = []
+
+    @classmethod
+    def build(cls, transaksi_rows: Iterable[Dict],
+              pesanan_of: Callable[[str], Optional[Dict]]) -> 'DailySalesRollup':
+        """Membangun ringkasan dari baris transaksi bertipe; pesanan_of(id_pesanan) -> pesanan bertipe"""
+        rollup = cls()
+        for transaksi in transaksi_rows:
+            rollup.add(transaksi, pesanan_of(transaksi.get('id_pesanan')))
+        return rollup
+
+    def add(self, transaksi: Dict, pesanan: Optional[Dict]) -> None:
+        """Menambahkan satu transaksi bertipe (beserta pesanannya jika ada) ke harinya"""
+        tanggal = transaksi.get('tanggal_transaksi')
+        if tanggal is None:
+            # Transaksi tanpa tanggal valid tidak masuk ke hari mana pun
+            return
+        tanggal = tanggal.date()
+
+        day = self.days.get(tanggal)
+        if day is None:
+            day = self.days[tanggal] = DailySales()
+            if not self.dates or self.dates[-1] < tanggal:
+                self.dates.append(tanggal)
+            else:
+                bisect.insort(self.dates, tanggal)
+
+        total = transaksi.get('total_harga') or 0.0
+        metode = transaksi.get('metode_pembayaran') or 'Tunai'
+        day.pendapatan += total
+        day.jumlah_transaksi += 1
+        day.metode_pembayaran[metode] = day.metode_pembayaran.get(metode, 0.0) + total
+        if pesanan is not None:
+            id_produk = pesanan.get('id_produk')
+            day.unit_produk[id_produk] = day.unit_produk.get(id_produk, 0) + (pesanan.get('jumlah_dipesan') or 0)
+
+    def checkpoint(self, transaksi: Dict) -> Tuple[Optional[date], Optional[DailySales]]:
+        """Salinan hari transaksi sebelum add(), untuk dikembalikan dengan restore() saat rollback"""
+        tanggal = transaksi.get('tanggal_transaksi')
+        if tanggal is None:
+            return None, None
+        day = self.days.get(tanggal.date())
+        return tanggal.date(), day.copy() if day is not None else None
+
+    def restore(self, saved: Tuple[Optional[date], Optional[DailySales]]) -> None:
+        """Mengembalikan satu hari ke kondisi hasil checkpoint()"""
+        tanggal, day = saved
+        if tanggal is None:
+            return
+        if day is not None:
+            self.days[tanggal] = day
+        elif self.days.pop(tanggal, None) is not None:
+            del self.dates[bisect.bisect_left(self.dates, tanggal)]
+
+    def range(self, start: Union[date, datetime], end: Union[date, datetime]) -> List[Dict]:
+        """Ringkasan per hari untuk tanggal di [start, end], hari tanpa transaksi tidak disertakan"""
+        low = bisect.bisect_left(self.dates, _to_date(start))
+        high = bisect.bisect_right(self.dates, _to_date(end))
+        return [self.days[tanggal].to_dict(tanggal) for tanggal in self.dates[low:high]]
+
+    def save(self, path: str, stamp: Tuple) -> None:
+        """Menyimpan ringkasan beserta stempel file sumbernya secara atomik"""
+        days = [
+            (tanggal, day.pendapatan, day.jumlah_transaksi, day.unit_produk, day.metode_pembayaran)
+            for tanggal, day in sorted(self.days.items())
+        ]
+        save_snapshot(path, ROLLUP_VERSION, stamp, {'days': days}, 'sales rollup')
+
+    @classmethod
+    def load(cls, path: str, stamp: Tuple) -> Optional['DailySalesRollup']:
+        """Membaca ringkasan tersimpan jika dibuat dari isi file sumber yang sama"""
+        # Ringkasan yang tidak ada atau rusak tidak fatal, cukup dibangun ulang dari transaksi
+        snapshot = load_snapshot(path, ROLLUP_VERSION, stamp, 'sales rollup')
+        if snapshot is None:
+            return None
+        rollup = cls()
+        for tanggal, pendapatan, jumlah_transaksi, unit_produk, metode_pembayaran in snapshot['days']:
+            day = DailySales()
+            day.pendapatan = pendapatan
+            day.jumlah_transaksi = jumlah_transaksi
+            day.unit_produk = unit_produk
+            day.metode_pembayaran = metode_pembayaran
+            rollup.days[tanggal] = day
+            rollup.dates.append(tanggal)
+        return rollup
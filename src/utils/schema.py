@@ -0,0 +1,103 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+def _parse_int(value: str) -> int:
+    """Parsing int yang juga menerima angka bulat berformat float seperti '10.0'"""
+    try:
+        return int(value)
+    except ValueError:
+        number = float(value)
+        if not number.is_integer():
+            raise
+        return int(number)
+
+
+# Parser dan nilai default (dipakai jika parsing gagal) untuk setiap tipe kolom
+PARSERS = {
+    int: (_parse_int, 0),
+    float: (float, 0.0),
+    datetime: (datetime.fromisoformat, None),
+}
+
+
+class TableSchema:
+    """Tipe setiap kolom satu tabel, dipakai untuk decode baris CSV (string) sekali per load"""
+
+    def __init__(self, name: str, columns: Dict[str, type], date_field: Optional[str] = None):
+        self.name = name
+        self.columns = columns
+        self.fieldnames = list(columns)
+        self.key_field = self.fieldnames[0]
+        # Kolom tanggal utama, dipakai untuk indeks terurut dan range query
+        self.date_field = date_field
+        # Kolom str tidak perlu di-decode
+        self._parsers = [
+            (field, PARSERS[column_type])
+            for field, column_type in columns.items()
+            if column_type is not str
+        ]
+
+    def decode(self, row: Dict[str, str]) -> Tuple[Dict, List[str]]:
+        """Mengubah baris string menjadi baris bertipe beserta daftar error parsing"""
+        typed = dict(row)
+        errors = []
+        for field, (parse, default) in self._parsers:
+            value = row.get(field)
+            try:
+                typed[field] = parse(value)
+            except (TypeError, ValueError):
+                typed[field] = default
+                errors.append(
+                    f"{self.name} {row.get(self.key_field)}: {field}={value!r} "
+                    f"bukan {self.columns[field].__name__}"
+                )
+        return typed, errors
+
+
+# Schema semua tabel; kolom pertama adalah primary key
+TABLE_SCHEMAS = {
+    'produk': TableSchema('produk', {
+        'id_produk': str,
+        'nama_produk': str,
+        'kategori': str,
+        'harga': float,
+        'stok': int,
+        'created_at': datetime,
+        'updated_at': datetime
+    }),
+    'pesanan': TableSchema('pesanan', {
+        'id_pesanan': str,
+        'id_pelanggan': str,
+        'id_produk': str,
+        'jumlah_dipesan': int,
+        'total_harga': float,
+        'status': str,
+        'tanggal_pesanan': datetime
+    }, date_field='tanggal_pesanan'),
+    'transaksi': TableSchema('transaksi', {
+        'id_transaksi': str,
+        'id_pesanan': str,
+        'total_harga': float,
+        'metode_pembayaran': str,
+        'tanggal_transaksi': datetime
+    }, date_field='tanggal_transaksi'),
+    # Buku besar mutasi stok, append-only (lihat utils/stock_ledger.py)
+    'stok_mutasi': TableSchema('stok_mutasi', {
+        'id_mutasi': str,
+        'id_produk': str,
+        'delta': int,
+        'alasan': str,
+        'ref_id': str,
+        'tanggal': datetime
+    }, date_field='tanggal'),
+    # Riwayat perubahan status pesanan, append-only (lihat utils/status_history.py)
+    'status_pesanan': TableSchema('status_pesanan', {
+        'id_status': str,
+        'id_pesanan': str,
+        'id_produk': str,
+        'status_lama': str,
+        'status': str,
+        'tanggal': datetime
+    }, date_field='tanggal'),
+}
@@ -0,0 +1,497 @@
+"""
+Indeks pencarian teks untuk tabel di memori (misalnya katalog produk).
+
+Teks kolom yang diindeks dipecah menjadi token huruf/angka kecil. Sebuah baris
+cocok jika setiap token query adalah awalan dari salah satu token baris, jadi
+"gam hit" menemukan "Gamis Hitam". Posting list per token dan daftar token
+terurut (untuk mencari semua token berawalan tertentu) dijaga saat baris
+ditambah atau diubah, tidak dibangun ulang setiap kali mencari.
+
+Pencarian berperingkat (ranked) juga menerima salah ketik: kandidat token
+dicari lewat indeks trigram, hanya MAX_FUZZY_CANDIDATES token dengan trigram
+bersama terbanyak yang dihitung edit distance-nya. Baris diurutkan berdasarkan
+kualitas kecocokan (persis > awalan > salah ketik) ditambah bobot opsional,
+misalnya kecepatan penjualan produk.
+"""
+import bisect
+import heapq
+import itertools
+import operator
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Karakter terbesar, batas atas rentang token berawalan tertentu di daftar terurut
+_MAX_CHAR = '\U0010ffff'
+
+# Di atas jumlah kandidat ini, term dicek lewat posting list (operasi set) bukan per baris
+NARROW_SCAN_LIMIT = 256
+
+# Di atas jumlah kandidat ini, skor awalan dihitung lewat posting list bukan per baris
+PREFIX_SCAN_LIMIT = 2048
+
+# Token kandidat salah ketik per term yang dihitung edit distance-nya
+MAX_FUZZY_CANDIDATES = 64
+# Term sependek ini hanya dicocokkan sebagai awalan, salah ketiknya terlalu ambigu
+MIN_FUZZY_LENGTH = 3
+# Skor kecocokan satu term: token persis, awalan token, dan salah ketik per edit
+SCORE_EXACT = 1.0
+SCORE_PREFIX = 0.75
+SCORE_FUZZY = 0.6
+FUZZY_PENALTY = 0.25
+# Jumlah hasil term yang disimpan untuk pengetikan berikutnya
+TERM_CACHE_SIZE = 256
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Memecah teks menjadi token huruf kecil"""
+    text = (text or '').lower()
+    tokens = text.split()
+    # split() jauh lebih cepat dan hasilnya sama jika setiap kata hanya berisi huruf/angka
+    if all(token.isalnum() for token in tokens):
+        return tokens
+    return _TOKEN_RE.findall(text)
+
+
+def row_tokens(row: Dict, fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Token unik semua kolom teks satu baris"""
+    tokens = []
+    for field in fields:
+        tokens += tokenize(row.get(field))
+    return tuple(dict.fromkeys(tokens))
+
+
+def trigrams(token: str) -> Set[str]:
+    """Trigram token dengan penanda awal dan akhir kata"""
+    padded = f"^{token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Jarak Damerau-Levenshtein (tukar dua huruf bersebelahan dihitung satu edit),
+    berhenti lebih awal dan mengembalikan limit + 1 jika jarak melebihi limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def max_typos(term: str) -> int:
+    """Jumlah salah ketik yang masih diterima untuk satu term"""
+    return 1 if len(term) <= 5 else 2
+
+
+def matches(tokens: Iterable[str], terms: List[str]) -> bool:
+    """True jika setiap term adalah awalan dari salah satu token"""
+    tokens = tuple(tokens)
+    return all(any(token.startswith(term) for token in tokens) for term in terms)
+
+
+class SearchIndex:
+    """
+    Posting list token -> posisi baris untuk beberapa kolom teks satu tabel.
+    Posisi adalah urutan penyisipan baris, sehingga posting list selalu terurut
+    dan hasil pencarian mengikuti urutan tabel tanpa perlu diurutkan ulang.
+    """
+
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = fields
+        # token -> posisi baris, terurut naik
+        self._postings: Dict[str, List[int]] = {}
+        # Semua token, terurut untuk pencarian awalan dengan bisect
+        self._vocab: List[str] = []
+        # Baris dan tokennya per posisi, serta id(baris) -> posisi untuk update in-place
+        self._rows: List[Dict] = []
+        self._tokens: List[Tuple[str, ...]] = []
+        self._positions: Dict[int, int] = {}
+        # Naik setiap token baris berubah; hasil pencarian terakhir hanya dipakai ulang pada versi yang sama
+        self.version = 0
+        self._last: Optional[Tuple[int, str, List[str], List[int]]] = None
+        # trigram -> token, dibangun saat pencarian berperingkat pertama lalu dijaga bersama daftar token
+        self._grams: Optional[Dict[str, Set[str]]] = None
+        # term -> {token: skor} untuk pengetikan berikutnya; dikosongkan jika daftar token berubah
+        self._term_cache: Dict[str, Dict[str, float]] = {}
+        # kolom kunci -> {nilai: posisi}, untuk bobot per kunci pada pencarian berperingkat
+        self._keys: Dict[str, Dict[str, int]] = {}
+        # (boost, (kolom, jumlah baris), bobot per posisi) dari pencarian terakhir
+        self._boost_cache = None
+
+    @classmethod
+    def build(cls, rows: Iterable[Dict], fields: Tuple[str, ...]) -> 'SearchIndex':
+        """Membangun indeks dari seluruh baris tabel sesuai urutan penyisipan"""
+        index = cls(fields)
+        postings = index._postings
+        # Nilai kolom yang berulang (misalnya kategori) cukup di-tokenize sekali
+        memos = {field: {} for field in fields}
+        for position, row in enumerate(rows):
+            tokens = []
+            for field in fields:
+                text = row.get(field)
+                field_tokens = memos[field].get(text)
+                if field_tokens is None:
+                    field_tokens = memos[field][text] = tokenize(text)
+                tokens += field_tokens
+            tokens = tuple(dict.fromkeys(tokens))
+            index._rows.append(row)
+            index._tokens.append(tokens)
+            index._positions[id(row)] = position
+            for token in tokens:
+                posting = postings.get(token)
+                if posting is None:
+                    postings[token] = [position]
+                else:
+                    posting.append(position)
+        index._vocab = sorted(postings)
+        return index
+
+    def _post(self, position: int, tokens: Tuple[str, ...]) -> None:
+        """Mendaftarkan token satu baris ke posting list"""
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                self._postings[token] = [position]
+                bisect.insort(self._vocab, token)
+                self._term_cache.clear()
+                if self._grams is not None:
+                    for gram in trigrams(token):
+                        self._grams.setdefault(gram, set()).add(token)
+            elif posting[-1] < position:
+                posting.append(position)
+            else:
+                bisect.insort(posting, position)
+
+    def _unpost(self, position: int, tokens: Tuple[str, ...]) -> None:
+        """Menghapus token lama satu baris dari posting list"""
+        for token in tokens:
+            posting = self._postings[token]
+            del posting[bisect.bisect_left(posting, position)]
+            if not posting:
+                del self._postings[token]
+                del self._vocab[bisect.bisect_left(self._vocab, token)]
+                self._term_cache.clear()
+                if self._grams is not None:
+                    for gram in trigrams(token):
+                        self._grams[gram].discard(token)
+
+    def add(self, row: Dict) -> None:
+        """Menambahkan satu baris baru (di akhir tabel) ke indeks"""
+        position = len(self._rows)
+        tokens = row_tokens(row, self.fields)
+        self._rows.append(row)
+        self._tokens.append(tokens)
+        self._positions[id(row)] = position
+        for field, keys in self._keys.items():
+            keys[row.get(field)] = position
+        self._post(position, tokens)
+        self.version += 1
+
+    def remove_last(self, row: Dict) -> None:
+        """Membatalkan add() untuk baris terakhir, misalnya saat transaksi di-rollback"""
+        position = len(self._rows) - 1
+        self._unpost(position, self._tokens[position])
+        self._rows.pop()
+        self._tokens.pop()
+        del self._positions[id(row)]
+        for field, keys in self._keys.items():
+            if keys.get(row.get(field)) == position:
+                del keys[row.get(field)]
+        self.version += 1
+
+    def update(self, row: Dict) -> None:
+        """Memperbarui token baris yang diubah in-place, posisinya di hasil tetap"""
+        position = self._positions[id(row)]
+        tokens = row_tokens(row, self.fields)
+        if self._tokens[position] == tokens:
+            # Misalnya hanya stok atau harga yang berubah
+            return
+        self._unpost(position, self._tokens[position])
+        self._tokens[position] = tokens
+        self._post(position, tokens)
+        self.version += 1
+
+    def _prefix_positions(self, term: str) -> List[int]:
+        """Posisi terurut semua baris yang punya token berawalan term"""
+        low = bisect.bisect_left(self._vocab, term)
+        high = bisect.bisect_left(self._vocab, term + _MAX_CHAR, low)
+        if high - low == 1:
+            return list(self._postings[self._vocab[low]])
+        positions = set()
+        for token in self._vocab[low:high]:
+            positions.update(self._postings[token])
+        return sorted(positions)
+
+    def search(self, query: str) -> List[Dict]:
+        """Baris yang cocok dengan query sesuai urutan penyisipan; query kosong mengembalikan semua baris"""
+        if not tokenize(query):
+            return list(self._rows)
+        rows = self._rows
+        return [rows[position] for position in self._match_positions(query)]
+
+    def _match_positions(self, query: str) -> List[int]:
+        """
+        Posisi terurut baris yang setiap term query-nya cocok sebagai awalan token.
+        Jika query hanya memperpanjang query sebelumnya, hasil sebelumnya dipersempit.
+        """
+        terms = tokenize(query)
+        query = query.lower()
+        terms = sorted(dict.fromkeys(terms), key=len, reverse=True)
+        last = self._last
+        if last is not None and last[0] == self.version and query.startswith(last[1]):
+            # Query hanya diperpanjang (pengetikan berikutnya): hasilnya subset dari hasil sebelumnya,
+            # cukup dicek dengan term yang belum ada di query sebelumnya
+            positions = last[3]
+            rest = [term for term in terms if term not in last[2]]
+        else:
+            # Term terpanjang biasanya paling selektif, sisanya dicek pada kandidatnya
+            positions, rest = self._prefix_positions(terms[0]), terms[1:]
+        for term in rest:
+            positions = self._narrow(positions, term)
+
+        self._last = (self.version, query, terms, positions)
+        return positions
+
+    def _narrow(self, positions: List[int], term: str) -> List[int]:
+        """Posisi yang barisnya juga punya token berawalan term, urutannya tetap"""
+        if len(positions) <= NARROW_SCAN_LIMIT:
+            tokens = self._tokens
+            return [position for position in positions if matches(tokens[position], [term])]
+        allowed = set(self._prefix_positions(term))
+        return [position for position in positions if position in allowed]
+
+    def _prefix_scores(self, term: str) -> Dict[str, float]:
+        """Token berawalan term beserta skornya (persis atau awalan)"""
+        scores = {}
+        low = bisect.bisect_left(self._vocab, term)
+        high = bisect.bisect_left(self._vocab, term + _MAX_CHAR, low)
+        for token in self._vocab[low:high]:
+            # Awalan yang lebih lengkap sedikit lebih tinggi, tetap di bawah token persis
+            scores[token] = SCORE_EXACT if token == term else SCORE_PREFIX + 0.2 * len(term) / len(token)
+        return scores
+
+    def _term_scores(self, term: str) -> Dict[str, float]:
+        """Token yang cocok dengan satu term beserta skornya: persis, awalan, atau salah ketik"""
+        scores = self._term_cache.get(term)
+        if scores is not None:
+            return scores
+
+        scores = self._prefix_scores(term)
+        if len(term) >= MIN_FUZZY_LENGTH:
+            if self._grams is None:
+                self._grams = {}
+                for token in self._vocab:
+                    for gram in trigrams(token):
+                        self._grams.setdefault(gram, set()).add(token)
+            # Kandidat: token dengan trigram bersama terbanyak, edit distance hanya untuk yang teratas
+            shared: Dict[str, int] = {}
+            for gram in trigrams(term):
+                for token in self._grams.get(gram, ()):
+                    shared[token] = shared.get(token, 0) + 1
+            limit = max_typos(term)
+            for token in heapq.nlargest(MAX_FUZZY_CANDIDATES, shared, key=shared.__getitem__):
+                if token in scores:
+                    continue
+                # Term bisa berupa kata lengkap yang salah ketik atau awalan kata yang sedang diketik
+                distance = min(
+                    edit_distance(term, token, limit),
+                    edit_distance(term, token[:len(term)], limit),
+                    edit_distance(term, token[:len(term) + 1], limit)
+                )
+                if distance <= limit:
+                    scores[token] = SCORE_FUZZY - FUZZY_PENALTY * (distance - 1)
+
+        if len(self._term_cache) >= TERM_CACHE_SIZE:
+            self._term_cache.clear()
+        self._term_cache[term] = scores
+        return scores
+
+    def _key_position(self, field: str, key: str) -> Optional[int]:
+        """Posisi baris dengan nilai kolom kunci tertentu, melalui peta yang dibangun sekali"""
+        keys = self._keys.get(field)
+        if keys is None:
+            keys = self._keys[field] = {row.get(field): position for position, row in enumerate(self._rows)}
+        position = keys.get(key)
+        if position is not None and self._rows[position].get(field) != key:
+            # Kunci baris diubah sejak peta dibangun
+            del self._keys[field]
+            return self._key_position(field, key)
+        return position
+
+    def _boost_positions(self, boost: Dict[str, float], field: str) -> Dict[int, float]:
+        """
+        Bobot per posisi baris. Disimpan selama objek boost yang sama dipakai
+        lagi, misalnya pada ketikan berikutnya
+        """
+        cached = self._boost_cache
+        if cached is not None and cached[0] is boost and cached[1] == (field, len(self._rows)):
+            return cached[2]
+        weights = {}
+        for key, weight in boost.items():
+            position = self._key_position(field, key)
+            if position is not None and weight > 0:
+                weights[position] = weight
+        self._boost_cache = (boost, (field, len(self._rows)), weights)
+        return weights
+
+    def _groups(self, terms: List[str]) -> List[Tuple[float, List[Iterable[int]]]]:
+        """
+        Kandidat dikelompokkan per skor kecocokan (tertinggi lebih dulu); setiap
+        kelompok berisi satu atau beberapa daftar posisi yang urut naik
+        """
+        if not terms:
+            return [(0.0, [range(len(self._rows))])]
+
+        if len(terms) == 1:
+            # Satu term: skor hanya bergantung pada token, posting list dipakai langsung
+            by_score: Dict[float, List[List[int]]] = {}
+            for token, score in self._term_scores(terms[0]).items():
+                by_score.setdefault(score, []).append(self._postings[token])
+            return sorted(by_score.items(), reverse=True)
+
+        scores = None
+        # Term terpanjang biasanya paling selektif, term berikutnya hanya dicek pada kandidatnya
+        for term in sorted(terms, key=len, reverse=True):
+            term_scores = self._term_scores(term)
+            best: Dict[int, float] = {}
+            if scores is not None and len(scores) < sum(map(len, map(self._postings.__getitem__, term_scores))):
+                # Kandidat lebih sedikit dari posting list term: cukup periksa token setiap kandidat
+                for position in scores:
+                    score = max([term_scores.get(token, 0.0) for token in self._tokens[position]], default=0.0)
+                    if score:
+                        best[position] = score
+            else:
+                # Skor lebih tinggi menimpa skor lebih rendah untuk baris yang sama
+                for token, score in sorted(term_scores.items(), key=lambda item: item[1]):
+                    best.update(dict.fromkeys(self._postings[token], score))
+            scores = best if scores is None else {
+                position: total + best[position] for position, total in scores.items() if position in best
+            }
+            if not scores:
+                break
+        grouped: Dict[float, List[int]] = {}
+        for position, total in scores.items():
+            grouped.setdefault(total, []).append(position)
+        return [(total, [sorted(positions)]) for total, positions in sorted(grouped.items(), reverse=True)]
+
+    def ranked(self, query: str, limit: Optional[int] = None,
+               boost: Optional[Dict[str, float]] = None, boost_field: Optional[str] = None,
+               keep: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+        """
+        Baris yang cocok dengan setiap kata query (boleh salah ketik), diurutkan
+        dari kecocokan terbaik. boost (nilai boost_field -> bobot) ditambahkan ke
+        skor kecocokan rata-rata (0..1); keep(baris) menyaring baris sebelum
+        dibatasi limit. Query kosong mengurutkan semua baris berdasarkan boost saja.
+
+        Baris yang setiap katanya cocok sebagai awalan selalu didahulukan; kandidat
+        salah ketik hanya dicari jika baris itu belum memenuhi limit.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        weights = self._boost_positions(boost, boost_field) if boost else {}
+        if not terms:
+            return self._rank_groups(self._groups(terms), 1, weights, limit, keep)
+
+        # Tahap awalan: kandidat dari _match_positions, yang mempersempit hasil
+        # sebelumnya jika query hanya diperpanjang (pengetikan berikutnya)
+        count = len(terms)
+        positions = self._match_positions(query)
+        result = self._rank_groups(self._prefix_groups(terms, positions), count, weights, limit, keep)
+        if limit is not None and len(result) >= limit:
+            return result
+
+        # Tahap salah ketik untuk sisa limit, tanpa baris yang sudah diambil
+        taken = {self._positions[id(row)] for row in result}
+        if keep is None:
+            rest_keep = lambda row: self._positions[id(row)] not in taken
+        else:
+            rest_keep = lambda row: self._positions[id(row)] not in taken and keep(row)
+        rest_limit = None if limit is None else limit - len(result)
+        return result + self._rank_groups(self._groups(terms), count, weights, rest_limit, rest_keep)
+
+    def _prefix_groups(self, terms: List[str],
+                       positions: List[int]) -> List[Tuple[float, List[Iterable[int]]]]:
+        """
+        Kelompok skor seperti _groups, tetapi hanya untuk baris di positions dan
+        hanya kecocokan awalan; urutan penjumlahan skor sama dengan _groups
+        """
+        prefix = [self._prefix_scores(term) for term in sorted(terms, key=len, reverse=True)]
+        if len(prefix) == 1:
+            # Satu term: positions sama dengan gabungan posting list token berawalan
+            # term, skor hanya bergantung pada token sehingga posting list dipakai langsung
+            by_score: Dict[float, List[List[int]]] = {}
+            for token, score in prefix[0].items():
+                by_score.setdefault(score, []).append(self._postings[token])
+            return sorted(by_score.items(), reverse=True)
+        if len(positions) <= PREFIX_SCAN_LIMIT:
+            # Kandidat sedikit: cukup periksa token setiap baris
+            tokens = self._tokens
+            totals = [
+                sum([max([scores.get(token, 0.0) for token in tokens[position]]) for scores in prefix])
+                for position in positions
+            ]
+        else:
+            # Kandidat banyak: skor per baris diambil dari posting list (operasi dict di level C)
+            totals = [0.0] * len(positions)
+            for scores in prefix:
+                best: Dict[int, float] = {}
+                for token, score in sorted(scores.items(), key=lambda item: item[1]):
+                    best.update(dict.fromkeys(self._postings[token], score))
+                totals = list(map(operator.add, totals, map(best.__getitem__, positions)))
+
+        grouped: Dict[float, List[int]] = {}
+        for position, total in zip(positions, totals):
+            grouped.setdefault(total, []).append(position)
+        return [(total, [group]) for total, group in sorted(grouped.items(), reverse=True)]
+
+    def _rank_groups(self, groups: List[Tuple[float, List[Iterable[int]]]], count: int,
+                     weights: Dict[int, float], limit: Optional[int],
+                     keep: Optional[Callable[[Dict], bool]]) -> List[Dict]:
+        """Baris kandidat _groups diurutkan berdasarkan skor rata-rata ditambah bobot"""
+        rows = self._rows
+
+        def take(items: Iterable[Tuple[float, int]]) -> List[Tuple[float, int]]:
+            """Item (skor, -posisi) terurut yang lolos keep, sampai limit"""
+            if keep is not None:
+                items = (item for item in items if keep(rows[-item[1]]))
+            return list(itertools.islice(items, limit))
+
+        # Baris berbobot (misalnya produk yang baru terjual) dinilai satu per satu,
+        # cukup dengan mengiris setiap daftar kandidat dengan peta bobot
+        found: Dict[int, float] = {}
+        if weights:
+            for score, sequences in groups:
+                for positions in sequences:
+                    if isinstance(positions, range):
+                        hits = weights
+                    else:
+                        hits = [position for position in positions if position in weights]
+                    for position in hits:
+                        found.setdefault(position, score)
+        boosted = take(sorted(
+            ((score / count + weights[position], -position) for position, score in found.items()),
+            reverse=True
+        ))
+
+        def plain() -> Iterator[Tuple[float, int]]:
+            """Baris lain per kelompok skor, posisi kecil lebih dulu"""
+            seen = set()
+            for score, sequences in groups:
+                positions = heapq.merge(*sequences) if len(sequences) > 1 else sequences[0]
+                for position in positions:
+                    if position not in seen and position not in found:
+                        seen.add(position)
+                        yield score / count, -position
+
+        ranked = heapq.merge(boosted, take(plain()), reverse=True)
+        return [rows[-position] for _, position in itertools.islice(ranked, limit)]
@@ -0,0 +1,74 @@
+"""
+Penulisan file atomik dan snapshot biner (pickle) di samping file sumbernya.
+
+atomic_write menulis ke file sementara di direktori yang sama lalu os.replace,
+sehingga pembaca tidak pernah melihat file setengah jadi.
+
+Snapshot menyimpan versi format dan stempel file sumber saat dibuat. Isinya
+hanya dipakai jika keduanya masih sama; jika tidak, pemanggil membangun ulang
+dari file sumber. Snapshot yang hilang atau rusak tidak pernah fatal.
+"""
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, IO, Iterator, Optional, Tuple
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'wb', encoding: Optional[str] = None,
+                 newline: Optional[str] = None, chmod: Optional[int] = None,
+                 durable: bool = False) -> Iterator[IO]:
+    """
+    Membuka file sementara untuk ditulis; saat blok selesai tanpa exception file
+    itu menggantikan path. chmod mengganti permission 0600 bawaan mkstemp,
+    durable=True melakukan fsync sebelum os.replace. Exception diteruskan ke
+    pemanggil setelah file sementara dihapus.
+    """
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.",
+        suffix='.tmp',
+        dir=os.path.dirname(os.path.abspath(path))
+    )
+    try:
+        with os.fdopen(fd, mode=mode, encoding=encoding, newline=newline) as file:
+            yield file
+            if durable:
+                file.flush()
+                os.fsync(file.fileno())
+        if chmod is not None:
+            os.chmod(temp_path, chmod)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_snapshot(path: str, version: int, stamp: Tuple, data: Dict, label: str = 'snapshot') -> bool:
+    """Menulis data beserta versi dan stempelnya secara atomik"""
+    snapshot = dict(data, version=version, stamp=stamp)
+    try:
+        with atomic_write(path) as file:
+            pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+        return True
+    except Exception as e:
+        print(f"Error writing {label}: {str(e)}")
+        return False
+
+
+def load_snapshot(path: str, version: int, stamp: Tuple, label: str = 'snapshot') -> Optional[Dict]:
+    """Membaca data snapshot, None jika tidak ada, rusak, atau versi/stempelnya berbeda"""
+    try:
+        with open(path, mode='rb') as file:
+            snapshot = pickle.load(file)
+        if snapshot.get('version') != version or tuple(snapshot.get('stamp', ())) != tuple(stamp):
+            return None
+        return snapshot
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error reading {label}: {str(e)}")
+        return None
@@ -0,0 +1,603 @@
+"""
+Backend SQLite untuk DatabaseManager
+
+Dipilih dengan environment variable HALALHUB_DB_BACKEND=sqlite. Data lama dari
+CSV dipindahkan sekali jalan dengan:
+    cd src && python -m utils.sqlite_database [base_path]
+"""
+import os
+import sys
+import sqlite3
+import threading
+from typing import Iterator, List, Dict, Optional, Set, Tuple
+from datetime import datetime
+from .database import DatabaseManager, CSVHandler, UnitOfWork
+from .metrics import instrumented, record_io
+from .rollup import DailySalesRollup
+from .search_index import SearchIndex, matches, row_tokens, tokenize
+from .status_history import (
+    STATUS_DIBATALKAN, STATUS_PENDING, STATUS_SELESAI, OrderStatusStats
+)
+from .stock_ledger import ALASAN_SALDO_AWAL, STOCK_LEDGER_TABLE
+
+SQLITE_FILENAME = 'halalhub.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS produk (
+    id_produk TEXT PRIMARY KEY,
+    nama_produk TEXT,
+    kategori TEXT,
+    harga REAL,
+    stok INTEGER,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS pesanan (
+    id_pesanan TEXT PRIMARY KEY,
+    id_pelanggan TEXT,
+    id_produk TEXT,
+    jumlah_dipesan INTEGER,
+    total_harga REAL,
+    status TEXT,
+    tanggal_pesanan TEXT
+);
+CREATE TABLE IF NOT EXISTS transaksi (
+    id_transaksi TEXT PRIMARY KEY,
+    id_pesanan TEXT,
+    total_harga REAL,
+    metode_pembayaran TEXT,
+    tanggal_transaksi TEXT
+);
+CREATE TABLE IF NOT EXISTS stok_mutasi (
+    id_mutasi TEXT PRIMARY KEY,
+    id_produk TEXT,
+    delta INTEGER,
+    alasan TEXT,
+    ref_id TEXT,
+    tanggal TEXT
+);
+CREATE TABLE IF NOT EXISTS status_pesanan (
+    id_status TEXT PRIMARY KEY,
+    id_pesanan TEXT,
+    id_produk TEXT,
+    status_lama TEXT,
+    status TEXT,
+    tanggal TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pesanan_status ON pesanan (status);
+CREATE INDEX IF NOT EXISTS idx_pesanan_tanggal ON pesanan (tanggal_pesanan);
+CREATE INDEX IF NOT EXISTS idx_pesanan_produk ON pesanan (id_produk);
+CREATE INDEX IF NOT EXISTS idx_transaksi_tanggal ON transaksi (tanggal_transaksi);
+CREATE INDEX IF NOT EXISTS idx_transaksi_pesanan ON transaksi (id_pesanan);
+CREATE INDEX IF NOT EXISTS idx_stok_mutasi_produk ON stok_mutasi (id_produk);
+CREATE INDEX IF NOT EXISTS idx_status_pesanan_pesanan ON status_pesanan (id_pesanan);
+CREATE INDEX IF NOT EXISTS idx_status_pesanan_status ON status_pesanan (status, tanggal);
+"""
+
+
+@instrumented
+class SQLiteDatabaseManager(DatabaseManager):
+    """Manager database dengan API yang sama seperti DatabaseManager, disimpan di SQLite"""
+
+    # Jumlah baris yang diambil sekali jalan oleh iter_produk/iter_pesanan/iter_transaksi
+    ITER_BATCH_SIZE = 1000
+
+    def __init__(self, base_path=None, db_file: Optional[str] = None):
+        self._db_file = db_file
+        self._conn_lock = threading.RLock()
+        # (tabel, kolom) -> (PRAGMA data_version, indeks pencarian, kunci -> baris indeks)
+        self._search_indexes: Dict[Tuple[str, tuple], Tuple[int, SearchIndex, Dict[str, Dict]]] = {}
+        super().__init__(base_path)
+
+    def _initialize_storage(self) -> None:
+        """Membuka koneksi SQLite (mode WAL) dan membuat tabel serta indeks"""
+        self.db_file = self._db_file or os.path.join(self.base_path, SQLITE_FILENAME)
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        with self._conn_lock:
+            # WAL agar beberapa kasir bisa membaca sambil satu proses menulis
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+            if self.conn.execute("SELECT 1 FROM stok_mutasi LIMIT 1").fetchone() is None:
+                # Database lama tanpa buku besar: stok saat ini menjadi saldo awal setiap produk
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO stok_mutasi (id_mutasi, id_produk, delta, alasan, ref_id, tanggal) "
+                    "SELECT 'AWAL-' || id_produk, id_produk, CAST(stok AS INTEGER), ?, '', created_at FROM produk",
+                    (ALASAN_SALDO_AWAL,)
+                )
+            if self.conn.execute("SELECT 1 FROM status_pesanan LIMIT 1").fetchone() is None:
+                # Riwayat status pesanan lama: pembuatan pada tanggal pesanan, status akhir
+                # pada tanggal transaksi (Selesai) atau tanpa tanggal jika tidak diketahui
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO status_pesanan "
+                    "SELECT 'BUAT-' || id_pesanan, id_pesanan, id_produk, '', ?, tanggal_pesanan FROM pesanan",
+                    (STATUS_PENDING,)
+                )
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO status_pesanan "
+                    "SELECT 'AWAL-' || p.id_pesanan, p.id_pesanan, p.id_produk, ?, p.status, "
+                    "CASE WHEN p.status = ? THEN COALESCE(MIN(t.tanggal_transaksi), '') ELSE '' END "
+                    "FROM pesanan p LEFT JOIN transaksi t ON t.id_pesanan = p.id_pesanan "
+                    "WHERE p.status != ? GROUP BY p.id_pesanan",
+                    (STATUS_PENDING, STATUS_SELESAI, STATUS_PENDING)
+                )
+            self.conn.commit()
+
+    def _storage_exists(self, file_type: str) -> bool:
+        """Tabel SQLite selalu dibuat saat inisialisasi"""
+        return True
+
+    def close(self) -> None:
+        """Menutup koneksi SQLite"""
+        with self._conn_lock:
+            self.conn.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict]:
+        """Menjalankan query dan mengembalikan baris dalam format yang sama dengan CSV"""
+        with self._conn_lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        record_io(rows_read=len(rows))
+        return [CSVHandler.to_row(dict(row), list(row.keys())) for row in rows]
+
+    def _rows(self, file_type: str) -> List[Dict]:
+        """Mengambil seluruh baris tabel sesuai urutan penyisipan"""
+        return self._query(f"SELECT * FROM {file_type} ORDER BY rowid")
+
+    def _typed_rows(self, file_type: str) -> List[Dict]:
+        """Tidak ada cache tabel pada SQLite, baris di-decode setiap kali diminta"""
+        schema = self.schema[file_type]
+        return [schema.decode(row)[0] for row in self._rows(file_type)]
+
+    def _range(self, file_type: str, start: datetime, end: datetime,
+               typed: bool = False) -> List[Dict]:
+        """Range query pada indeks kolom tanggal, dicek ulang dengan datetime"""
+        schema = self.schema[file_type]
+        field = schema.date_field
+        rows = self._query(
+            f"SELECT * FROM {file_type} WHERE {field} >= ? AND {field} <= ? "
+            f"ORDER BY {field}, rowid",
+            (start.date().isoformat(), end.isoformat() + '~')
+        )
+
+        result = []
+        for row in rows:
+            typed_row = schema.decode(row)[0]
+            tanggal = typed_row[field]
+            if tanggal is not None and start <= tanggal <= end:
+                result.append(typed_row if typed else row)
+        return result
+
+    def _group(self, file_type: str, field: str, value: str, typed: bool = False) -> List[Dict]:
+        """Query pada indeks kolom (misalnya idx_pesanan_status, idx_status_pesanan_pesanan)"""
+        rows = self._query(f"SELECT * FROM {file_type} WHERE {field} = ? ORDER BY rowid", (value,))
+        if typed:
+            schema = self.schema[file_type]
+            return [schema.decode(row)[0] for row in rows]
+        return rows
+
+    def _search(self, file_type: str, fields: tuple, query: str,
+                where: Optional[Dict[str, str]] = None, typed: bool = False) -> List[Dict]:
+        """Prefilter LIKE per kata di SQL, lalu dicek ulang dengan aturan awalan token yang sama"""
+        terms = tokenize(query)
+        text = " || ' ' || ".join(f"COALESCE({field}, '')" for field in fields)
+        conditions, params = [], []
+        for term in terms:
+            conditions.append(f"({text}) LIKE ? ESCAPE '\\'")
+            escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        for field, value in (where or {}).items():
+            conditions.append(f"{field} = ?")
+            params.append(value)
+        sql = f"SELECT * FROM {file_type}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        rows = self._query(sql + " ORDER BY rowid", tuple(params))
+
+        rows = [row for row in rows if matches(row_tokens(row, fields), terms)]
+        if typed:
+            schema = self.schema[file_type]
+            return [schema.decode(row)[0] for row in rows]
+        return rows
+
+    def _search_index(self, file_type: str, fields: tuple) -> Tuple[SearchIndex, Dict[str, Dict]]:
+        """
+        Indeks pencarian di memori atas kunci dan kolom teks tabel. Dijaga oleh
+        _log_change untuk penulisan dari koneksi ini, dibangun ulang jika
+        PRAGMA data_version menandakan koneksi lain sudah menulis.
+        """
+        key_field = self.primary_keys[file_type]
+        with self._conn_lock:
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            cached = self._search_indexes.get((file_type, fields))
+            if cached is None or cached[0] != version:
+                columns = ', '.join(dict.fromkeys((key_field,) + tuple(fields)))
+                rows = self._query(f"SELECT {columns} FROM {file_type} ORDER BY rowid")
+                cached = (version, SearchIndex.build(rows, fields), {row[key_field]: row for row in rows})
+                self._search_indexes[(file_type, fields)] = cached
+        return cached[1], cached[2]
+
+    def _update_search_indexes(self, file_type: str, op: str, row: Dict) -> None:
+        """Menerapkan satu mutasi yang sudah berhasil ke indeks pencarian tabel"""
+        key_field = self.primary_keys[file_type]
+        for (table, fields), (_, index, rows) in list(self._search_indexes.items()):
+            if table != file_type:
+                continue
+            if op == 'delete':
+                # Penghapusan jarang terjadi, indeks dibangun ulang saat dibutuhkan
+                del self._search_indexes[(table, fields)]
+                continue
+            indexed = rows.get(row[key_field])
+            if indexed is not None:
+                indexed.update((field, row[field]) for field in fields)
+                index.update(indexed)
+            elif op == 'insert':
+                indexed = rows[row[key_field]] = {field: row[field] for field in (key_field,) + tuple(fields)}
+                index.add(indexed)
+
+    def _search_ranked(self, file_type: str, fields: tuple, query: str,
+                       limit: Optional[int] = None, boost: Optional[Dict[str, float]] = None,
+                       where: Optional[Dict[str, str]] = None, typed: bool = False) -> List[Dict]:
+        """
+        Peringkat dihitung pada indeks di memori (filter where memakai kolom yang
+        diindeks), lalu baris lengkap hasilnya diambil lewat primary key
+        """
+        key_field = self.primary_keys[file_type]
+        with self._conn_lock:
+            index, _ = self._search_index(file_type, fields)
+            keys = [row[key_field] for row in index.ranked(query, limit, boost, key_field, self._where(where))]
+
+        found = {}
+        for start in range(0, len(keys), self.ITER_BATCH_SIZE):
+            batch = keys[start:start + self.ITER_BATCH_SIZE]
+            for row in self._query(
+                f"SELECT * FROM {file_type} WHERE {key_field} IN ({', '.join('?' for _ in batch)})", tuple(batch)
+            ):
+                found[row[key_field]] = row
+        rows = [found[key] for key in keys if key in found]
+        if typed:
+            schema = self.schema[file_type]
+            return [schema.decode(row)[0] for row in rows]
+        return rows
+
+    def _tail(self, file_type: str, limit: Optional[int] = None, typed: bool = False) -> List[Dict]:
+        """Baris terakhir tabel sesuai urutan penyisipan"""
+        rows = self._query(f"SELECT * FROM {file_type} ORDER BY rowid DESC LIMIT ?", (limit or -1,))
+        rows.reverse()
+        if typed:
+            schema = self.schema[file_type]
+            return [schema.decode(row)[0] for row in rows]
+        return rows
+
+    def _saldo_stok(self, id_produk: str) -> Optional[int]:
+        """SUM(delta) pada indeks idx_stok_mutasi_produk, None jika produk belum punya mutasi"""
+        with self._conn_lock:
+            count, saldo = self.conn.execute(
+                f"SELECT COUNT(*), SUM(delta) FROM {STOCK_LEDGER_TABLE} WHERE id_produk = ?", (id_produk,)
+            ).fetchone()
+        return int(saldo) if count else None
+
+    def _group_count(self, file_type: str, field: str, value: str) -> int:
+        """COUNT(*) pada indeks kolom"""
+        with self._conn_lock:
+            return self.conn.execute(
+                f"SELECT COUNT(*) FROM {file_type} WHERE {field} = ?", (value,)
+            ).fetchone()[0]
+
+    def _iter(self, file_type: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              filters: Optional[Dict[str, str]] = None, typed: bool = False) -> Iterator[Dict]:
+        """Filter dijalankan di SQL, hasilnya diambil per batch agar memori tetap kecil"""
+        schema = self.schema[file_type]
+        field = schema.date_field
+        clauses, params = [], []
+        for column, value in (filters or {}).items():
+            clauses.append(f"{column} = ?")
+            params.append(value)
+        if start is not None:
+            clauses.append(f"{field} >= ?")
+            params.append(start.date().isoformat())
+        if end is not None:
+            clauses.append(f"{field} <= ?")
+            params.append(end.isoformat() + '~')
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        with self._conn_lock:
+            cursor = self.conn.execute(f"SELECT * FROM {file_type}{where} ORDER BY rowid", params)
+        while True:
+            with self._conn_lock:
+                batch = cursor.fetchmany(self.ITER_BATCH_SIZE)
+            if not batch:
+                return
+            record_io(rows_read=len(batch))
+            for row in batch:
+                row = CSVHandler.to_row(dict(row), list(row.keys()))
+                if start is None and end is None and not typed:
+                    yield row
+                    continue
+                typed_row = schema.decode(row)[0]
+                tanggal = typed_row.get(field) if field else None
+                # Range query di atas sedikit lebih lebar, cek ulang dengan datetime
+                if (start is not None or end is not None) and (
+                        tanggal is None or (start is not None and tanggal < start)
+                        or (end is not None and tanggal > end)):
+                    continue
+                yield typed_row if typed else row
+
+    def get_decode_errors(self, file_type: str) -> List[str]:
+        """Mengambil error parsing kolom bertipe untuk satu tabel"""
+        schema = self.schema[file_type]
+        return [error for row in self._rows(file_type) for error in schema.decode(row)[1]]
+
+    def _existing_keys(self, file_type: str, keys: List[str]) -> Set[str]:
+        """Primary key dari keys yang sudah ada di tabel, dicek per batch"""
+        key_field = self.primary_keys[file_type]
+        existing = set()
+        for start in range(0, len(keys), self.ITER_BATCH_SIZE):
+            batch = keys[start:start + self.ITER_BATCH_SIZE]
+            for row in self._query(
+                f"SELECT {key_field} FROM {file_type} WHERE {key_field} IN ({', '.join('?' for _ in batch)})",
+                tuple(batch)
+            ):
+                existing.add(row[key_field])
+        return existing
+
+    def _get_by_id(self, file_type: str, record_id: str) -> Optional[Dict]:
+        """Mencari satu baris berdasarkan primary key (indeks SQLite)"""
+        key_field = self.primary_keys[file_type]
+        rows = self._query(f"SELECT * FROM {file_type} WHERE {key_field} = ?", (record_id,))
+        return rows[0] if rows else None
+
+    def _log_change(self, file_type: str, op: str, record: Dict) -> bool:
+        """Menerapkan satu mutasi langsung ke tabel SQLite"""
+        fields = self.field_definitions[file_type]
+        key_field = self.primary_keys[file_type]
+        row = CSVHandler.to_row(record, fields)
+
+        if op == 'insert':
+            # Primary key menolak ID yang sudah ada (IntegrityError -> False)
+            sql = (
+                f"INSERT INTO {file_type} ({', '.join(fields)}) "
+                f"VALUES ({', '.join('?' for _ in fields)})"
+            )
+            params = tuple(row[f] for f in fields)
+        elif op == 'update':
+            assignments = ', '.join(f"{f} = ?" for f in fields if f != key_field)
+            sql = f"UPDATE {file_type} SET {assignments} WHERE {key_field} = ?"
+            params = tuple(row[f] for f in fields if f != key_field) + (row[key_field],)
+        elif op == 'delete':
+            sql = f"DELETE FROM {file_type} WHERE {key_field} = ?"
+            params = (row[key_field],)
+        else:
+            return False
+
+        try:
+            # Write lock menahan penulis lain selama transaksi belum di-commit
+            with self._write_lock, self._conn_lock:
+                if self._unit_of_work is not None:
+                    # Di-commit bersama perubahan lain di akhir transaksi
+                    cursor = self.conn.execute(sql, params)
+                else:
+                    with self.conn:
+                        cursor = self.conn.execute(sql, params)
+                if cursor.rowcount > 0 and self._search_indexes:
+                    self._update_search_indexes(file_type, op, row)
+            record_io(rows_written=max(0, cursor.rowcount))
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Error writing to SQLite: {str(e)}")
+            return False
+
+    def _commit_unit_of_work(self, uow: UnitOfWork) -> bool:
+        """Unit of work dipetakan ke satu transaksi SQLite"""
+        with self._conn_lock:
+            try:
+                self.conn.commit()
+                return True
+            except sqlite3.Error as e:
+                print(f"Error writing to SQLite: {str(e)}")
+                self.conn.rollback()
+                return False
+
+    def _rollback_unit_of_work(self, uow: UnitOfWork) -> None:
+        """Membatalkan transaksi SQLite yang sedang berjalan"""
+        with self._conn_lock:
+            self.conn.rollback()
+            # Indeks pencarian mungkin sudah memuat perubahan yang dibatalkan
+            self._search_indexes.clear()
+
+    def compact(self) -> bool:
+        """Tidak ada change log pada backend SQLite"""
+        return True
+
+    # Laporan dan Analisis
+    def generate_laporan_penjualan(self, start_date: datetime, end_date: datetime) -> Dict:
+        """Membuat laporan penjualan dengan range query pada indeks tanggal_transaksi"""
+        try:
+            with self._conn_lock:
+                rows = self.conn.execute(
+                    """
+                    SELECT t.id_transaksi, t.tanggal_transaksi, t.total_harga,
+                           t.metode_pembayaran, p.id_pelanggan, p.jumlah_dipesan,
+                           pr.nama_produk
+                    FROM transaksi t
+                    LEFT JOIN pesanan p ON p.id_pesanan = t.id_pesanan
+                    LEFT JOIN produk pr ON pr.id_produk = p.id_produk
+                    WHERE t.tanggal_transaksi >= ? AND t.tanggal_transaksi <= ?
+                    ORDER BY t.rowid
+                    """,
+                    (start_date.date().isoformat(), end_date.isoformat() + '~')
+                ).fetchall()
+            record_io(rows_read=len(rows))
+
+            filtered_data = []
+            total_penjualan = 0
+
+            for row in rows:
+                try:
+                    # Range query di atas sedikit lebih lebar, cek ulang dengan datetime
+                    tanggal = datetime.fromisoformat(row['tanggal_transaksi'])
+                    if not start_date <= tanggal <= end_date:
+                        continue
+
+                    has_pesanan = row['id_pelanggan'] is not None
+                    data = {
+                        'id_transaksi': row['id_transaksi'],
+                        'tanggal_transaksi': row['tanggal_transaksi'],
+                        'id_pelanggan': row['id_pelanggan'] if has_pesanan else '-',
+                        'nama_produk': row['nama_produk'] if row['nama_produk'] is not None else '-',
+                        'jumlah': str(row['jumlah_dipesan']) if has_pesanan else 1,
+                        'total_harga': float(row['total_harga']),
+                        'metode_pembayaran': row['metode_pembayaran'] or 'Tunai'
+                    }
+
+                    filtered_data.append(data)
+                    total_penjualan += data['total_harga']
+
+                except (TypeError, ValueError) as e:
+                    print(f"Error processing transaction: {str(e)}, Transaction ID: {row['id_transaksi']}")
+                    continue
+
+            return {
+                'total_penjualan': total_penjualan,
+                'jumlah_transaksi': len(filtered_data),
+                'transaksi_list': filtered_data
+            }
+
+        except Exception as e:
+            print(f"Error generating sales report: {str(e)}")
+            return {
+                'total_penjualan': 0,
+                'jumlah_transaksi': 0,
+                'transaksi_list': []
+            }
+
+    def get_penjualan_harian(self, start_date: datetime, end_date: datetime) -> List[Dict]:
+        """Ringkasan penjualan per hari, dihitung dari range query pada indeks tanggal_transaksi"""
+        with self._conn_lock:
+            rows = self.conn.execute(
+                """
+                SELECT t.*, p.id_produk, p.jumlah_dipesan
+                FROM transaksi t
+                LEFT JOIN pesanan p ON p.id_pesanan = t.id_pesanan
+                WHERE t.tanggal_transaksi >= ? AND t.tanggal_transaksi <= ?
+                """,
+                (start_date.isoformat()[:10], end_date.isoformat()[:10] + '~')
+            ).fetchall()
+        record_io(rows_read=len(rows))
+
+        rollup = DailySalesRollup()
+        transaksi_schema, pesanan_schema = self.schema['transaksi'], self.schema['pesanan']
+        for row in rows:
+            row = dict(row)
+            pesanan = None
+            if row['id_produk'] is not None:
+                pesanan = pesanan_schema.decode(
+                    {'id_produk': row['id_produk'], 'jumlah_dipesan': row['jumlah_dipesan']}
+                )[0]
+            rollup.add(transaksi_schema.decode(row)[0], pesanan)
+        return rollup.range(start_date, end_date)
+
+    def get_waktu_penyelesaian(self, start_date: datetime, end_date: datetime) -> List[Dict]:
+        """Rata-rata waktu pembuatan sampai Selesai per tanggal selesai, dari indeks (status, tanggal)"""
+        with self._conn_lock:
+            rows = self.conn.execute(
+                """
+                SELECT substr(s.tanggal, 1, 10) AS hari,
+                       AVG((julianday(s.tanggal) - julianday(b.tanggal)) * 86400) AS rata_rata_detik,
+                       COUNT(*) AS jumlah_selesai
+                FROM status_pesanan s
+                JOIN status_pesanan b ON b.id_pesanan = s.id_pesanan AND b.status_lama = ''
+                WHERE s.status = ? AND s.tanggal >= ? AND s.tanggal <= ? AND b.tanggal != ''
+                GROUP BY hari
+                ORDER BY hari
+                """,
+                (STATUS_SELESAI, start_date.date().isoformat(), end_date.date().isoformat() + '~')
+            ).fetchall()
+        record_io(rows_read=len(rows))
+        return [
+            {
+                'tanggal': datetime.fromisoformat(row['hari']).date(),
+                'rata_rata_detik': row['rata_rata_detik'],
+                'jumlah_selesai': row['jumlah_selesai']
+            }
+            for row in rows
+        ]
+
+    def get_tingkat_pembatalan(self, limit: Optional[int] = None) -> List[Dict]:
+        """Tingkat pembatalan per produk dihitung dengan GROUP BY pada event terakhir setiap pesanan"""
+        # Event terakhir membawa produk dan status pesanan saat ini, termasuk setelah produknya diganti
+        with self._conn_lock:
+            rows = self.conn.execute(
+                """
+                SELECT id_produk,
+                       COUNT(*) AS jumlah_pesanan,
+                       SUM(status = ?) AS jumlah_dibatalkan
+                FROM status_pesanan
+                WHERE rowid IN (SELECT MAX(rowid) FROM status_pesanan GROUP BY id_pesanan)
+                GROUP BY id_produk
+                """,
+                (STATUS_DIBATALKAN,)
+            ).fetchall()
+        stats = OrderStatusStats()
+        stats.produk = {row['id_produk']: [row['jumlah_pesanan'], row['jumlah_dibatalkan']] for row in rows}
+        result = stats.pembatalan()
+        return result[:limit] if limit else result
+
+    def rebuild_sales_rollup(self) -> int:
+        """Ringkasan dihitung langsung dari tabel transaksi, tidak ada yang perlu dibangun ulang"""
+        return len(self.get_penjualan_harian(datetime.min, datetime.max))
+
+    def get_produk_terlaris(self, limit: int = 5) -> List[Dict]:
+        """Mendapatkan daftar produk terlaris"""
+        with self._conn_lock:
+            rows = self.conn.execute(
+                """
+                SELECT id_produk, SUM(jumlah_dipesan) AS jumlah_dipesan
+                FROM pesanan
+                GROUP BY id_produk
+                ORDER BY jumlah_dipesan DESC
+                LIMIT ?
+                """,
+                (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_stok_menipis(self, batas_minimum: int = 10) -> List[Dict]:
+        """Mendapatkan daftar produk dengan stok menipis"""
+        rows = self._query("SELECT * FROM produk WHERE stok <= ? ORDER BY rowid", (batas_minimum,))
+        for row in rows:
+            row['stok'] = int(row['stok'])
+        return rows
+
+
+def migrate_csv_to_sqlite(base_path=None, db_file: Optional[str] = None) -> Dict[str, int]:
+    """
+    Memindahkan isi semua tabel CSV (termasuk change log yang belum dilipat)
+    ke database SQLite. Isi tabel SQLite diganti seluruhnya sehingga migrasi
+    aman dijalankan ulang.
+    """
+    source = DatabaseManager(base_path)
+    target = SQLiteDatabaseManager(source.base_path, db_file)
+    counts = {}
+
+    try:
+        with target._conn_lock, target.conn:
+            for file_type, fields in source.field_definitions.items():
+                rows = source._rows(file_type)
+                target.conn.execute(f"DELETE FROM {file_type}")
+                target.conn.executemany(
+                    f"INSERT OR REPLACE INTO {file_type} ({', '.join(fields)}) "
+                    f"VALUES ({', '.join('?' for _ in fields)})",
+                    [tuple(row.get(f, '') for f in fields) for row in rows]
+                )
+                counts[file_type] = len(rows)
+    finally:
+        target.close()
+
+    return counts
+
+
+if __name__ == "__main__":
+    result = migrate_csv_to_sqlite(sys.argv[1] if len(sys.argv) > 1 else None)
+    for table_name, total in result.items():
+        print(f"{table_name}: {total} baris dimigrasi")
@@ -0,0 +1,192 @@
+"""
+Riwayat perubahan status pesanan.
+
+Setiap perubahan status dicatat sebagai baris append-only di tabel
+status_pesanan (id_pesanan, id_produk, status_lama, status, tanggal); pesanan
+baru dicatat sebagai perubahan dari status kosong ke Pending, dan penggantian
+produk pesanan dicatat sebagai event dengan id_produk baru. Agregat seperti
+rata-rata waktu Pending sampai Selesai per hari dan tingkat pembatalan per
+produk diperbarui setiap ada event baru, lalu disimpan saat kompaksi.
+"""
+import bisect
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .snapshot import load_snapshot, save_snapshot
+
+STATUS_HISTORY_TABLE = 'status_pesanan'
+STATS_FILENAME = 'status_pesanan.snapshot'
+STATS_VERSION = 2
+
+STATUS_PENDING = 'Pending'
+STATUS_SELESAI = 'Selesai'
+STATUS_DIBATALKAN = 'Dibatalkan'
+
+
+def _to_date(value: Union[date, datetime]) -> date:
+    """Menerima date atau datetime, agregat harian hanya mengenal tanggal"""
+    return value.date() if isinstance(value, datetime) else value
+
+
+class OrderStatusStats:
+    """Agregat riwayat status pesanan, diperbarui per event dalam O(1)"""
+
+    def __init__(self):
+        # id_pesanan -> waktu pesanan dibuat, hanya untuk pesanan yang masih terbuka
+        self.pending_since: Dict[str, datetime] = {}
+        # tanggal selesai -> [total detik Pending sampai Selesai, jumlah pesanan]
+        self.selesai: Dict[date, List] = {}
+        self.dates: List[date] = []
+        # id_produk -> [jumlah pesanan dibuat, jumlah pesanan dibatalkan]
+        self.produk: Dict[str, List[int]] = {}
+        # id_pesanan -> id_produk terakhir, agar hitungan ikut pindah saat produk pesanan diganti
+        self.pesanan_produk: Dict[str, str] = {}
+
+    @classmethod
+    def build(cls, events: Iterable[Dict]) -> 'OrderStatusStats':
+        """Menghitung agregat dari event bertipe sesuai urutan penyisipan"""
+        stats = cls()
+        for event in events:
+            stats.add(event)
+        return stats
+
+    def add(self, event: Dict) -> None:
+        """Menerapkan satu event perubahan status bertipe"""
+        id_pesanan = event.get('id_pesanan')
+        status, status_lama = event.get('status'), event.get('status_lama') or ''
+        tanggal = event.get('tanggal')
+        id_produk = event.get('id_produk')
+        produk_lama = self.pesanan_produk.get(id_pesanan)
+        self.pesanan_produk[id_pesanan] = id_produk
+        counts = self.produk.setdefault(id_produk, [0, 0])
+
+        if status_lama and produk_lama is not None and produk_lama != id_produk:
+            # Produk pesanan diganti: pesanan (dan pembatalannya) pindah ke produk baru
+            self._move(produk_lama, counts, status_lama == STATUS_DIBATALKAN)
+        if not status_lama:
+            # Pesanan baru
+            counts[0] += 1
+            if tanggal is not None:
+                self.pending_since[id_pesanan] = tanggal
+        if status_lama == STATUS_DIBATALKAN:
+            counts[1] -= 1
+
+        if status == STATUS_DIBATALKAN:
+            counts[1] += 1
+            self.pending_since.pop(id_pesanan, None)
+        elif status == STATUS_SELESAI:
+            since = self.pending_since.pop(id_pesanan, None)
+            if since is not None and tanggal is not None:
+                self._add_selesai(tanggal.date(), (tanggal - since).total_seconds())
+
+    def _move(self, id_produk: str, counts: List[int], dibatalkan: bool) -> None:
+        """Memindahkan satu pesanan dari hitungan id_produk ke counts"""
+        lama = self.produk.get(id_produk)
+        if lama is None:
+            return
+        lama[0] -= 1
+        counts[0] += 1
+        if dibatalkan:
+            lama[1] -= 1
+            counts[1] += 1
+        if lama == [0, 0]:
+            del self.produk[id_produk]
+
+    def checkpoint(self, event: Dict) -> Tuple:
+        """Salinan semua agregat yang bisa diubah add(event), untuk dikembalikan dengan restore()"""
+        id_pesanan, id_produk = event.get('id_pesanan'), event.get('id_produk')
+        tanggal = event.get('tanggal')
+        produk_lama = self.pesanan_produk.get(id_pesanan)
+        day = self.selesai.get(tanggal.date()) if tanggal is not None else None
+        return (
+            id_pesanan, self.pending_since.get(id_pesanan), produk_lama,
+            {key: list(self.produk[key]) if key in self.produk else None for key in (id_produk, produk_lama)},
+            tanggal.date() if tanggal is not None else None, list(day) if day is not None else None
+        )
+
+    def restore(self, saved: Tuple) -> None:
+        """Mengembalikan agregat ke kondisi hasil checkpoint() saat rollback"""
+        id_pesanan, since, produk_lama, produk, tanggal, day = saved
+        if since is None:
+            self.pending_since.pop(id_pesanan, None)
+        else:
+            self.pending_since[id_pesanan] = since
+        if produk_lama is None:
+            self.pesanan_produk.pop(id_pesanan, None)
+        else:
+            self.pesanan_produk[id_pesanan] = produk_lama
+        for id_produk, counts in produk.items():
+            if counts is None:
+                self.produk.pop(id_produk, None)
+            else:
+                self.produk[id_produk] = counts
+        if tanggal is None:
+            return
+        if day is not None:
+            self.selesai[tanggal] = day
+        elif self.selesai.pop(tanggal, None) is not None:
+            del self.dates[bisect.bisect_left(self.dates, tanggal)]
+
+    def _add_selesai(self, tanggal: date, detik: float) -> None:
+        """Menambahkan satu pesanan selesai ke harinya, tanggal disimpan terurut"""
+        day = self.selesai.get(tanggal)
+        if day is None:
+            day = self.selesai[tanggal] = [0.0, 0]
+            if not self.dates or self.dates[-1] < tanggal:
+                self.dates.append(tanggal)
+            else:
+                bisect.insort(self.dates, tanggal)
+        day[0] += detik
+        day[1] += 1
+
+    def waktu_selesai(self, start: Union[date, datetime], end: Union[date, datetime]) -> List[Dict]:
+        """Rata-rata detik dari Pending sampai Selesai per tanggal selesai di [start, end]"""
+        low = bisect.bisect_left(self.dates, _to_date(start))
+        high = bisect.bisect_right(self.dates, _to_date(end))
+        return [
+            {
+                'tanggal': tanggal,
+                'rata_rata_detik': self.selesai[tanggal][0] / self.selesai[tanggal][1],
+                'jumlah_selesai': self.selesai[tanggal][1]
+            }
+            for tanggal in self.dates[low:high]
+        ]
+
+    def pembatalan(self) -> List[Dict]:
+        """Tingkat pembatalan per produk, tertinggi lebih dulu"""
+        result = [
+            {
+                'id_produk': id_produk,
+                'jumlah_pesanan': dibuat,
+                'jumlah_dibatalkan': dibatalkan,
+                'tingkat_pembatalan': dibatalkan / dibuat if dibuat else 0.0
+            }
+            for id_produk, (dibuat, dibatalkan) in self.produk.items()
+        ]
+        result.sort(key=lambda item: (-item['tingkat_pembatalan'], -item['jumlah_pesanan']))
+        return result
+
+    def save(self, path: str, stamp: Tuple) -> None:
+        """Menyimpan agregat beserta stempel file sumbernya secara atomik"""
+        data = {
+            'pending_since': self.pending_since,
+            'selesai': self.selesai,
+            'produk': self.produk,
+            'pesanan_produk': self.pesanan_produk
+        }
+        save_snapshot(path, STATS_VERSION, stamp, data, 'order status stats')
+
+    @classmethod
+    def load(cls, path: str, stamp: Tuple) -> Optional['OrderStatusStats']:
+        """Membaca agregat tersimpan jika dibuat dari isi file sumber yang sama"""
+        # Agregat yang tidak ada atau rusak tidak fatal, cukup dihitung ulang dari riwayat
+        snapshot = load_snapshot(path, STATS_VERSION, stamp, 'order status stats')
+        if snapshot is None:
+            return None
+        stats = cls()
+        stats.pending_since = snapshot['pending_since']
+        stats.selesai = snapshot['selesai']
+        stats.dates = sorted(stats.selesai)
+        stats.produk = snapshot['produk']
+        stats.pesanan_produk = snapshot['pesanan_produk']
+        return stats
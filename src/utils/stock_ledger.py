@@ -0,0 +1,68 @@
+"""
+Buku besar mutasi stok.
+
+Setiap perubahan stok dicatat sebagai baris append-only di tabel stok_mutasi
+(id_produk, delta, alasan, ref_id, tanggal). Stok produk adalah saldo berjalan,
+yaitu jumlah delta per produk. Saldo disimpan di memori dan ditulis sebagai
+checkpoint setiap kompaksi sehingga saat start riwayat tidak perlu dibaca ulang.
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+from .snapshot import load_snapshot, save_snapshot
+
+STOCK_LEDGER_TABLE = 'stok_mutasi'
+BALANCES_FILENAME = 'stok_saldo.snapshot'
+BALANCES_VERSION = 1
+
+# Alasan mutasi yang dipakai aplikasi
+ALASAN_SALDO_AWAL = 'Saldo awal'
+ALASAN_PENYESUAIAN = 'Penyesuaian stok'
+ALASAN_KOREKSI = 'Koreksi stok'
+ALASAN_PESANAN = 'Pesanan'
+ALASAN_PEMBATALAN = 'Pembatalan pesanan'
+ALASAN_UBAH_PESANAN = 'Perubahan pesanan'
+
+
+class StockBalances:
+    """Saldo stok per produk hasil penjumlahan delta di buku besar"""
+
+    def __init__(self):
+        self.saldo: Dict[str, int] = {}
+
+    @classmethod
+    def build(cls, mutasi_rows: Iterable[Dict]) -> 'StockBalances':
+        """Menghitung saldo dari baris mutasi bertipe"""
+        balances = cls()
+        for mutasi in mutasi_rows:
+            balances.add(mutasi.get('id_produk'), mutasi.get('delta') or 0)
+        return balances
+
+    def add(self, id_produk: str, delta: int) -> None:
+        """Menerapkan satu mutasi ke saldo produknya, O(1)"""
+        self.saldo[id_produk] = self.saldo.get(id_produk, 0) + delta
+
+    def restore(self, id_produk: str, saldo: Optional[int]) -> None:
+        """Mengembalikan saldo produk ke nilai sebelumnya (hasil get()) saat rollback"""
+        if saldo is None:
+            self.saldo.pop(id_produk, None)
+        else:
+            self.saldo[id_produk] = saldo
+
+    def get(self, id_produk: str) -> Optional[int]:
+        """Saldo produk, None jika produk belum punya mutasi"""
+        return self.saldo.get(id_produk)
+
+    def save(self, path: str, stamp: Tuple) -> None:
+        """Menyimpan checkpoint saldo beserta stempel file sumbernya secara atomik"""
+        save_snapshot(path, BALANCES_VERSION, stamp, {'saldo': self.saldo}, 'stock checkpoint')
+
+    @classmethod
+    def load(cls, path: str, stamp: Tuple) -> Optional['StockBalances']:
+        """Membaca checkpoint saldo jika dibuat dari isi buku besar yang sama"""
+        # Checkpoint yang tidak ada atau rusak tidak fatal, saldo dihitung ulang dari buku besar
+        snapshot = load_snapshot(path, BALANCES_VERSION, stamp, 'stock checkpoint')
+        if snapshot is None:
+            return None
+        balances = cls()
+        balances.saldo = snapshot['saldo']
+        return balances
@@ -0,0 +1,120 @@
+"""
+Menjalankan pekerjaan berat di luar thread Tk.
+
+Pembacaan database, agregasi laporan dan ekspor file berjalan di thread pool.
+Hasilnya dikirim kembali ke widget di thread utama lewat widget.after, dan
+dibuang jika widget sudah dihancurkan (pengguna pindah halaman) sebelum
+hasilnya datang.
+
+Agregasi yang ada sebanding dengan jumlah hari atau baris dalam periode dan
+membaca tabel yang sudah ada di memori proses ini, jadi tidak memakai process
+pool: worker spawn mengimpor ulang seluruh GUI dan harus memuat ulang data.
+
+Contoh:
+    self.task = get_task_executor().submit(
+        self.frame, self.db.generate_laporan_penjualan, start, end,
+        on_done=self.tampilkan_laporan
+    )
+"""
+import atexit
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# Interval pengecekan hasil dari thread utama Tk
+POLL_INTERVAL_MS = 30
+
+
+def _widget_alive(widget) -> bool:
+    """Apakah widget masih ada (belum dihancurkan)"""
+    try:
+        return bool(widget.winfo_exists())
+    except Exception:
+        return False
+
+
+class Task:
+    """Satu pekerjaan background yang hasilnya dikirim ke widget"""
+
+    def __init__(self, future: Future, widget, on_done: Optional[Callable[[Any], None]],
+                 on_error: Optional[Callable[[BaseException], None]]):
+        self.future = future
+        self.widget = widget
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = False
+        self.delivered = False
+
+    def cancel(self) -> None:
+        """Membatalkan pekerjaan; hasil yang terlanjur selesai tidak dikirim"""
+        self.cancelled = True
+        self.future.cancel()
+
+    @property
+    def pending(self) -> bool:
+        """Apakah hasil belum dikirim dan pekerjaan belum dibatalkan"""
+        return not self.cancelled and not self.delivered
+
+    def _poll(self) -> None:
+        """Dijalankan di thread utama: kirim hasil jika sudah selesai, atau cek lagi nanti"""
+        if self.cancelled:
+            return
+        if not _widget_alive(self.widget):
+            # Halaman sudah ditutup sebelum hasilnya datang
+            self.cancel()
+            return
+        if not self.future.done():
+            self.widget.after(POLL_INTERVAL_MS, self._poll)
+            return
+
+        self.delivered = True
+        error = self.future.exception()
+        if error is not None:
+            if self.on_error is not None:
+                self.on_error(error)
+            else:
+                print(f"Error in background task: {str(error)}")
+        elif self.on_done is not None:
+            self.on_done(self.future.result())
+
+
+class TaskExecutor:
+    """Thread pool untuk pekerjaan background halaman GUI"""
+
+    def __init__(self, workers: int = 4):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='halalhub-task')
+
+    def submit(self, widget, fn: Callable, *args,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None,
+               **kwargs) -> Task:
+        """
+        Menjalankan fn(*args, **kwargs) di background lalu memanggil on_done(hasil)
+        atau on_error(exception) di thread utama Tk. Harus dipanggil dari thread utama.
+        """
+        task = Task(self.pool.submit(fn, *args, **kwargs), widget, on_done, on_error)
+        widget.after(POLL_INTERVAL_MS, task._poll)
+        return task
+
+    def shutdown(self) -> None:
+        """Menghentikan pool tanpa menunggu pekerjaan yang belum dimulai"""
+        if sys.version_info >= (3, 9):
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            # cancel_futures baru ada di Python 3.9
+            self.pool.shutdown(wait=False)
+
+
+_executor: Optional[TaskExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_task_executor() -> TaskExecutor:
+    """Mengambil TaskExecutor bersama untuk seluruh aplikasi"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = TaskExecutor()
+            atexit.register(_executor.shutdown)
+        return _executor
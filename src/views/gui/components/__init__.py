@@ -6,5 +6,6 @@ from .sidebar import Sidebar
 from .header import Header
 from .footer import Footer
 from .notification import Notification
+from .virtual_table import VirtualTable
 
-__all__ = ['Sidebar', 'Header', 'Footer', 'Notification']
\ No newline at end of file
+__all__ = ['Sidebar', 'Header', 'Footer', 'Notification', 'VirtualTable']
\ No newline at end of file
@@ -63,7 +63,8 @@ class Sidebar:
             "Produk": "📦",
             "Pesanan": "📝",
             "Laporan": "📊",
-            "Transaksi": "💰"
+            "Transaksi": "💰",
+            "Diagnostik": "🩺"
         }
         
         # Container untuk menu
@@ -0,0 +1,196 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+# Baris tambahan yang dibuat di atas dan di bawah baris yang terlihat
+OVERSCAN = 20
+# Perkiraan jumlah baris terlihat sebelum Treeview melaporkan ukurannya
+DEFAULT_VISIBLE_ROWS = 25
+
+
+class VirtualTable:
+    """
+    Tabel ttk.Treeview untuk data besar. Hanya baris yang terlihat ditambah
+    OVERSCAN baris di atas dan di bawahnya yang dibuat sebagai item; saat
+    digulir, item yang sama diisi ulang dengan baris lain dari sumber data.
+
+    Sumber data cukup mendukung len() dan slicing (misalnya list). formatter
+    mengubah satu baris sumber menjadi (values, tags) dan hanya dipanggil
+    untuk baris yang dibuat sebagai item.
+    """
+
+    def __init__(self, parent, columns: Sequence[str], formatter: Optional[Callable] = None,
+                 height: Optional[int] = None, xscroll: bool = False, overscan: int = OVERSCAN):
+        """Membuat Treeview beserta scrollbar di dalam frame yang mengisi parent"""
+        self.frame = tk.Frame(parent, bg=parent.cget('bg'))
+        self.frame.pack(fill=tk.BOTH, expand=True)
+
+        options = {'columns': columns, 'show': 'headings', 'selectmode': 'browse'}
+        if height:
+            options['height'] = height
+        self.tree = ttk.Treeview(self.frame, **options)
+
+        # Scrollbar mewakili seluruh sumber data, bukan hanya item yang dibuat
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.yview)
+        self.tree.configure(yscrollcommand=self._on_tree_scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        if xscroll:
+            x_scroll = ttk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+            self.tree.configure(xscrollcommand=x_scroll.set)
+            x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+
+        self.source: Sequence = []
+        self.formatter = formatter or (lambda row: (row, ()))
+        self.overscan = overscan
+        self.visible = height or DEFAULT_VISIBLE_ROWS
+        # Indeks sumber untuk item pertama, jumlah item, dan baris teratas yang terlihat
+        self.start = 0
+        self.count = 0
+        self.top = 0
+        # Indeks sumber baris terpilih, tetap diingat saat barisnya digulir keluar jendela
+        self._selected: Optional[int] = None
+
+    def heading(self, column: str, **options):
+        """Sama dengan Treeview.heading"""
+        return self.tree.heading(column, **options)
+
+    def column(self, column: str, **options):
+        """Sama dengan Treeview.column"""
+        return self.tree.column(column, **options)
+
+    def tag_configure(self, tag: str, **options):
+        """Sama dengan Treeview.tag_configure, tag dipakai oleh formatter"""
+        return self.tree.tag_configure(tag, **options)
+
+    def bind(self, sequence: str, func: Callable, add: Optional[str] = None):
+        """Sama dengan Treeview.bind"""
+        return self.tree.bind(sequence, func, add)
+
+    def set_rows(self, source: Sequence, formatter: Optional[Callable] = None) -> None:
+        """Mengganti sumber data; pilihan direset dan tabel kembali ke baris pertama"""
+        self.source = source
+        if formatter is not None:
+            self.formatter = formatter
+        self._selected = None
+        self.top = 0
+        self._fill(0)
+        self.tree.yview_moveto(0)
+        self._update_scrollbar()
+
+    def clear(self) -> None:
+        """Mengosongkan tabel"""
+        self.set_rows([])
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def selection(self) -> List[int]:
+        """Indeks sumber baris yang dipilih"""
+        selected = self.tree.selection()
+        if selected:
+            return [self.start + int(selected[0])]
+        return [] if self._selected is None else [self._selected]
+
+    def selected_row(self):
+        """Baris sumber yang dipilih, atau None"""
+        selection = self.selection()
+        return self.source[selection[0]] if selection else None
+
+    def iter_values(self) -> Iterator[Tuple]:
+        """values setiap baris sumber, misalnya untuk export"""
+        for row in self.source:
+            yield self.formatter(row)[0]
+
+    def yview(self, *args) -> None:
+        """Perintah scrollbar: posisi dihitung terhadap seluruh sumber data"""
+        if args[0] == 'moveto':
+            top = int(float(args[1]) * len(self.source))
+        else:
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= self.visible
+            top = self.top + amount
+        self._scroll_to(top)
+
+    def _scroll_to(self, top: int) -> None:
+        """Menampilkan baris top paling atas, jendela item diisi ulang jika perlu"""
+        top = max(0, min(top, len(self.source) - self.visible))
+        if self._needs_fill(top):
+            self._fill(top - self.overscan)
+        self.top = top
+        if self.count:
+            self.tree.yview_moveto((top - self.start) / self.count)
+        self._update_scrollbar()
+
+    def _needs_fill(self, top: int) -> bool:
+        """Apakah baris terlihat mendekati tepi jendela item yang bisa diisi ulang"""
+        total = len(self.source)
+        margin = self.overscan // 2
+        end = self.start + self.count
+        if self.count < min(total, self.visible + 2 * self.overscan):
+            return True
+        if self.start > 0 and top - self.start < margin:
+            return True
+        return end < total and end - (top + self.visible) < margin
+
+    def _fill(self, start: int) -> None:
+        """Mengisi item dengan baris sumber mulai dari start, item lama dipakai ulang"""
+        size = self.visible + 2 * self.overscan
+        start = max(0, min(start, len(self.source) - size))
+        rows = self.source[start:start + size]
+
+        for index, row in enumerate(rows):
+            values, tags = self.formatter(row)
+            if index < self.count:
+                self.tree.item(str(index), values=values, tags=tags)
+            else:
+                self.tree.insert('', tk.END, iid=str(index), values=values, tags=tags)
+        if len(rows) < self.count:
+            self.tree.delete(*[str(index) for index in range(len(rows), self.count)])
+        self.start, self.count = start, len(rows)
+
+        # Pilihan mengikuti baris sumber, bukan item. Selection hanya disentuh jika
+        # berbeda, karena setiap selection_set memicu <<TreeviewSelect>>
+        if self._selected is not None and start <= self._selected < start + self.count:
+            wanted = (str(self._selected - start),)
+        else:
+            wanted = ()
+        if tuple(self.tree.selection()) != wanted:
+            self.tree.selection_set(wanted)
+        if wanted and self.tree.focus() != wanted[0]:
+            self.tree.focus(wanted[0])
+
+    def _on_tree_scroll(self, first: str, last: str) -> None:
+        """
+        yscrollcommand Treeview: dipanggil saat jendela item digulir sendiri
+        (roda mouse, tombol panah) atau ukurannya berubah
+        """
+        first, last = float(first), float(last)
+        top = self.start + round(first * self.count)
+        if last - first < 1:
+            # Hanya sebagian item terlihat, jadi ukurannya diketahui
+            self.visible = max(1, round((last - first) * self.count))
+        if self._needs_fill(top):
+            self._scroll_to(top)
+        else:
+            self.top = top
+            self._update_scrollbar()
+
+    def _on_select(self, event=None) -> None:
+        """Mengingat indeks sumber baris yang dipilih"""
+        selected = self.tree.selection()
+        if selected:
+            self._selected = self.start + int(selected[0])
+        elif self._selected is not None and self.start <= self._selected < self.start + self.count:
+            self._selected = None
+
+    def _update_scrollbar(self) -> None:
+        """Posisi scrollbar terhadap seluruh sumber data"""
+        total = len(self.source)
+        if not total:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible) / total))
@@ -0,0 +1,174 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from utils.metrics import (
+    disable_metrics, dump_metrics, enable_metrics, metrics_enabled, registry
+)
+
+# Interval pembaruan tabel statistik
+REFRESH_INTERVAL_MS = 2000
+
+
+class PanelDiagnostik:
+    def __init__(self, parent, colors):
+        """
+        Inisialisasi panel diagnostik (statistik waktu per operasi)
+
+        Args:
+            parent: Widget parent untuk frame ini
+            colors: Dictionary berisi kode warna untuk UI
+        """
+        self.parent = parent
+        self.colors = colors
+
+        # Frame utama
+        self.frame = tk.Frame(self.parent, bg=self.colors['background'])
+        self.frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+
+        self.create_header()
+        self.create_action_buttons()
+        self.create_table()
+
+        # Load data awal, lalu diperbarui berkala selama halaman terbuka
+        self.refresh_data()
+
+    def create_header(self):
+        """Membuat bagian header"""
+        header_frame = tk.Frame(self.frame, bg=self.colors['primary'], padx=20, pady=15)
+        header_frame.pack(fill=tk.X, pady=(0, 20))
+
+        tk.Label(
+            header_frame,
+            text="Diagnostik",
+            font=('Arial', 24, 'bold'),
+            bg=self.colors['primary'],
+            fg='white'
+        ).pack(side=tk.LEFT)
+
+        self.status_var = tk.StringVar()
+        tk.Label(
+            header_frame,
+            textvariable=self.status_var,
+            font=('Arial', 12),
+            bg=self.colors['primary'],
+            fg='white'
+        ).pack(side=tk.RIGHT)
+
+    def create_action_buttons(self):
+        """Membuat tombol-tombol aksi"""
+        button_frame = tk.Frame(self.frame, bg=self.colors['background'])
+        button_frame.pack(fill=tk.X, pady=(0, 10))
+
+        self.toggle_button = ttk.Button(
+            button_frame,
+            style='Primary.TButton',
+            command=self.toggle_metrics
+        )
+        self.toggle_button.pack(side=tk.LEFT, padx=(0, 5))
+
+        ttk.Button(
+            button_frame,
+            text="Reset",
+            style='Secondary.TButton',
+            command=self.reset_metrics
+        ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(
+            button_frame,
+            text="Simpan JSON",
+            style='Secondary.TButton',
+            command=lambda: self.save_metrics('json')
+        ).pack(side=tk.RIGHT, padx=5)
+
+        ttk.Button(
+            button_frame,
+            text="Simpan Prometheus",
+            style='Secondary.TButton',
+            command=lambda: self.save_metrics('prometheus')
+        ).pack(side=tk.RIGHT, padx=5)
+
+    def create_table(self):
+        """Membuat tabel statistik per operasi"""
+        table_frame = tk.Frame(self.frame, bg=self.colors['background'])
+        table_frame.pack(fill=tk.BOTH, expand=True)
+
+        columns = (
+            'Operasi', 'Panggilan', 'Error', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)',
+            'Total (ms)', 'Baris Dibaca', 'Baris Ditulis', 'KB Dibaca', 'KB Ditulis'
+        )
+        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=20)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            if col == 'Operasi':
+                self.tree.column(col, width=280, anchor='w')
+            else:
+                self.tree.column(col, width=80, anchor='e')
+
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def refresh_data(self):
+        """Memperbarui tabel dari statistik terbaru"""
+        if not self.frame.winfo_exists():
+            return
+
+        enabled = metrics_enabled()
+        self.toggle_button.config(text="Nonaktifkan Pengukuran" if enabled else "Aktifkan Pengukuran")
+
+        snapshot = registry.snapshot()
+        self.status_var.set(f"{'Aktif' if enabled else 'Nonaktif'} - {len(snapshot)} operasi")
+
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+
+        # Operasi dengan total waktu terbesar di atas
+        for name, stats in sorted(snapshot.items(), key=lambda item: -item[1]['total_seconds']):
+            self.tree.insert('', tk.END, values=(
+                name,
+                stats['calls'],
+                stats['errors'],
+                f"{stats['p50_seconds'] * 1000:,.2f}",
+                f"{stats['p95_seconds'] * 1000:,.2f}",
+                f"{stats['p99_seconds'] * 1000:,.2f}",
+                f"{stats['total_seconds'] * 1000:,.1f}",
+                f"{stats['rows_read']:,}",
+                f"{stats['rows_written']:,}",
+                f"{stats['bytes_read'] / 1024:,.1f}",
+                f"{stats['bytes_written'] / 1024:,.1f}"
+            ))
+
+        self.frame.after(REFRESH_INTERVAL_MS, self.refresh_data)
+
+    def toggle_metrics(self):
+        """Mengaktifkan atau menonaktifkan pengukuran"""
+        if metrics_enabled():
+            disable_metrics()
+        else:
+            enable_metrics()
+        self.toggle_button.config(
+            text="Nonaktifkan Pengukuran" if metrics_enabled() else "Aktifkan Pengukuran"
+        )
+
+    def reset_metrics(self):
+        """Menghapus semua statistik yang sudah tercatat"""
+        registry.reset()
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+
+    def save_metrics(self, fmt):
+        """Menyimpan statistik ke file JSON atau textfile Prometheus"""
+        extension = '.json' if fmt == 'json' else '.prom'
+        path = filedialog.asksaveasfilename(
+            defaultextension=extension,
+            initialfile=f"halalhub_metrics{extension}",
+            filetypes=[("JSON", "*.json")] if fmt == 'json' else [("Prometheus", "*.prom")]
+        )
+        if not path:
+            return
+        try:
+            dump_metrics(path, fmt=fmt)
+            messagebox.showinfo("Sukses", f"Statistik disimpan ke {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Gagal menyimpan statistik: {str(e)}")
@@ -1,14 +1,14 @@
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
-from utils.database import DatabaseManager
+from utils.database import get_database_manager
 from views.gui.produk.tambah_produk import TambahProduk
 
 class HalamanUtama:
     def __init__(self, parent, colors):
         self.parent = parent
         self.colors = colors
-        self.db = DatabaseManager()
+        self.db = get_database_manager()
         
         # Frame utama
         self.frame = tk.Frame(
@@ -67,26 +67,22 @@ class HalamanUtama:
             stats_frame.pack(fill=tk.X, pady=20)
 
             # Get actual stats untuk produk
-            products = self.db.get_all_produk()
+            products = self.db.get_all_produk_typed()
             total_products = len(products) if products else 0
-            low_stock = len([p for p in products if int(p.get('stok', 0)) <= 10]) if products else 0
+            low_stock = len([p for p in products if p['stok'] <= 10]) if products else 0
 
             # Get today's orders dan pendapatan dari pesanan
-            today = datetime.now().date()
+            today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            today_end = today_start.replace(hour=23, minute=59, second=59, microsecond=999999)
 
-            # Ambil semua pesanan
-            pesanan_list = self.db.get_all_pesanan()
+            # Ambil pesanan hari ini saja lewat indeks tanggal (harga sudah bertipe)
+            today_orders = self.db.get_pesanan_range(today_start, today_end, typed=True)
 
-            # Filter pesanan hari ini
-            today_orders = [
-                order for order in pesanan_list 
-                if datetime.fromisoformat(order['tanggal_pesanan']).date() == today
-            ] if pesanan_list else []
-
-            # Hitung total pendapatan hari ini (dari pesanan yang selesai)
+            # Hitung total pendapatan hari ini (dari pesanan yang selesai). Ringkasan
+            # penjualan harian dikelompokkan per tanggal transaksi, jadi tidak dipakai di sini
             daily_revenue = sum(
-                float(order['total_harga']) 
-                for order in today_orders 
+                order['total_harga']
+                for order in today_orders
                 if order['status'] == 'Selesai'
             )
 
@@ -244,14 +240,14 @@ class HalamanUtama:
             today_end = today.replace(hour=23, minute=59, second=59, microsecond=999999)
 
             # Get data for quick stats
-            products = self.db.get_all_produk()
+            products = self.db.get_all_produk_typed()
             total_products = len(products)
-            low_stock = len([p for p in products if int(p['stok']) <= 10])
+            low_stock = len([p for p in products if p['stok'] <= 10])
 
-            # Get today's orders and revenue
-            report = self.db.generate_laporan_penjualan(today_start, today_end)
-            daily_orders = report['jumlah_transaksi']
-            daily_revenue = report['total_penjualan']
+            # Get today's orders and revenue dari ringkasan penjualan harian
+            ringkasan = self.db.get_ringkasan_penjualan(today_start, today_end)
+            daily_orders = ringkasan['jumlah_transaksi']
+            daily_revenue = ringkasan['total_penjualan']
 
             # Store values that will be needed in create_quick_stats
             self._dashboard_data = {
@@ -5,14 +5,18 @@ from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import pandas as pd
-from utils.database import DatabaseManager
+from utils.database import get_database_manager
+from utils.rollup import group_by_period
+from utils.tasks import get_task_executor
 
 class GrafikPenjualan:
     def __init__(self, parent, colors):
         """Inisialisasi halaman grafik penjualan"""
         self.parent = parent
         self.colors = colors
-        self.db = DatabaseManager()
+        self.db = get_database_manager()
+        # Pemuatan grafik yang sedang berjalan di background
+        self.task = None
         
         # Frame utama
         self.frame = tk.Frame(self.parent, bg=self.colors['background'])
@@ -103,8 +107,8 @@ class GrafikPenjualan:
         )
         self.summary_frame.pack(fill=tk.X, pady=(0, 10))
     
-    def get_data_by_period(self):
-        """Mengambil data berdasarkan periode yang dipilih"""
+    def get_periode(self):
+        """Rentang tanggal dan frekuensi grouping untuk periode yang dipilih"""
         periode = self.period_var.get()
         end_date = datetime.now()
         
@@ -121,35 +125,62 @@ class GrafikPenjualan:
             start_date = end_date - timedelta(days=365*3)
             groupby = 'Y'
         
-        # Ambil data dari database
-        data = self.db.generate_laporan_penjualan(start_date, end_date)
+        return start_date, end_date, groupby
+    
+    def update_grafik(self):
+        """Memperbarui tampilan grafik, data dimuat dan diagregasi di background"""
+        # Hasil pemuatan sebelumnya tidak boleh menimpa periode yang baru dipilih
+        if self.task is not None:
+            self.task.cancel()
         
-        # Buat DataFrame
-        df = pd.DataFrame(data['transaksi_list'])
-        df['tanggal_transaksi'] = pd.to_datetime(df['tanggal_transaksi'])
+        # Hapus grafik lama dan tampilkan status memuat
+        for widget in self.grafik_frame.winfo_children():
+            widget.destroy()
+        tk.Label(
+            self.grafik_frame,
+            text="Memuat data...",
+            font=('Arial', 10),
+            bg=self.colors['background'],
+            fg=self.colors['text']
+        ).pack(pady=20)
         
-        # Grouping berdasarkan periode
-        grouped = df.groupby(pd.Grouper(key='tanggal_transaksi', freq=groupby))
+        start_date, end_date, groupby = self.get_periode()
         
-        return grouped.agg({
-            'total_harga': 'sum',
-            'id_transaksi': 'count'
-        }).reset_index()
+        # Ringkasan harian dibaca dan dikelompokkan dalam satu pekerjaan background
+        self.task = get_task_executor().submit(
+            self.grafik_frame, self.load_periods, start_date, end_date, groupby,
+            on_done=self.show_grafik,
+            on_error=self.show_error
+        )
     
-    def update_grafik(self):
-        """Memperbarui tampilan grafik"""
+    def load_periods(self, start_date, end_date, groupby):
+        """Membaca ringkasan harian lalu menjumlahkannya per periode, dijalankan di background"""
+        # Biayanya sebanding dengan jumlah hari, bukan jumlah transaksi
+        harian = self.db.get_penjualan_harian(start_date, end_date)
+        rows = [(hari['tanggal'], hari['pendapatan'], hari['jumlah_transaksi']) for hari in harian]
+        return group_by_period(rows, groupby)
+    
+    def show_error(self, error):
+        """Menampilkan pesan jika grafik gagal dimuat"""
+        for widget in self.grafik_frame.winfo_children():
+            widget.destroy()
+        messagebox.showerror("Error", f"Gagal memperbarui grafik: {str(error)}")
+    
+    def show_grafik(self, periods):
+        """Menggambar grafik dari hasil group_by_period"""
         try:
-            # Hapus grafik lama
+            # Hapus status memuat
             for widget in self.grafik_frame.winfo_children():
                 widget.destroy()
             
-            # Ambil data
-            df = self.get_data_by_period()
-            
-            if df.empty:
+            if not periods:
                 messagebox.showinfo("Info", "Tidak ada data untuk ditampilkan")
                 return
             
+            # Buat DataFrame
+            df = pd.DataFrame(periods, columns=['tanggal_transaksi', 'total_harga', 'id_transaksi'])
+            df['tanggal_transaksi'] = pd.to_datetime(df['tanggal_transaksi'])
+            
             # Buat figure baru
             fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
             fig.patch.set_facecolor(self.colors['background'])
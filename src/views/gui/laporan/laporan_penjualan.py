@@ -6,17 +6,21 @@ from tkcalendar import DateEntry
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import pandas as pd
-from utils.database import DatabaseManager
+from utils.database import get_database_manager
+from utils.tasks import get_task_executor
+from ..components.virtual_table import VirtualTable
 
 class LaporanPenjualan:
     def __init__(self, parent, colors):
         """Inisialisasi halaman laporan penjualan"""
         self.parent = parent
         self.colors = colors
-        self.db = DatabaseManager()
+        self.db = get_database_manager()
 
         # Initialize variables
         self.total_var = tk.StringVar(value="0 Transaksi")
+        # Pemuatan data yang sedang berjalan di background
+        self.task = None
 
         # Frame utama
         self.frame = tk.Frame(self.parent, bg=self.colors['background'])
@@ -186,22 +190,14 @@ class LaporanPenjualan:
         )
         table_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
         
-        # Buat Treeview
+        # Buat tabel virtual, hanya baris yang terlihat yang dibuat sebagai item
         columns = ('ID Transaksi','Tanggal', 'Produk', 'Qty', 'Total')
-        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings')
+        self.table = VirtualTable(table_frame, columns, formatter=self.format_transaksi)
         
         # Atur heading dan kolom
         for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100)
-        
-        # Tambah scrollbar
-        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Pack komponen
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            self.table.heading(col, text=col)
+            self.table.column(col, width=100)
     
     def create_chart_section(self):
         """Membuat grafik penjualan"""
@@ -215,37 +211,32 @@ class LaporanPenjualan:
         self.chart_frame.pack(fill=tk.BOTH, expand=True)
     
     def update_table(self, transactions):
-        """Memperbarui tabel transaksi"""
-        # Hapus data lama
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # Masukkan data baru
-        for trans in transactions:
-            try:
-                tanggal = datetime.fromisoformat(trans['tanggal_transaksi'])
-                self.tree.insert(
-                    '',
-                    tk.END,
-                    values=(
-                        tanggal.strftime("%d/%m/%Y %H:%M"),  # Tanggal
-                        trans['id_transaksi'],               # No Transaksi
-                        trans.get('nama_produk', '-'),       # Produk
-                        trans.get('jumlah', '1'),            # Qty
-                        f"Rp {float(trans['total_harga']):,}" # Total
-                    )
-                )
-            except Exception as e:
-                print(f"Error displaying transaction: {str(e)}")
-                continue
+        """Memperbarui tabel transaksi, baris diformat saat terlihat"""
+        self.table.set_rows(transactions)
+
+    def format_transaksi(self, trans):
+        """values satu baris transaksi di tabel"""
+        try:
+            tanggal = datetime.fromisoformat(trans['tanggal_transaksi']).strftime("%d/%m/%Y %H:%M")
+        except (TypeError, ValueError):
+            tanggal = '-'
+        # Urutan sama dengan kolom tabel: ID Transaksi, Tanggal, Produk, Qty, Total
+        values = (
+            trans['id_transaksi'],
+            tanggal,
+            trans.get('nama_produk', '-'),
+            trans.get('jumlah', 1),
+            f"Rp {float(trans['total_harga']):,}"
+        )
+        return values, ()
     
-    def update_chart(self, transactions):
-        """Memperbarui grafik penjualan"""
+    def update_chart(self, harian):
+        """Memperbarui grafik penjualan dari ringkasan harian"""
         # Hapus widget lama
         for widget in self.chart_frame.winfo_children():
             widget.destroy()
         
-        if not transactions:
+        if not harian:
             tk.Label(
                 self.chart_frame,
                 text="Tidak ada data transaksi",
@@ -256,10 +247,11 @@ class LaporanPenjualan:
             return
             
         try:
-            # Buat DataFrame dari transaksi
-            df = pd.DataFrame(transactions)
-            df['tanggal_transaksi'] = pd.to_datetime(df['tanggal_transaksi'])
-            daily_sales = df.groupby('tanggal_transaksi')['total_harga'].sum()
+            # Ringkasan sudah per hari, tidak perlu grouping ulang
+            daily_sales = pd.Series(
+                [hari['pendapatan'] for hari in harian],
+                index=pd.to_datetime([hari['tanggal'] for hari in harian])
+            )
             
             # Buat grafik baru
             fig, ax = plt.subplots(figsize=(10, 4))
@@ -293,19 +285,16 @@ class LaporanPenjualan:
             # Create filename
             filename = f"Laporan_Penjualan_{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}.xlsx"
 
-            # Get data from treeview
-            data = []
-            for item in self.tree.get_children():
-                data.append(self.tree.item(item)['values'])
+            # Get data from tabel (semua baris, bukan hanya yang terlihat)
+            data = list(self.table.iter_values())
 
             # Create DataFrame
             df = pd.DataFrame(data, columns=[
                 'ID Transaksi',
                 'Tanggal',
                 'Produk',
-                'Total Item',
-                'Total Harga',
-                'Metode Pembayaran'
+                'Qty',
+                'Total'
             ])
 
             # Export to Excel
@@ -323,65 +312,77 @@ class LaporanPenjualan:
             )
 
     def refresh_data(self):
-        """Memperbarui tampilan data"""
-        try:
-            # Clear existing data
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+        """Memperbarui tampilan data, data dimuat di background"""
+        # Hasil pemuatan sebelumnya tidak boleh menimpa periode yang baru dipilih
+        if self.task is not None:
+            self.task.cancel()
+
+        # Clear existing data
+        self.table.clear()
+        self.total_var.set("Memuat...")
+
+        # Get date range
+        end_date = datetime.now()
+        start_date = self.get_start_date()
+
+        self.task = get_task_executor().submit(
+            self.frame, self.load_data, start_date, end_date,
+            on_done=self.show_data,
+            on_error=self.show_load_error
+        )
 
-            # Get date range
-            end_date = datetime.now()
-            start_date = self.get_start_date()
+    def load_data(self, start_date: datetime, end_date: datetime):
+        """Membaca ringkasan harian dan laporan, dijalankan di thread background"""
+        # Ringkasan dan grafik dibaca dari ringkasan harian, bukan dari baris transaksi
+        harian = self.db.get_penjualan_harian(start_date, end_date)
+        report = self.db.generate_laporan_penjualan(start_date, end_date)
+        return harian, report
 
-            # Get report data
-            report = self.db.generate_laporan_penjualan(start_date, end_date)
+    def show_data(self, data):
+        """Menampilkan hasil load_data"""
+        harian, report = data
+        try:
+            ringkasan = {
+                'total_penjualan': sum(hari['pendapatan'] for hari in harian),
+                'jumlah_transaksi': sum(hari['jumlah_transaksi'] for hari in harian)
+            }
 
             # Update total
-            self.total_var.set(f"{report['jumlah_transaksi']} Transaksi")
+            self.total_var.set(f"{ringkasan['jumlah_transaksi']} Transaksi")
 
-            # Update summary
-            self.update_summary(report)
+            # Update summary dan grafik
+            self.update_summary(ringkasan)
+            self.update_chart(harian)
 
             # Display transactions
-            for trans in report['transaksi_list']:
-                try:
-                    tanggal = datetime.fromisoformat(trans['tanggal_transaksi'])
-                    self.tree.insert(
-                        '',
-                        tk.END,
-                        values=(
-                            trans['id_transaksi'],
-                            tanggal.strftime("%d/%m/%Y %H:%M"),
-                            trans.get('id_pelanggan', '-'),
-                            trans.get('total_item', '1'),
-                            f"Rp {float(trans['total_harga']):,}",
-                            trans.get('metode_pembayaran', 'Tunai')
-                        )
-                    )
-                except Exception as e:
-                    print(f"Error displaying transaction: {str(e)}")
-                    continue
+            self.update_table(report['transaksi_list'])
 
         except Exception as e:
-            print(f"Error refreshing data: {str(e)}")
-            messagebox.showerror(
-                "Error",
-                "Gagal memuat data. Silakan coba lagi."
-            )
+            self.show_load_error(e)
+
+    def show_load_error(self, error: BaseException):
+        """Menampilkan pesan jika pemuatan data gagal"""
+        print(f"Error refreshing data: {str(error)}")
+        self.total_var.set("0 Transaksi")
+        messagebox.showerror(
+            "Error",
+            "Gagal memuat data. Silakan coba lagi."
+        )
 
     def get_start_date(self) -> datetime:
         """Mendapatkan tanggal awal berdasarkan periode yang dipilih"""
         period = self.period_var.get()
-        now = datetime.now()
+        # Periode dimulai tengah malam agar sama dengan ringkasan harian
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
         if period == "Hari Ini":
-            return now.replace(hour=0, minute=0, second=0, microsecond=0)
+            return today
         elif period == "7 Hari Terakhir":
-            return now - timedelta(days=7)
+            return today - timedelta(days=7)
         elif period == "30 Hari Terakhir":
-            return now - timedelta(days=30)
+            return today - timedelta(days=30)
         elif period == "Bulan Ini":
-            return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            return today.replace(day=1)
         else:  # Semua
             # Kembali ke tanggal paling awal (misalnya 1 tahun yang lalu)
-            return now - timedelta(days=365)
\ No newline at end of file
+            return today - timedelta(days=365)
\ No newline at end of file
@@ -4,7 +4,8 @@ from tkinter import ttk, messagebox
 import pandas as pd
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from utils.database import DatabaseManager
+from utils.database import get_database_manager
+from ..components.virtual_table import VirtualTable
 from datetime import datetime
 
 class LaporanStok:
@@ -12,7 +13,7 @@ class LaporanStok:
         """Inisialisasi halaman laporan stok"""
         self.parent = parent
         self.colors = colors
-        self.db = DatabaseManager()
+        self.db = get_database_manager()
         
         # Frame utama
         self.frame = tk.Frame(self.parent, bg=self.colors['background'])
@@ -97,22 +98,19 @@ class LaporanStok:
         )
         table_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
         
-        # Buat Treeview
+        # Buat tabel virtual, hanya baris yang terlihat yang dibuat sebagai item
         columns = ('ID', 'Nama Produk', 'Kategori', 'Stok', 'Status')
-        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings')
+        self.table = VirtualTable(table_frame, columns, formatter=self.format_produk)
         
         # Atur heading dan kolom
         for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100)
+            self.table.heading(col, text=col)
+            self.table.column(col, width=100)
         
-        # Tambah scrollbar
-        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Pack komponen
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Set warna baris berdasarkan status
+        self.table.tag_configure('habis', foreground=self.colors['error'])
+        self.table.tag_configure('menipis', foreground=self.colors['warning'])
+        self.table.tag_configure('tersedia', foreground=self.colors['success'])
     
     def create_chart_section(self):
         """Membuat grafik stok"""
@@ -130,11 +128,11 @@ class LaporanStok:
         try:
             kategori = self.category_var.get()
             
-            # Ambil data dari database
+            # Ambil data dari database (stok sudah bertipe int)
             if kategori == "Semua":
-                produk_list = self.db.get_all_produk()
+                produk_list = self.db.get_all_produk_typed()
             else:
-                produk_list = [p for p in self.db.get_all_produk() if p['kategori'] == kategori]
+                produk_list = [p for p in self.db.get_all_produk_typed() if p['kategori'] == kategori]
             
             # Update status
             self.update_status_section(produk_list)
@@ -156,8 +154,8 @@ class LaporanStok:
         
         # Hitung statistik
         total_produk = len(produk_list)
-        stok_menipis = len([p for p in produk_list if int(p['stok']) <= 10])
-        stok_habis = len([p for p in produk_list if int(p['stok']) == 0])
+        stok_menipis = len([p for p in produk_list if p['stok'] <= 10])
+        stok_habis = len([p for p in produk_list if p['stok'] == 0])
         
         status_data = [
             ("Total Produk", str(total_produk), self.colors['primary']),
@@ -186,37 +184,31 @@ class LaporanStok:
             ).pack(anchor='w')
     
     def update_table(self, produk_list):
-        """Memperbarui tabel produk"""
-        # Hapus data lama
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Masukkan data baru
-        for produk in produk_list:
-            # Tentukan status stok
-            stok = int(produk['stok'])
-            if stok == 0:
-                status = "Habis"
-                tag = 'habis'
-            elif stok <= 10:
-                status = "Menipis"
-                tag = 'menipis'
-            else:
-                status = "Tersedia"
-                tag = 'tersedia'
-            
-            self.tree.insert('', tk.END, values=(
-                produk['id_produk'],
-                produk['nama_produk'],
-                produk['kategori'],
-                stok,
-                status
-            ), tags=(tag,))
+        """Memperbarui tabel produk, baris diformat saat terlihat"""
+        self.table.set_rows(produk_list)
+    
+    def format_produk(self, produk):
+        """values dan tags satu baris produk di tabel"""
+        # Tentukan status stok
+        stok = produk['stok']
+        if stok == 0:
+            status = "Habis"
+            tag = 'habis'
+        elif stok <= 10:
+            status = "Menipis"
+            tag = 'menipis'
+        else:
+            status = "Tersedia"
+            tag = 'tersedia'
         
-        # Set warna baris berdasarkan status
-        self.tree.tag_configure('habis', foreground=self.colors['error'])
-        self.tree.tag_configure('menipis', foreground=self.colors['warning'])
-        self.tree.tag_configure('tersedia', foreground=self.colors['success'])
+        values = (
+            produk['id_produk'],
+            produk['nama_produk'],
+            produk['kategori'],
+            stok,
+            status
+        )
+        return values, (tag,)
     
     def update_chart(self, produk_list):
         """Memperbarui grafik stok"""
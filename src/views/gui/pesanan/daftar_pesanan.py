@@ -1,10 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime
 from controllers.pesanan_controller import PesananController
 from .input_pesanan import InputPesanan
 from .detail_pesanan import DetailPesanan 
 from .pembatalan_pesanan import PembatalanPesanan
+from ..components.virtual_table import VirtualTable
 
 class DaftarPesanan:
     def __init__(self, parent, colors):
@@ -19,6 +19,8 @@ class DaftarPesanan:
         self.parent = parent
         self.colors = colors
         self.controller = PesananController()
+        # id_produk -> nama produk untuk kolom Produk, dimuat ulang di refresh_data
+        self.product_map = {}
         
         # Buat frame utama dengan gradient background
         self.frame = tk.Frame(
@@ -138,12 +140,13 @@ class DaftarPesanan:
             'Status'
         )
         
-        # Buat Treeview dengan styling
-        self.tree = ttk.Treeview(
+        # Tabel virtual dengan styling: hanya baris yang terlihat yang dibuat sebagai item
+        self.table = VirtualTable(
             table_frame,
-            columns=columns,
-            show='headings',
-            height=15
+            columns,
+            formatter=self.format_pesanan,
+            height=15,
+            xscroll=True
         )
         
         # Konfigurasi style tabel
@@ -160,34 +163,13 @@ class DaftarPesanan:
         
         # Setup kolom-kolom tabel
         for col in columns:
-            self.tree.heading(col, text=col)
+            self.table.heading(col, text=col)
             # Atur lebar kolom
             width = 150 if col in ['Produk', 'Pelanggan'] else 100
-            self.tree.column(col, width=width, anchor='center')
-        
-        # Tambah scrollbar
-        y_scroll = ttk.Scrollbar(
-            table_frame,
-            orient=tk.VERTICAL,
-            command=self.tree.yview
-        )
-        x_scroll = ttk.Scrollbar(
-            table_frame,
-            orient=tk.HORIZONTAL,
-            command=self.tree.xview
-        )
-        self.tree.configure(
-            yscrollcommand=y_scroll.set,
-            xscrollcommand=x_scroll.set
-        )
-        
-        # Pack komponen tabel
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+            self.table.column(col, width=width, anchor='center')
         
         # Bind event double click
-        self.tree.bind('<Double-1>', self.on_item_double_click)
+        self.table.bind('<Double-1>', self.on_item_double_click)
 
     def create_action_buttons(self):
         """Membuat tombol-tombol aksi untuk manajemen pesanan"""
@@ -234,48 +216,21 @@ class DaftarPesanan:
     def refresh_data(self):
         """Memperbarui data pesanan di tabel"""
         try:
-            # Hapus data existing
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-                
-            # Get pesanan from controller
-            pesanan_list = self.controller.lihat_daftar_pesanan(
-                None if self.status_var.get() == "Semua" else self.status_var.get()
+            # Ambil pesanan bertipe (tanggal sudah datetime, tidak perlu parsing per baris)
+            status_filter = self.status_var.get()
+            pesanan_list = self.controller.lihat_daftar_pesanan_typed(
+                None if status_filter == "Semua" else status_filter
             )
             
-            # Update counter pesanan aktif 
-            active_count = len([p for p in pesanan_list if p.status == "Pending"])
+            # Update counter pesanan aktif (dari indeks status, tidak tergantung filter)
+            active_count = self.controller.jumlah_pesanan_pending()
             self.active_orders.set(f"{active_count} Pesanan Aktif")
             
             # Load data produk untuk mendapatkan nama produk
-            products = self.controller.db.get_all_produk()
-            product_map = {p['id_produk']: p['nama_produk'] for p in products}
+            self.product_map = self.controller.get_nama_produk()
             
-            # Display pesanan
-            for pesanan in pesanan_list:
-                # Get product name
-                product_name = product_map.get(pesanan.id_produk, pesanan.id_produk)
-                
-                values = (
-                    pesanan.id_pesanan,
-                    datetime.fromisoformat(pesanan.tanggal_pesanan).strftime("%d/%m/%Y %H:%M"),
-                    pesanan.id_pelanggan, 
-                    product_name,
-                    pesanan.jumlah_dipesan,
-                    f"Rp {pesanan.total_harga:,}",
-                    pesanan.status
-                )
-                
-                # Set row tags based on status
-                tags = ()
-                if pesanan.status == "Selesai":
-                    tags = ('completed',)
-                elif pesanan.status == "Dibatalkan":
-                    tags = ('cancelled',)
-                elif pesanan.status == "Pending":
-                    tags = ('pending',)
-                    
-                self.tree.insert('', tk.END, values=values, tags=tags)
+            # Display pesanan, baris diformat saat terlihat
+            self.table.set_rows(pesanan_list)
                 
         except Exception as e:
             print(f"Error refreshing data: {str(e)}")
@@ -284,14 +239,41 @@ class DaftarPesanan:
                 "Gagal memperbarui data pesanan"
             )
             
+    def format_pesanan(self, pesanan):
+        """values dan tags satu baris pesanan di tabel"""
+        # Get product name
+        product_name = self.product_map.get(pesanan['id_produk'], pesanan['id_produk'])
+        tanggal = pesanan['tanggal_pesanan']
+        
+        values = (
+            pesanan['id_pesanan'],
+            tanggal.strftime("%d/%m/%Y %H:%M") if tanggal else '-',
+            pesanan['id_pelanggan'], 
+            product_name,
+            pesanan['jumlah_dipesan'],
+            f"Rp {pesanan['total_harga']:,}",
+            pesanan['status']
+        )
+        
+        # Set row tags based on status
+        status = pesanan['status']
+        tags = ()
+        if status == "Selesai":
+            tags = ('completed',)
+        elif status == "Dibatalkan":
+            tags = ('cancelled',)
+        elif status == "Pending":
+            tags = ('pending',)
+        return values, tags
+            
     def on_item_double_click(self, event):
         """Handler untuk event double click pada item tabel"""
-        selected = self.tree.selection()
-        if not selected:
+        pesanan = self.table.selected_row()
+        if not pesanan:
             return
             
         # Ambil ID pesanan yang dipilih
-        pesanan_id = self.tree.item(selected[0])['values'][0]
+        pesanan_id = pesanan['id_pesanan']
         
         # Buka window detail pesanan
         DetailPesanan(
@@ -311,8 +293,8 @@ class DaftarPesanan:
 
     def edit_order(self):
         """Mengedit pesanan yang dipilih"""
-        selected = self.tree.selection()
-        if not selected:
+        pesanan = self.table.selected_row()
+        if not pesanan:
             messagebox.showwarning(
                 "Peringatan",
                 "Pilih pesanan yang akan diedit"
@@ -320,7 +302,7 @@ class DaftarPesanan:
             return
             
         # Ambil ID pesanan yang dipilih    
-        pesanan_id = self.tree.item(selected[0])['values'][0]
+        pesanan_id = pesanan['id_pesanan']
         
         # Buka form edit pesanan
         InputPesanan(
@@ -332,8 +314,8 @@ class DaftarPesanan:
 
     def cancel_order(self):
         """Membatalkan pesanan yang dipilih"""
-        selected = self.tree.selection()
-        if not selected:
+        pesanan = self.table.selected_row()
+        if not pesanan:
             messagebox.showwarning(
                 "Peringatan",
                 "Pilih pesanan yang akan dibatalkan"
@@ -341,7 +323,7 @@ class DaftarPesanan:
             return
             
         # Ambil ID pesanan yang dipilih
-        pesanan_id = self.tree.item(selected[0])['values'][0]
+        pesanan_id = pesanan['id_pesanan']
         
         # Buka window pembatalan pesanan
         PembatalanPesanan(
@@ -353,16 +335,16 @@ class DaftarPesanan:
 
     def complete_order(self):
         """Menandai pesanan sebagai selesai"""
-        selected = self.tree.selection()
-        if not selected:
+        pesanan = self.table.selected_row()
+        if not pesanan:
             messagebox.showwarning(
                 "Peringatan",
                 "Pilih pesanan yang akan diselesaikan"
             )
             return
             
-        pesanan_id = self.tree.item(selected[0])['values'][0]
-        current_status = self.tree.item(selected[0])['values'][6]  # Status ada di index 6
+        pesanan_id = pesanan['id_pesanan']
+        current_status = pesanan['status']
         
         # Validasi status sebelum melanjutkan
         if current_status == "Selesai":
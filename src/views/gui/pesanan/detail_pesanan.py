@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 from controllers.pesanan_controller import PesananController
-from utils.database import DatabaseManager
 
 class DetailPesanan:
     def __init__(self, parent, colors, pesanan_id, callback=None):
@@ -11,7 +10,7 @@ class DetailPesanan:
         self.pesanan_id = pesanan_id  
         self.callback = callback
         self.controller = PesananController()
-        self.db = DatabaseManager()
+        self.db = self.controller.db
         
         # Load pesanan data
         self.load_pesanan_data()
@@ -85,11 +84,7 @@ class DetailPesanan:
             return
             
         # Ambil data produk terkait
-        self.product = next(
-            (p for p in self.db.get_all_produk() 
-             if p['id_produk'] == self.pesanan.id_produk),
-            None
-        )
+        self.product = self.db.get_produk_by_id(self.pesanan.id_produk)
 
     def create_status_section(self):
         """Membuat bagian status pesanan"""
@@ -238,20 +233,20 @@ class DetailPesanan:
         )
         history_frame.pack(fill=tk.X, padx=20, pady=10)
         
-        # Ambil riwayat status dari database
-        history = [
-            {
-                'status': 'Pending',
-                'timestamp': self.pesanan.tanggal_pesanan,
-                'keterangan': 'Pesanan dibuat'
-            }
-        ]
-        
-        if self.pesanan.status in ['Selesai', 'Dibatalkan']:
+        # Ambil riwayat status dari database (indeks id_pesanan)
+        history = []
+        for event in self.controller.get_riwayat_status(self.pesanan_id):
+            tanggal = event['tanggal']
+            if not event['status_lama']:
+                keterangan = 'Pesanan dibuat'
+            elif event['status'] == 'Pending':
+                keterangan = f"Dikembalikan dari {event['status_lama']}"
+            else:
+                keterangan = f"Pesanan {event['status'].lower()}"
             history.append({
-                'status': self.pesanan.status,
-                'timestamp': datetime.now(),  # Idealnya dari database
-                'keterangan': f"Pesanan {self.pesanan.status.lower()}"
+                'status': event['status'],
+                'timestamp': tanggal.strftime("%d %B %Y %H:%M") if tanggal else '-',
+                'keterangan': keterangan
             })
         
         # Tampilkan setiap riwayat
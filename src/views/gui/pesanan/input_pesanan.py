@@ -2,8 +2,19 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 from controllers.pesanan_controller import PesananController
+from controllers.produk_controller import ProdukController
 from models.produk import Produk
-from utils.database import DatabaseManager
+
+# Jeda setelah ketikan terakhir sebelum pilihan produk dicari ulang (ms)
+SEARCH_DELAY_MS = 200
+# Jumlah pilihan produk di combobox
+PRODUCT_OPTIONS_LIMIT = 50
+# Tombol yang tidak mengubah teks pencarian produk
+NAVIGATION_KEYS = {
+    'Up', 'Down', 'Left', 'Right', 'Return', 'KP_Enter', 'Escape', 'Tab',
+    'Home', 'End', 'Prior', 'Next', 'Shift_L', 'Shift_R', 'Control_L', 'Control_R',
+    'Alt_L', 'Alt_R'
+}
 
 class InputPesanan:
     def __init__(self, parent, colors, pesanan_id=None, callback=None):
@@ -22,7 +33,12 @@ class InputPesanan:
         self.pesanan_id = pesanan_id
         self.callback = callback
         self.controller = PesananController()
-        self.db = DatabaseManager()
+        self.db = self.controller.db
+        self.produk_controller = ProdukController(db=self.db)
+        # Label combobox -> produk, untuk pilihan yang sedang ditampilkan
+        self.product_options = {}
+        # Pencarian produk yang dijadwalkan oleh ketikan terakhir (after id)
+        self._search_job = None
         
         # Buat window baru
         self.window = tk.Toplevel(self.parent)
@@ -113,7 +129,7 @@ class InputPesanan:
         
         # ID Pesanan (Auto-generated atau existing)
         self.id_pesanan = tk.StringVar(
-            value=self.pesanan_id or f"PSN{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            value=self.pesanan_id or self.db.new_id('PSN')
         )
         self.create_form_field(form_frame, "ID Pesanan:", self.id_pesanan, disabled=True)
         
@@ -130,26 +146,20 @@ class InputPesanan:
             fg=self.colors['text']
         ).pack(anchor='w', pady=(10, 0))
         
-        # Ambil daftar produk dari database
-        self.products = self.db.get_all_produk()
-        product_names = [
-            f"{p['nama_produk']} (Stok: {p['stok']})" 
-            for p in self.products
-        ]
-        
-        # Combobox produk
+        # Combobox produk: ketik nama (boleh salah ketik), pilihan diurutkan
+        # berdasarkan kecocokan dan penjualan, awalnya produk terlaris
         self.product_var = tk.StringVar()
         self.product_cb = ttk.Combobox(
             form_frame,
             textvariable=self.product_var,
-            values=product_names,
-            width=40,
-            state="readonly"
+            values=self.search_product_options(""),
+            width=40
         )
         self.product_cb.pack(fill=tk.X, pady=(0, 10))
         
         # Bind event perubahan produk
         self.product_cb.bind('<<ComboboxSelected>>', self.on_product_select)
+        self.product_cb.bind('<KeyRelease>', self.schedule_product_search)
         
         # Jumlah pesanan
         tk.Label(
@@ -324,17 +334,40 @@ class InputPesanan:
         self.quantity_var.set("1")
         self.update_summary()
 
+    def product_label(self, product):
+        """Label produk di combobox"""
+        return f"{product['nama_produk']} (Stok: {product['stok']})"
+
+    def search_product_options(self, keyword):
+        """Mencari produk untuk combobox dan mengembalikan labelnya"""
+        products = self.produk_controller.cari_produk_ranking(keyword, limit=PRODUCT_OPTIONS_LIMIT)
+        self.product_options = {self.product_label(p): p for p in products}
+        return list(self.product_options)
+
+    def schedule_product_search(self, event):
+        """Menunda pencarian produk sampai ketikan berhenti selama SEARCH_DELAY_MS"""
+        if event.keysym in NAVIGATION_KEYS:
+            return
+        if self._search_job is not None:
+            self.window.after_cancel(self._search_job)
+        self._search_job = self.window.after(SEARCH_DELAY_MS, self.update_product_options)
+
+    def update_product_options(self):
+        """Memperbarui pilihan combobox sesuai teks yang diketik"""
+        self._search_job = None
+        keyword = self.product_var.get()
+        if keyword in self.product_options:
+            # Teks adalah pilihan yang sudah ada, bukan ketikan baru
+            return
+        self.product_cb['values'] = self.search_product_options(keyword)
+
     def get_selected_product(self):
         """Mendapatkan data produk yang dipilih"""
         selection = self.product_var.get()
         if not selection:
             return None
             
-        product_name = selection.split(" (Stok:")[0]
-        return next(
-            (p for p in self.products if p['nama_produk'] == product_name),
-            None
-        )
+        return self.product_options.get(selection)
 
     def update_summary(self, *args):
         """Memperbarui ringkasan pesanan"""
@@ -366,14 +399,11 @@ class InputPesanan:
         self.id_pelanggan.set(pesanan.id_pelanggan)
         
         # Set produk
-        product = next(
-            (p for p in self.products if p['id_produk'] == pesanan.id_produk),
-            None
-        )
+        product = self.db.get_produk_by_id(pesanan.id_produk)
         if product:
-            self.product_var.set(
-                f"{product['nama_produk']} (Stok: {product['stok']})"
-            )
+            label = self.product_label(product)
+            self.product_options[label] = product
+            self.product_var.set(label)
             self.on_product_select()
             
         # Set jumlah
@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 from controllers.pesanan_controller import PesananController
-from utils.database import DatabaseManager
 
 class PembatalanPesanan:
     def __init__(self, parent, colors, pesanan_id, callback=None):
@@ -20,7 +19,7 @@ class PembatalanPesanan:
         self.pesanan_id = pesanan_id
         self.callback = callback
         self.controller = PesananController()
-        self.db = DatabaseManager()
+        self.db = self.controller.db
         
         # Buat window baru
         self.window = tk.Toplevel(self.parent)
@@ -276,11 +275,7 @@ class PembatalanPesanan:
                 return
                 
             # Load data produk terkait
-            self.product = next(
-                (p for p in self.db.get_all_produk() 
-                 if p['id_produk'] == self.pesanan.id_produk),
-                None
-            )
+            self.product = self.db.get_produk_by_id(self.pesanan.id_produk)
             
         except Exception as e:
             messagebox.showerror(
@@ -4,6 +4,12 @@ from .tambah_produk import TambahProduk
 from .edit_produk import EditProduk
 from .detail_produk import DetailProduk
 from controllers.produk_controller import ProdukController
+from ..components.virtual_table import VirtualTable
+
+# Jeda setelah ketikan terakhir sebelum pencarian dijalankan (ms)
+SEARCH_DELAY_MS = 200
+# Hasil pencarian berperingkat yang ditampilkan
+SEARCH_LIMIT = 500
 
 class DaftarProduk:
     def __init__(self, parent, colors):
@@ -17,6 +23,8 @@ class DaftarProduk:
         self.parent = parent
         self.colors = colors
         self.controller = ProdukController()
+        # Pencarian yang dijadwalkan oleh ketikan terakhir (after id)
+        self._search_job = None
         
         # Frame utama
         self.frame = tk.Frame(
@@ -98,8 +106,8 @@ class DaftarProduk:
             command=self.search_products
         ).pack(side=tk.LEFT, padx=5)
         
-        # Bind event pencarian
-        self.search_var.trace_add('write', lambda *args: self.search_products())
+        # Bind event pencarian, dijalankan setelah pengguna berhenti mengetik
+        self.search_var.trace_add('write', lambda *args: self.schedule_search())
         
     def create_category_filter(self):
         """Membuat filter berdasarkan kategori"""
@@ -160,11 +168,11 @@ class DaftarProduk:
             'Status'
         )
         
-        # Buat Treeview
-        self.tree = ttk.Treeview(
+        # Tabel virtual: hanya baris yang terlihat yang dibuat sebagai item
+        self.table = VirtualTable(
             table_frame,
-            columns=columns,
-            show='headings',
+            columns,
+            formatter=self.format_product,
             height=15
         )
         
@@ -182,28 +190,30 @@ class DaftarProduk:
         
         # Setup kolom-kolom
         for col in columns:
-            self.tree.heading(col, text=col)
+            self.table.heading(col, text=col)
             width = 100
             if col == 'Nama Produk':
                 width = 200
             elif col == 'Kategori':
                 width = 150
-            self.tree.column(col, width=width, anchor='center')
+            self.table.column(col, width=width, anchor='center')
         
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(
-            table_frame,
-            orient=tk.VERTICAL,
-            command=self.tree.yview
+        # Konfigurasi warna status
+        self.table.tag_configure(
+            'out_of_stock',
+            foreground=self.colors['error']
+        )
+        self.table.tag_configure(
+            'low_stock',
+            foreground=self.colors['warning']
+        )
+        self.table.tag_configure(
+            'in_stock',
+            foreground=self.colors['success']
         )
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Pack komponen
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Bind double click
-        self.tree.bind('<Double-1>', self.on_item_double_click)
+        self.table.bind('<Double-1>', self.on_item_double_click)
 
     def create_action_buttons(self):
         """Membuat tombol-tombol aksi"""
@@ -247,119 +257,75 @@ class DaftarProduk:
 
     def refresh_data(self):
         """Memperbarui data produk di tabel"""
-        # Hapus data existing
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
         # Ambil data produk melalui controller
-        products = self.controller.get_all_produk()
+        products = self.controller.get_all_produk_typed()
         
         # Update statistik
         total_products = len(products)
-        low_stock = len([p for p in products if int(p['stok']) <= 10])
+        low_stock = len([p for p in products if p['stok'] <= 10])
         self.stats_label.config(
             text=f"Total: {total_products} produk | Stok Menipis: {low_stock}"
         )
         
-        # Masukkan data ke tabel
-        for product in products:
-            # Tentukan status stok
-            stok = int(product['stok'])
-            if stok == 0:
-                status = "Habis"
-                tags = ('out_of_stock',)
-            elif stok <= 10:
-                status = "Menipis"
-                tags = ('low_stock',)
-            else:
-                status = "Tersedia"
-                tags = ('in_stock',)
-                
-            # Insert ke tabel
-            self.tree.insert(
-                '',
-                tk.END,
-                values=(
-                    product['id_produk'],
-                    product['nama_produk'],
-                    product['kategori'],
-                    f"Rp {float(product['harga']):,}",
-                    product['stok'],
-                    status
-                ),
-                tags=tags
-            )
+        # Baris diformat saat terlihat, bukan semuanya di sini
+        self.table.set_rows(products)
+
+    def format_product(self, product):
+        """values dan tags satu baris produk di tabel"""
+        # Tentukan status stok
+        stok = product['stok']
+        if stok == 0:
+            status = "Habis"
+            tags = ('out_of_stock',)
+        elif stok <= 10:
+            status = "Menipis"
+            tags = ('low_stock',)
+        else:
+            status = "Tersedia"
+            tags = ('in_stock',)
             
-        # Konfigurasi warna status
-        self.tree.tag_configure(
-            'out_of_stock',
-            foreground=self.colors['error']
-        )
-        self.tree.tag_configure(
-            'low_stock',
-            foreground=self.colors['warning']
-        )
-        self.tree.tag_configure(
-            'in_stock',
-            foreground=self.colors['success']
+        values = (
+            product['id_produk'],
+            product['nama_produk'],
+            product['kategori'],
+            f"Rp {product['harga']:,}",
+            product['stok'],
+            status
         )
+        return values, tags
+
+    def schedule_search(self):
+        """Menunda pencarian sampai ketikan berhenti selama SEARCH_DELAY_MS"""
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+        self._search_job = self.frame.after(SEARCH_DELAY_MS, self.search_products)
 
     def search_products(self, *args):
         """Mencari produk berdasarkan keyword"""
-        keyword = self.search_var.get().lower()
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+            self._search_job = None
+        keyword = self.search_var.get()
         category = self.category_var.get()
         
-        # Reset table
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Filter produk
-        products = self.controller.get_all_produk()
-        filtered_products = []
-        
-        for product in products:
-            name_match = keyword in product['nama_produk'].lower()
-            category_match = (
-                category == "Semua" or 
-                category == product['kategori']
-            )
-            
-            if name_match and category_match:
-                filtered_products.append(product)
+        # Keyword diurutkan berdasarkan kecocokan (toleran salah ketik) dan penjualan,
+        # tanpa keyword tampilkan semua produk kategori
+        kategori = None if category == "Semua" else category
+        if keyword.strip():
+            filtered_products = self.controller.cari_produk_ranking(keyword, kategori, SEARCH_LIMIT)
+        else:
+            filtered_products = self.controller.cari_produk(keyword, kategori)
                 
         # Update statistik
         total_filtered = len(filtered_products)
-        low_stock = len([p for p in filtered_products if int(p['stok']) <= 10])
+        low_stock = len([p for p in filtered_products if p['stok'] <= 10])
+        more = "+" if keyword.strip() and total_filtered >= SEARCH_LIMIT else ""
         self.stats_label.config(
-            text=f"Ditemukan: {total_filtered} produk | Stok Menipis: {low_stock}"
+            text=f"Ditemukan: {total_filtered}{more} produk | Stok Menipis: {low_stock}"
         )
         
         # Tampilkan hasil
-        for product in filtered_products:
-            stok = int(product['stok'])
-            if stok == 0:
-                status = "Habis"
-                tags = ('out_of_stock',)
-            elif stok <= 10:
-                status = "Menipis"
-                tags = ('low_stock',)
-            else:
-                status = "Tersedia"
-                tags = ('in_stock',)
-                
-            self.tree.insert(
-                '',
-                tk.END,
-                values=(
-                    product['id_produk'],
-                    product['nama_produk'],
-                    product['kategori'],
-                    f"Rp {float(product['harga']):,}",
-                    product['stok'],
-                    status
-                ),
-                tags=tags
-            )
+        self.table.set_rows(filtered_products)
             
     def filter_products(self):
         """Filter produk berdasarkan kategori"""
@@ -367,12 +333,12 @@ class DaftarProduk:
         
     def on_item_double_click(self, event):
         """Handler untuk double click pada item"""
-        selected = self.tree.selection()
-        if not selected:
+        product = self.table.selected_row()
+        if not product:
             return
             
         # Ambil ID produk yang dipilih
-        product_id = self.tree.item(selected[0])['values'][0]
+        product_id = product['id_produk']
         
         # Tampilkan detail produk
         DetailProduk(
@@ -392,8 +358,8 @@ class DaftarProduk:
         
     def edit_product(self):
         """Membuka form edit produk"""
-        selected = self.tree.selection()
-        if not selected:
+        product = self.table.selected_row()
+        if not product:
             messagebox.showwarning(
                 "Peringatan",
                 "Pilih produk yang akan diedit"
@@ -401,7 +367,7 @@ class DaftarProduk:
             return
             
         # Ambil ID produk yang dipilih
-        product_id = self.tree.item(selected[0])['values'][0]
+        product_id = product['id_produk']
         
         # Buka form edit
         EditProduk(
@@ -413,8 +379,8 @@ class DaftarProduk:
         
     def delete_product(self):
         """Menghapus produk yang dipilih"""
-        selected = self.tree.selection()
-        if not selected:
+        product = self.table.selected_row()
+        if not product:
             messagebox.showwarning(
                 "Peringatan",
                 "Pilih produk yang akan dihapus"
@@ -422,8 +388,8 @@ class DaftarProduk:
             return
             
         # Ambil data produk yang dipilih
-        product_id = self.tree.item(selected[0])['values'][0]
-        product_name = self.tree.item(selected[0])['values'][1]
+        product_id = product['id_produk']
+        product_name = product['nama_produk']
         
         # Konfirmasi penghapusan
         if messagebox.askyesno(
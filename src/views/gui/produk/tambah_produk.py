@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import re
 from controllers.produk_controller import ProdukController
-from datetime import datetime
 
 class TambahProduk:
     def __init__(self, parent, colors, callback=None):
@@ -55,7 +54,7 @@ class TambahProduk:
         ).pack(side=tk.LEFT)
         
         # Auto-generated ID produk
-        id_produk = f"PRD{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        id_produk = self.controller.db.new_id('PRD')
         tk.Label(
             header_frame,
             text=f"ID: {id_produk}",
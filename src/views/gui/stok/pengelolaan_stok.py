@@ -1,16 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from controllers.produk_controller import ProdukController 
-from utils.database import DatabaseManager
 from datetime import datetime
 
+# Jumlah mutasi yang ditampilkan di riwayat perubahan
+HISTORY_LIMIT = 200
+
 class PengelolaanStok:
     """Kelas untuk mengelola stok produk"""
     def __init__(self, parent, colors):
         self.parent = parent
         self.colors = colors
         self.controller = ProdukController()
-        self.db = DatabaseManager()
+        self.db = self.controller.db
+        # id_produk -> nama produk, untuk kolom Produk di riwayat
+        self.product_names = {}
 
         # Frame utama
         self.frame = tk.Frame(
@@ -23,6 +27,7 @@ class PengelolaanStok:
         self.create_filter_section()
         self.create_table()
         self.create_adjustment_section()
+        self.create_history_section()
         self.refresh_data()
         
     def create_header(self):
@@ -161,6 +166,9 @@ class PengelolaanStok:
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # Pilih produk untuk penyesuaian dan riwayatnya
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        
     def create_adjustment_section(self):
         """Membuat bagian penyesuaian stok"""
         adjust_frame = tk.LabelFrame(
@@ -296,7 +304,7 @@ class PengelolaanStok:
                 return
                 
             # Update stok
-            success = self.controller.update_stock(
+            success = self.controller.update_stok(
                 self.id_var.get(),
                 qty
             )
@@ -306,9 +314,9 @@ class PengelolaanStok:
                     "Sukses",
                     "Stok berhasil diperbarui"
                 )
-                self.refresh_data()
                 self.id_var.set("")
                 self.qty_var.set("0")
+                self.refresh_data()
             else:
                 messagebox.showerror(
                     "Error",
@@ -346,6 +354,7 @@ class PengelolaanStok:
                 
             # Status filter
             stok = int(product['stok'])
+            self.product_names[product['id_produk']] = product['nama_produk']
             product_status = "Stok Aman"
             tags = ('normal',)
             
@@ -401,4 +410,38 @@ class PengelolaanStok:
             f"Total: {total_products} | "
             f"Stok Menipis: {low_stock} | "
             f"Habis: {out_of_stock}"
-        )
\ No newline at end of file
+        )
+        
+        self.refresh_history()
+        
+    def on_select(self, event=None):
+        """Handler saat produk dipilih di tabel stok"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        self.id_var.set(str(self.tree.item(selection[0])['values'][0]))
+        self.refresh_history()
+        
+    def refresh_history(self):
+        """Menampilkan mutasi stok produk terpilih, atau mutasi terbaru semua produk"""
+        for item in self.history_tree.get_children():
+            self.history_tree.delete(item)
+            
+        # Riwayat per produk dibaca melalui indeks id_produk di buku besar
+        id_produk = self.id_var.get() or None
+        for mutasi in self.controller.get_riwayat_stok(id_produk, limit=HISTORY_LIMIT):
+            tanggal = mutasi['tanggal']
+            keterangan = mutasi['alasan']
+            if mutasi['ref_id']:
+                keterangan += f" ({mutasi['ref_id']})"
+            self.history_tree.insert(
+                '',
+                tk.END,
+                values=(
+                    tanggal.strftime("%d/%m/%Y %H:%M") if tanggal else '-',
+                    self.product_names.get(mutasi['id_produk'], mutasi['id_produk']),
+                    f"{mutasi['delta']:+d}",
+                    mutasi['stok_akhir'],
+                    keterangan
+                )
+            )
\ No newline at end of file
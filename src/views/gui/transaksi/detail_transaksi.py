@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
-from utils.database import DatabaseManager
+from utils.database import get_database_manager
 
 class DetailTransaksi:
     def __init__(self, parent, colors, trans_id):
@@ -16,7 +16,7 @@ class DetailTransaksi:
         self.parent = parent
         self.colors = colors
         self.trans_id = trans_id
-        self.db = DatabaseManager()
+        self.db = get_database_manager()
         
         # Buat window baru
         self.window = tk.Toplevel(self.parent)
@@ -45,11 +45,7 @@ class DetailTransaksi:
         
     def load_transaction_data(self):
         """Memuat data transaksi"""
-        transactions = self.db.get_all_transaksi()
-        self.transaction = next(
-            (t for t in transactions if t['id_transaksi'] == self.trans_id),
-            None
-        )
+        self.transaction = self.db.get_transaksi_by_id(self.trans_id)
         
         if not self.transaction:
             messagebox.showerror(
@@ -2,8 +2,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
 import pandas as pd
-from utils.database import DatabaseManager
+from utils.database import get_database_manager
+from utils.tasks import get_task_executor
 from .detail_transaksi import DetailTransaksi
+from ..components.virtual_table import VirtualTable
 
 class RiwayatTransaksi:
     def __init__(self, parent, colors):
@@ -16,7 +18,9 @@ class RiwayatTransaksi:
         """
         self.parent = parent
         self.colors = colors
-        self.db = DatabaseManager()
+        self.db = get_database_manager()
+        # Ekspor yang sedang berjalan di background
+        self.export_task = None
         
         # Frame utama
         self.frame = tk.Frame(
@@ -149,33 +153,22 @@ class RiwayatTransaksi:
             'Metode Pembayaran'
         )
         
-        self.tree = ttk.Treeview(
+        # Tabel virtual: hanya baris yang terlihat yang dibuat sebagai item
+        self.table = VirtualTable(
             table_frame,
-            columns=columns,
-            show='headings',
+            columns,
+            formatter=self.format_transaksi,
             height=15
         )
         
         # Setup kolom
         for col in columns:
-            self.tree.heading(col, text=col)
+            self.table.heading(col, text=col)
             width = 150 if col in ['Pelanggan', 'Metode Pembayaran'] else 100
-            self.tree.column(col, width=width, anchor='center')
-            
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(
-            table_frame,
-            orient=tk.VERTICAL,
-            command=self.tree.yview
-        )
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Pack komponen
-        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            self.table.column(col, width=width, anchor='center')
         
         # Bind double click
-        self.tree.bind('<Double-1>', self.on_double_click)
+        self.table.bind('<Double-1>', self.on_double_click)
         
     def create_action_buttons(self):
         """Membuat tombol-tombol aksi"""
@@ -186,7 +179,7 @@ class RiwayatTransaksi:
         button_frame.pack(fill=tk.X)
         
         # Tombol Export
-        tk.Button(
+        self.export_button = tk.Button(
             button_frame,
             text="📊 Export ke Excel",
             font=('Arial', 10),
@@ -195,7 +188,8 @@ class RiwayatTransaksi:
             padx=20,
             pady=10,
             command=self.export_to_excel
-        ).pack(side=tk.LEFT)
+        )
+        self.export_button.pack(side=tk.LEFT)
         
         # Tombol Cetak
         tk.Button(
@@ -212,10 +206,6 @@ class RiwayatTransaksi:
     def refresh_data(self):
         """Memperbarui tampilan data"""
         try:
-            # Clear existing data
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-    
             # Get date range
             end_date = datetime.now()
             start_date = self.get_start_date()
@@ -229,35 +219,35 @@ class RiwayatTransaksi:
             # Update summary
             self.update_summary(report)
     
-            # Display transactions
-            for trans in report['transaksi_list']:
-                try:
-                    # Convert string to datetime
-                    tanggal = datetime.fromisoformat(trans['tanggal_transaksi'])
-                    
-                    self.tree.insert(
-                        '',
-                        tk.END,
-                        values=(
-                            trans['id_transaksi'],
-                            tanggal.strftime("%d/%m/%Y %H:%M"),
-                            trans.get('id_pelanggan', '-'),
-                            trans.get('total_item', '1'),
-                            f"Rp {float(trans['total_harga']):,}",
-                            trans.get('metode_pembayaran', 'Tunai')
-                        )
-                    )
-                except Exception as e:
-                    print(f"Error displaying transaction: {str(e)}")
-                    continue
+            # Display transactions, baris diformat saat terlihat
+            self.table.set_rows(report['transaksi_list'])
                 
         except Exception as e:
             print(f"Error refreshing data: {str(e)}")
+            self.table.clear()
             messagebox.showerror(
                 "Error",
                 "Gagal memuat data. Silakan coba lagi."
             )
             
+    def format_transaksi(self, trans):
+        """values satu baris transaksi di tabel"""
+        try:
+            # Convert string to datetime
+            tanggal = datetime.fromisoformat(trans['tanggal_transaksi']).strftime("%d/%m/%Y %H:%M")
+        except (TypeError, ValueError):
+            tanggal = '-'
+            
+        values = (
+            trans['id_transaksi'],
+            tanggal,
+            trans.get('id_pelanggan', '-'),
+            trans.get('total_item', '1'),
+            f"Rp {float(trans['total_harga']):,}",
+            trans.get('metode_pembayaran', 'Tunai')
+        )
+        return values, ()
+            
     def get_start_date(self):
         """Mendapatkan tanggal awal berdasarkan periode yang dipilih"""
         period = self.period_var.get()
@@ -321,46 +311,63 @@ class RiwayatTransaksi:
             
     def on_double_click(self, event):
         """Handler untuk double click pada transaksi"""
-        selected = self.tree.selection()
-        if not selected:
+        trans = self.table.selected_row()
+        if not trans:
             return
             
         # Get selected transaction
-        trans_id = self.tree.item(selected[0])['values'][0]
+        trans_id = trans['id_transaksi']
         
         # Show detail window
         DetailTransaksi(self.parent, self.colors, trans_id)
         
     def export_to_excel(self):
-        """Export data transaksi ke Excel"""
+        """Export data transaksi ke Excel, file ditulis di background"""
+        if self.export_task is not None and self.export_task.pending:
+            return
+            
         # Get date range
         end_date = datetime.now()
         start_date = self.get_start_date()
         
-        try:
-            # Get transactions
-            transactions = self.db.generate_laporan_penjualan(
-                start_date,
-                end_date
-            )
-            
-            # Create DataFrame
-            df = pd.DataFrame(transactions['transaksi_list'])
-            
-            # Export to Excel
-            filename = f"Transaksi_{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}.xlsx"
-            df.to_excel(filename, index=False)
-            
-            messagebox.showinfo(
-                "Sukses",
-                f"Data berhasil diekspor ke {filename}"
-            )
-            
-        except Exception as e:
-            messagebox.showerror(
-                "Error",
-                f"Gagal mengekspor data: {str(e)}"
-            )
+        self.export_button.config(text="⏳ Mengekspor...", state=tk.DISABLED)
+        self.export_task = get_task_executor().submit(
+            self.frame, self.write_excel, start_date, end_date,
+            on_done=self.on_export_done,
+            on_error=self.on_export_error
+        )
+        
+    def write_excel(self, start_date, end_date):
+        """Membaca transaksi dan menulis file Excel, dijalankan di thread background"""
+        # Get transactions
+        transactions = self.db.generate_laporan_penjualan(
+            start_date,
+            end_date
+        )
+        
+        # Create DataFrame
+        df = pd.DataFrame(transactions['transaksi_list'])
+        
+        # Export to Excel
+        filename = f"Transaksi_{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}.xlsx"
+        df.to_excel(filename, index=False)
+        return filename
+        
+    def on_export_done(self, filename):
+        """Handler setelah file Excel selesai ditulis"""
+        self.export_button.config(text="📊 Export ke Excel", state=tk.NORMAL)
+        messagebox.showinfo(
+            "Sukses",
+            f"Data berhasil diekspor ke {filename}"
+        )
+        
+    def on_export_error(self, error):
+        """Handler jika ekspor gagal"""
+        self.export_button.config(text="📊 Export ke Excel", state=tk.NORMAL)
+        messagebox.showerror(
+            "Error",
+            f"Gagal mengekspor data: {str(error)}"
+        )
             
     def print_report(self):
         """Mencetak laporan transaksi"""
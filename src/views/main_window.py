@@ -9,9 +9,12 @@ from .gui.produk.daftar_produk import DaftarProduk
 from .gui.pesanan.daftar_pesanan import DaftarPesanan
 from .gui.laporan.laporan_penjualan import LaporanPenjualan
 from .gui.transaksi.riwayat_transaksi import RiwayatTransaksi
+from .gui.diagnostik import PanelDiagnostik
 from .gui.components.sidebar import Sidebar
 from .gui.components.header import Header
 from .gui.components.footer import Footer
+from utils.database import get_database_manager
+from utils.metrics import metrics_enabled, timed
 
 class MainWindow:
     def __init__(self):
@@ -61,7 +64,8 @@ class MainWindow:
             "Produk": self.show_products,
             "Pesanan": self.show_orders,
             "Laporan": self.show_reports,
-            "Transaksi": self.show_transactions
+            "Transaksi": self.show_transactions,
+            "Diagnostik": self.show_diagnostics
         })
         
         # Inisialisasi area konten utama
@@ -74,28 +78,36 @@ class MainWindow:
     
     def show_home(self):
         """Menampilkan halaman utama"""
-        self.clear_main_content()
-        HalamanUtama(self.main_content, self.colors)
+        self.show_page(HalamanUtama)
     
     def show_products(self):
         """Menampilkan halaman produk"""
-        self.clear_main_content()
-        DaftarProduk(self.main_content, self.colors)
+        self.show_page(DaftarProduk)
     
     def show_orders(self):
         """Menampilkan halaman pesanan"""
-        self.clear_main_content()
-        DaftarPesanan(self.main_content, self.colors)
+        self.show_page(DaftarPesanan)
     
     def show_reports(self):
         """Menampilkan halaman laporan"""
-        self.clear_main_content()
-        LaporanPenjualan(self.main_content, self.colors)
+        self.show_page(LaporanPenjualan)
     
     def show_transactions(self):
         """Menampilkan halaman transaksi"""
+        self.show_page(RiwayatTransaksi)
+    
+    def show_diagnostics(self):
+        """Menampilkan panel diagnostik"""
+        self.show_page(PanelDiagnostik)
+    
+    def show_page(self, page_class):
+        """Mengganti isi konten utama dengan halaman baru"""
         self.clear_main_content()
-        RiwayatTransaksi(self.main_content, self.colors)
+        # Waktu pembuatan dan layout halaman ikut diukur saat pengukuran aktif
+        with timed(f"view.{page_class.__name__}"):
+            page_class(self.main_content, self.colors)
+            if metrics_enabled():
+                self.root.update_idletasks()
     
     def clear_main_content(self):
         """Membersihkan area konten utama"""
@@ -105,6 +117,8 @@ class MainWindow:
     def run(self):
         """Menjalankan aplikasi"""
         self.root.mainloop()
+        # Lipat sisa change log ke CSV utama sebelum aplikasi ditutup
+        get_database_manager().compact()
 
 if __name__ == "__main__":
     app = MainWindow()
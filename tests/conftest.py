@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils.database import CSVHandler, DatabaseManager  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Direktori data kosong per test"""
+    CSVHandler.cache.invalidate()
+    yield str(tmp_path)
+    CSVHandler.flush()
+    CSVHandler.cache.invalidate()
+
+
+@pytest.fixture
+def db(data_dir):
+    return DatabaseManager(data_dir)
+
+
+@pytest.fixture
+def restart(data_dir):
+    """Membuka ulang database seperti proses baru: cache tabel di memori dibuang"""
+    def reopen() -> DatabaseManager:
+        CSVHandler.cache.invalidate()
+        return DatabaseManager(data_dir)
+    return reopen
@@ -0,0 +1,18 @@
+"""Data contoh untuk test"""
+from datetime import datetime
+
+
+def produk(id_produk, stok=10, harga=1000.0, nama='Kurma Ajwa'):
+    return {'id_produk': id_produk, 'nama_produk': nama, 'kategori': 'Makanan',
+            'harga': harga, 'stok': stok}
+
+
+def pesanan(id_pesanan, id_produk='PRD1', jumlah=1, tanggal=None):
+    return {'id_pesanan': id_pesanan, 'id_pelanggan': 'CUST001', 'id_produk': id_produk,
+            'jumlah_dipesan': jumlah, 'total_harga': 1000.0 * jumlah, 'status': 'Pending',
+            'tanggal_pesanan': (tanggal or datetime.now()).isoformat()}
+
+
+def transaksi(id_transaksi, id_pesanan, tanggal=None):
+    return {'id_transaksi': id_transaksi, 'id_pesanan': id_pesanan, 'total_harga': 1000.0,
+            'metode_pembayaran': 'Tunai', 'tanggal_transaksi': (tanggal or datetime.now()).isoformat()}
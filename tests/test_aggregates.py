@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from tests.records import pesanan, produk
+
+
+def test_stock_ledger_balance(db, restart):
+    assert db.add_produk(produk('PRD1', stok=10))
+    assert db.add_mutasi_stok('PRD1', -3, 'Penjualan')
+    assert db.add_mutasi_stok('PRD1', 5, 'Restok')
+    # Stok tidak boleh negatif
+    assert not db.add_mutasi_stok('PRD1', -100, 'Penjualan')
+    assert db.update_produk('PRD1', {'stok': 20})
+    assert db.get_stok('PRD1') == 20
+
+    riwayat = db.get_riwayat_stok('PRD1')
+    assert [row['delta'] for row in riwayat] == [8, 5, -3, 10]
+    assert [row['stok_akhir'] for row in riwayat] == [20, 12, 7, 10]
+
+    assert restart().get_stok('PRD1') == 20
+    reopened = restart()
+    assert reopened.compact()
+    # Start berikutnya memakai checkpoint saldo
+    assert restart().get_stok('PRD1') == 20
+
+
+def test_update_produk_parses_stok_like_the_schema(db, capsys):
+    assert db.add_produk(produk('PRD1', stok=10))
+    assert db.update_produk('PRD1', {'stok': '12.0'})
+    assert db.get_stok('PRD1') == 12
+
+    assert not db.update_produk('PRD1', {'stok': '12.5'})
+    assert "Stok tidak valid: '12.5'" in capsys.readouterr().out
+    assert db.get_stok('PRD1') == 12
+
+
+def test_status_history_aggregates(db, restart):
+    now = datetime.now()
+    assert db.add_produk(produk('PRD1'))
+    assert db.add_produk(produk('PRD2'))
+    assert db.add_pesanan(pesanan('PSN1', 'PRD1', tanggal=now - timedelta(hours=2)))
+    assert db.add_pesanan(pesanan('PSN2', 'PRD1', tanggal=now - timedelta(hours=1)))
+    assert db.add_pesanan(pesanan('PSN3', 'PRD2'))
+    assert db.update_pesanan_status('PSN1', 'Selesai')
+    assert db.update_pesanan_status('PSN2', 'Dibatalkan')
+    # Produk pesanan diganti lalu dibatalkan: pembatalan dihitung pada produk baru
+    assert db.add_pesanan(pesanan('PSN4', 'PRD1'))
+    assert db.update_pesanan({'id_pesanan': 'PSN4', 'id_produk': 'PRD2'})
+    assert db.update_pesanan_status('PSN4', 'Dibatalkan')
+
+    def aggregates(manager):
+        return (
+            [(row['jumlah_selesai'], round(row['rata_rata_detik'] / 3600))
+             for row in manager.get_waktu_penyelesaian(now - timedelta(days=1), now + timedelta(days=1))],
+            [(row['id_produk'], row['jumlah_pesanan'], row['jumlah_dibatalkan'])
+             for row in manager.get_tingkat_pembatalan()]
+        )
+
+    expected = ([(1, 2)], [('PRD1', 2, 1), ('PRD2', 2, 1)])
+    assert aggregates(db) == expected
+    assert [row['status'] for row in db.get_riwayat_status('PSN1')] == ['Pending', 'Selesai']
+    assert [row['id_produk'] for row in db.get_riwayat_status('PSN4')] == ['PRD1', 'PRD2', 'PRD2']
+
+    assert aggregates(restart()) == expected
+    reopened = restart()
+    assert reopened.compact()
+    assert aggregates(restart()) == expected
@@ -0,0 +1,251 @@
+import multiprocessing
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from controllers.pesanan_controller import PesananController
+from models.produk import Produk
+from utils.database import CSVHandler, DatabaseManager
+
+from tests.records import pesanan, produk, transaksi
+
+
+def snapshot(db):
+    """Isi logis semua tabel, untuk membandingkan dua kondisi database"""
+    return {
+        'produk': sorted(map(sorted, (row.items() for row in db.get_all_produk()))),
+        'pesanan': sorted(map(sorted, (row.items() for row in db.get_all_pesanan()))),
+        'transaksi': sorted(map(sorted, (row.items() for row in db.get_all_transaksi()))),
+        'stok': {row['id_produk']: db.get_stok(row['id_produk']) for row in db.get_all_produk()},
+    }
+
+
+def test_replay_after_restart(db, restart):
+    assert db.add_produk(produk('PRD1'))
+    assert db.add_produk(produk('PRD2', nama='Sajadah'))
+    assert db.add_pesanan(pesanan('PSN1'))
+    assert db.update_produk('PRD1', {'harga': 2500.0})
+    assert db.update_pesanan_status('PSN1', 'Selesai')
+    assert db.delete_produk('PRD2')
+    assert os.path.exists(db.change_log.file_path)
+
+    reopened = restart()
+    assert [row['id_produk'] for row in reopened.get_all_produk()] == ['PRD1']
+    assert float(reopened.get_produk_by_id('PRD1')['harga']) == 2500.0
+    assert reopened.get_pesanan_by_id('PSN1')['status'] == 'Selesai'
+    assert snapshot(reopened) == snapshot(db)
+
+
+def test_rollback_leaves_tables_unchanged(db, restart):
+    assert db.add_produk(produk('PRD1'))
+    before = snapshot(db)
+
+    with db.transaction() as uow:
+        assert db.add_pesanan(pesanan('PSN1'))
+        assert db.update_produk('PRD1', {'nama_produk': 'Diubah'})
+        uow.rollback()
+
+    assert snapshot(db) == before
+    assert db.get_pesanan_by_id('PSN1') is None
+    assert snapshot(restart()) == before
+
+
+def test_exception_in_transaction_rolls_back(db, restart):
+    assert db.add_produk(produk('PRD1'))
+    before = snapshot(db)
+
+    try:
+        with db.transaction():
+            db.add_pesanan(pesanan('PSN1'))
+            raise RuntimeError('gagal')
+    except RuntimeError:
+        pass
+
+    assert snapshot(db) == before
+    assert snapshot(restart()) == before
+
+
+def test_rollback_restores_indexes_in_memory(db):
+    assert db.add_produk(produk('PRD1', nama='Kurma Ajwa'))
+    assert db.add_produk(produk('PRD2', nama='Sajadah'))
+    assert db.search_produk('kurma') and db.get_pesanan_by_status('Pending') == []
+    before = snapshot(db)
+
+    with db.transaction() as uow:
+        assert db.update_produk('PRD1', {'nama_produk': 'Madu'})
+        assert db.delete_produk('PRD2')
+        assert db.add_pesanan(pesanan('PSN1', 'PRD1'))
+        uow.rollback()
+
+    assert snapshot(db) == before
+    assert [row['id_produk'] for row in db.search_produk('kurma')] == ['PRD1']
+    assert db.search_produk('madu') == []
+    assert db.get_produk_by_id('PRD2')['nama_produk'] == 'Sajadah'
+    assert db.get_pesanan_by_status('Pending') == []
+
+
+def test_rolled_back_order_does_not_reload_tables(db):
+    now = datetime.now()
+    assert db.add_produk(produk('PRD1', stok=2))
+    assert db.add_pesanan(pesanan('PSN1', 'PRD1'))
+    assert db.add_transaksi(transaksi('TRX1', 'PSN1', now))
+    # Tabel, ringkasan penjualan dan agregat status sudah dimuat seperti saat aplikasi berjalan
+    before = snapshot(db)
+    start, end = now - timedelta(days=1), now + timedelta(days=1)
+    aggregates = (db.get_ringkasan_penjualan(start, end), db.get_tingkat_pembatalan())
+    db.search_produk('kurma')
+    misses = CSVHandler.get_cache_stats()['misses']
+
+    # Objek produk di view masih menampilkan stok lama, cek ulang saldo di buku besar gagal
+    stale = Produk(id_produk='PRD1', nama_produk='Kurma Ajwa', kategori='Makanan', harga=1000.0, stok=10)
+    data = {'id_pesanan': 'PSN2', 'id_pelanggan': 'CUST001', 'id_produk': 'PRD1', 'jumlah_dipesan': 5}
+    assert PesananController(db).buat_pesanan(data, stale) is None
+
+    assert snapshot(db) == before
+    assert db.get_pesanan_by_id('PSN2') is None
+    assert [row['id_pesanan'] for row in db.get_pesanan_by_status('Pending')] == ['PSN1']
+    assert db.get_riwayat_status('PSN2') == []
+    assert (db.get_ringkasan_penjualan(start, end), db.get_tingkat_pembatalan()) == aggregates
+    assert [row['id_produk'] for row in db.search_produk('kurma')] == ['PRD1']
+    assert CSVHandler.get_cache_stats()['misses'] == misses
+
+
+def test_compaction_equivalence(db, restart):
+    for i in range(5):
+        assert db.add_produk(produk(f'PRD{i}', stok=i + 1))
+    assert db.add_pesanan(pesanan('PSN1', 'PRD1'))
+    assert db.add_transaksi(transaksi('TRX1', 'PSN1'))
+    assert db.update_produk('PRD3', {'stok': 42})
+    assert db.delete_produk('PRD4')
+    before = snapshot(db)
+
+    assert db.compact()
+    assert not os.path.exists(db.change_log.file_path)
+    assert snapshot(db) == before
+    assert snapshot(restart()) == before
+
+
+def test_duplicate_insert_rejected(db, restart):
+    assert db.add_produk(produk('PRD1'))
+    assert db.add_pesanan(pesanan('PSN1'))
+    assert not db.add_pesanan(pesanan('PSN1', jumlah=5))
+    assert not db.add_pesanan_many([pesanan('PSN2'), pesanan('PSN1')])
+    assert not db.add_pesanan_many([pesanan('PSN3'), pesanan('PSN3')])
+
+    reopened = restart()
+    assert [row['id_pesanan'] for row in reopened.get_all_pesanan()] == ['PSN1']
+    assert int(reopened.get_pesanan_by_id('PSN1')['jumlah_dipesan']) == 1
+
+    # Setelah log dilipat, ID di CSV utama tetap ditolak
+    assert reopened.compact()
+    reopened = restart()
+    assert not reopened.add_pesanan(pesanan('PSN1'))
+    assert not reopened.add_transaksi_many([transaksi('TRX1', 'PSN1'), transaksi('TRX1', 'PSN1')])
+
+
+def test_laporan_penjualan_joins_pesanan_and_produk(db):
+    now = datetime.now()
+    assert db.add_produk(produk('PRD1', nama='Kurma Ajwa'))
+    assert db.add_pesanan(pesanan('PSN1', 'PRD1', jumlah=3))
+    assert db.add_transaksi(transaksi('TRX1', 'PSN1', now))
+    assert db.add_transaksi(transaksi('TRX2', 'PSN1', now - timedelta(days=30)))
+
+    laporan = db.generate_laporan_penjualan(now - timedelta(days=1), now)
+    assert laporan['jumlah_transaksi'] == 1
+    row = laporan['transaksi_list'][0]
+    assert (row['id_transaksi'], row['nama_produk'], str(row['jumlah'])) == ('TRX1', 'Kurma Ajwa', '3')
+
+
+def allocate_ids(base_path, count, results):
+    """Dijalankan di proses terpisah"""
+    db = DatabaseManager(base_path)
+    results.put([db.new_id('TRX') for _ in range(count)])
+
+
+def test_id_allocator_unique_across_processes(data_dir):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    workers = [context.Process(target=allocate_ids, args=(data_dir, 200, results)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    ids = results.get(timeout=60) + results.get(timeout=60)
+    for worker in workers:
+        worker.join()
+
+    assert len(ids) == 400
+    assert len(set(ids)) == 400
+
+
+def test_reports_from_background_thread_during_writes(db):
+    now = datetime.now()
+    assert db.add_produk(produk('PRD1'))
+    assert db.add_pesanan(pesanan('PSN1', 'PRD1'))
+    start, end = now - timedelta(days=1), now + timedelta(days=1)
+    errors, counts = [], []
+    done = threading.Event()
+
+    def read():
+        # Seperti LaporanPenjualan.load_data di thread pool
+        try:
+            while not done.is_set():
+                counts.append(db.generate_laporan_penjualan(start, end)['jumlah_transaksi'])
+                typed = db.get_transaksi_range(start, end, typed=True)
+                assert all(isinstance(row['total_harga'], float) for row in typed)
+                db.get_penjualan_harian(start, end)
+        except Exception as e:
+            errors.append(e)
+
+    # Pergantian thread sesering mungkin agar tumpang tindih benar-benar terjadi
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for i in range(300):
+            assert db.add_transaksi(transaksi(f'TRX{i}', 'PSN1', now))
+    finally:
+        done.set()
+        reader.join()
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert counts == sorted(counts)
+    assert db.generate_laporan_penjualan(start, end)['jumlah_transaksi'] == 300
+
+
+def test_reader_thread_waits_for_open_transaction(db):
+    assert db.add_produk(produk('PRD1'))
+    seen = []
+
+    def read():
+        seen.append(([row['id_pesanan'] for row in db.get_all_pesanan()],
+                     [row['id_pesanan'] for row in db.iter_pesanan(typed=True)],
+                     db.get_stok('PRD1')))
+
+    with db.transaction() as uow:
+        assert db.add_pesanan(pesanan('PSN1'))
+        assert db.add_mutasi_stok('PRD1', -1, 'Pesanan', 'PSN1')
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(timeout=0.2)
+        # Pembaca di thread lain menunggu transaksi selesai, tidak melihat pesanan yang belum di-commit
+        assert reader.is_alive()
+        uow.rollback()
+    reader.join()
+
+    assert seen == [([], [], 10)]
+
+
+def test_csv_handler_reads_do_not_evict_manager_tables(db):
+    assert db.add_produk(produk('PRD1'))
+    path = db.file_paths['produk']
+    db.get_all_produk()
+    CSVHandler.read_csv(path)
+    misses = CSVHandler.get_cache_stats()['misses']
+
+    for _ in range(3):
+        # CSV utama masih kosong, produk baru hanya ada di change log
+        assert [row['id_produk'] for row in db.get_all_produk()] == ['PRD1']
+        assert CSVHandler.read_csv(path) == []
+    assert CSVHandler.get_cache_stats()['misses'] == misses
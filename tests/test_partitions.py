@@ -0,0 +1,73 @@
+import os
+from datetime import datetime, timedelta
+
+from utils.partitions import PartitionedStore, migrate_to_partitions
+
+from tests.records import pesanan, produk, transaksi
+
+
+def fill(db, now, months=6):
+    """Satu pesanan dan transaksinya per bulan, mundur dari now"""
+    assert db.add_produk(produk('PRD1'))
+    for i in range(months):
+        tanggal = now - timedelta(days=31 * i)
+        assert db.add_pesanan(pesanan(f'PSN{i}', jumlah=i + 1, tanggal=tanggal))
+        assert db.add_transaksi(transaksi(f'TRX{i}', f'PSN{i}', tanggal))
+
+
+def test_migration_keeps_rows(db, data_dir, restart):
+    now = datetime.now()
+    fill(db, now)
+    pesanan_before = sorted(row['id_pesanan'] for row in db.get_all_pesanan())
+    transaksi_before = sorted(row['id_transaksi'] for row in db.get_all_transaksi())
+
+    assert migrate_to_partitions(data_dir) == {'pesanan': 6, 'transaksi': 6}
+    assert PartitionedStore.exists(os.path.join(data_dir, 'transaksi'))
+    assert os.path.exists(os.path.join(data_dir, 'transaksi.csv.bak'))
+
+    reopened = restart()
+    assert set(reopened.partitions) == {'pesanan', 'transaksi'}
+    assert sorted(row['id_pesanan'] for row in reopened.get_all_pesanan()) == pesanan_before
+    assert sorted(row['id_transaksi'] for row in reopened.get_all_transaksi()) == transaksi_before
+
+
+def test_range_and_laporan_without_full_load(db, data_dir, restart):
+    now = datetime.now()
+    fill(db, now)
+    migrate_to_partitions(data_dir)
+
+    reopened = restart()
+    start = now - timedelta(days=45)
+    # Transaksi bulan ini memakai pesanan dari bulan yang lebih lama
+    assert reopened.add_transaksi(transaksi('TRXLAMA', 'PSN4', now))
+    reopened = restart()
+
+    laporan = reopened.generate_laporan_penjualan(start, now)
+    rows = {row['id_transaksi']: str(row['jumlah']) for row in laporan['transaksi_list']}
+    assert rows == {'TRX0': '1', 'TRX1': '2', 'TRXLAMA': '5'}
+    # Laporan dan range query tidak memuat tabel gabungan
+    assert reopened.partitions['pesanan'].cached(reopened.change_log) is None
+    assert reopened.partitions['transaksi'].cached(reopened.change_log) is None
+    assert sorted(row['id_transaksi'] for row in reopened.get_transaksi_range(start, now)) == \
+        ['TRX0', 'TRX1', 'TRXLAMA']
+
+
+def test_partition_compaction_rewrites_only_touched(db, data_dir, restart):
+    now = datetime.now()
+    fill(db, now)
+    migrate_to_partitions(data_dir)
+
+    reopened = restart()
+    directory = os.path.join(data_dir, 'pesanan')
+    store = reopened.partitions['pesanan']
+    touched = store.partition_of(reopened.get_pesanan_by_id('PSN3'))
+    stamps = {name: entry['stamp'] for name, entry in store.read_manifest().items()}
+
+    assert reopened.update_pesanan_status('PSN3', 'Selesai')
+    assert reopened.compact()
+    assert not os.path.exists(reopened.change_log.file_path)
+
+    after = {name: entry['stamp'] for name, entry in store.read_manifest().items()}
+    assert [name for name in after if after[name] != stamps[name]] == [touched]
+    assert os.path.exists(os.path.join(directory, f'{touched}.csv'))
+    assert restart().get_pesanan_by_id('PSN3')['status'] == 'Selesai'
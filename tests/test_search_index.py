@@ -0,0 +1,102 @@
+from utils.search_index import SearchIndex
+
+FIELDS = ('nama_produk', 'kategori')
+
+
+def make_index():
+    rows = [
+        {'id_produk': 'P1', 'nama_produk': 'Gamis Hitam', 'kategori': 'Pakaian Muslim Wanita'},
+        {'id_produk': 'P2', 'nama_produk': 'Gamis Putih', 'kategori': 'Pakaian Muslim Wanita'},
+        {'id_produk': 'P3', 'nama_produk': 'Gamelan Mini', 'kategori': 'Aksesoris'},
+        {'id_produk': 'P4', 'nama_produk': 'Baju Koko', 'kategori': 'Pakaian Muslim Pria'},
+        {'id_produk': 'P5', 'nama_produk': 'Mukena Bali', 'kategori': 'Perlengkapan Ibadah'},
+    ]
+    return SearchIndex.build(rows, FIELDS)
+
+
+def ids(rows):
+    return [row['id_produk'] for row in rows]
+
+
+def count_calls(monkeypatch, index, name):
+    """Menghitung pemanggilan satu method indeks"""
+    calls = []
+    original = getattr(index, name)
+
+    def wrapper(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(index, name, wrapper)
+    return calls
+
+
+def test_extended_query_narrows_previous_result(monkeypatch):
+    index = make_index()
+    assert ids(index.search('gam')) == ['P1', 'P2', 'P3']
+
+    lookups = count_calls(monkeypatch, index, '_prefix_positions')
+    # Query hanya diperpanjang: hasil sebelumnya dipersempit, posting list tidak dibaca ulang
+    assert ids(index.search('gami')) == ['P1', 'P2']
+    assert ids(index.search('gamis h')) == ['P1']
+    assert lookups == []
+
+    # Query baru dihitung dari awal
+    assert ids(index.search('koko')) == ['P4']
+    assert lookups == [('koko',)]
+
+
+def test_write_invalidates_previous_result():
+    index = make_index()
+    assert ids(index.search('gami')) == ['P1', 'P2']
+    index.add({'id_produk': 'P6', 'nama_produk': 'Gamis Syari', 'kategori': 'Pakaian Muslim Wanita'})
+    assert ids(index.search('gamis')) == ['P1', 'P2', 'P6']
+
+
+def test_ranked_reuses_narrowed_prefix_matches(monkeypatch):
+    index = make_index()
+    assert ids(index.ranked('gam', limit=2)) == ['P1', 'P2']
+
+    lookups = count_calls(monkeypatch, index, '_prefix_positions')
+    fuzzy = count_calls(monkeypatch, index, '_term_scores')
+    assert ids(index.ranked('gami', limit=2)) == ['P1', 'P2']
+    # Baris berawalan sudah memenuhi limit: posting list dan kandidat salah ketik tidak dihitung
+    assert lookups == []
+    assert fuzzy == []
+
+
+def test_ranked_fills_with_typos_after_prefix_matches():
+    index = make_index()
+    # "mukenah" tidak cocok sebagai awalan, hanya lewat toleransi salah ketik
+    assert ids(index.ranked('mukenah', limit=5)) == ['P5']
+    # Awalan didahulukan, sisa limit diisi kandidat salah ketik tanpa duplikat
+    result = ids(index.ranked('koko', limit=5))
+    assert result[0] == 'P4'
+    assert len(result) == len(set(result))
+    # Bobot menaikkan baris di antara baris berawalan
+    assert ids(index.ranked('gamis', limit=2, boost={'P2': 0.5}, boost_field='id_produk')) == ['P2', 'P1']
+
+
+def test_keystrokes_with_writes_match_cold_search():
+    index = make_index()
+    rows = list(index._rows)
+    writes = {
+        3: lambda: index.add({'id_produk': 'P6', 'nama_produk': 'Gamis Syari', 'kategori': 'Aksesoris'}),
+        5: lambda: update(rows[1], 'Gamis Putih Tulang'),
+        7: lambda: update(rows[0], 'Koko Hitam'),
+    }
+
+    def update(row, nama):
+        row['nama_produk'] = nama
+        index.update(row)
+
+    query = 'gamis pu'
+    for length in range(1, len(query) + 1):
+        if length in writes:
+            # Penulisan di antara dua ketikan menaikkan version, hasil sebelumnya tidak boleh dipersempit
+            writes[length]()
+        cold = SearchIndex.build(index._rows, FIELDS)
+        keystroke = query[:length]
+        assert ids(index.search(keystroke)) == ids(cold.search(keystroke))
+        assert ids(index.ranked(keystroke, limit=3)) == ids(cold.ranked(keystroke, limit=3))
+    assert ids(index.search(query)) == ['P2']
@@ -0,0 +1,59 @@
+import os
+import time
+
+from utils.database import CSVHandler
+from utils.snapshot import atomic_write, load_snapshot, save_snapshot
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'data.snapshot')
+    assert save_snapshot(path, 1, ((1, 2),), {'saldo': {'PRD1': 5}})
+    assert load_snapshot(path, 1, ((1, 2),))['saldo'] == {'PRD1': 5}
+    # Versi atau stempel berbeda berarti snapshot basi
+    assert load_snapshot(path, 2, ((1, 2),)) is None
+    assert load_snapshot(path, 1, ((1, 3),)) is None
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
+
+
+def test_missing_or_corrupt_snapshot(tmp_path):
+    path = str(tmp_path / 'data.snapshot')
+    assert load_snapshot(path, 1, ()) is None
+    with open(path, 'wb') as file:
+        file.write(b'bukan pickle')
+    assert load_snapshot(path, 1, ()) is None
+
+
+def test_csv_snapshot_matches_csv(data_dir):
+    path = os.path.join(data_dir, 'besar.csv')
+    fieldnames = ['id', 'nama']
+    rows = [{'id': str(i), 'nama': f'Produk {i}'} for i in range(5000)]
+    assert CSVHandler.write_csv(path, rows, fieldnames)
+
+    CSVHandler._write_snapshot(path)
+    assert os.path.exists(CSVHandler.snapshot_path(path))
+    assert CSVHandler._read_snapshot(path, CSVHandler.cache.file_stamp(path)) == rows
+
+    # CSV berubah: snapshot lama tidak dipakai
+    time.sleep(0.01)
+    assert CSVHandler.write_csv(path, rows[:10], fieldnames)
+    assert CSVHandler._read_snapshot(path, CSVHandler.cache.file_stamp(path)) is None
+    CSVHandler.cache.invalidate()
+    assert CSVHandler.read_csv(path) == rows[:10]
+
+
+def test_atomic_write_permissions_and_failure(tmp_path):
+    path = str(tmp_path / 'metrics.prom')
+    with atomic_write(path, mode='w', encoding='utf-8', chmod=0o644) as file:
+        file.write('halalhub_up 1\n')
+    assert open(path, encoding='utf-8').read() == 'halalhub_up 1\n'
+    assert os.stat(path).st_mode & 0o777 == 0o644
+
+    # Exception di dalam blok: file lama utuh dan file sementara dihapus
+    try:
+        with atomic_write(path, mode='w', encoding='utf-8') as file:
+            file.write('setengah')
+            raise RuntimeError('gagal')
+    except RuntimeError:
+        pass
+    assert open(path, encoding='utf-8').read() == 'halalhub_up 1\n'
+    assert os.listdir(tmp_path) == ['metrics.prom']
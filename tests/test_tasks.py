@@ -0,0 +1,49 @@
+import time
+
+from utils.tasks import TaskExecutor
+
+
+class FakeWidget:
+    """Widget tanpa display: callback after dijalankan manual lewat run_pending"""
+
+    def __init__(self):
+        self.alive = True
+        self.callbacks = []
+
+    def winfo_exists(self):
+        return self.alive
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def run_pending(self, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while self.callbacks and time.monotonic() < deadline:
+            self.callbacks.pop(0)()
+            time.sleep(0.001)
+
+
+def test_result_delivered_on_widget():
+    executor = TaskExecutor(workers=1)
+    widget, results = FakeWidget(), []
+    task = executor.submit(widget, sum, [1, 2, 3], on_done=results.append)
+    widget.run_pending()
+    executor.shutdown()
+    assert results == [6]
+    assert not task.pending
+
+
+def test_error_and_destroyed_widget():
+    executor = TaskExecutor(workers=1)
+    widget, errors, results = FakeWidget(), [], []
+    executor.submit(widget, int, 'bukan angka', on_done=results.append, on_error=errors.append)
+    widget.run_pending()
+    assert isinstance(errors[0], ValueError)
+
+    # Halaman ditutup sebelum hasil datang: hasil dibuang
+    widget = FakeWidget()
+    task = executor.submit(widget, sum, [1], on_done=results.append)
+    widget.alive = False
+    widget.run_pending()
+    executor.shutdown()
+    assert results == [] and task.cancelled
@@ -0,0 +1,89 @@
+import pytest
+
+# Package views mengimpor seluruh GUI, termasuk ttkthemes
+pytest.importorskip('ttkthemes')
+
+from views.gui.components.virtual_table import VirtualTable  # noqa: E402
+
+
+class FakeTree:
+    """Pengganti ttk.Treeview tanpa display, mencatat pemanggilan selection_set"""
+
+    def __init__(self):
+        self.items = {}
+        self.selected = ()
+        self.focused = ''
+        self.selection_calls = 0
+
+    def item(self, iid, **options):
+        self.items[iid] = options
+
+    def insert(self, parent, index, iid, **options):
+        self.items[iid] = options
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.items.pop(iid, None)
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, items):
+        self.selection_calls += 1
+        self.selected = (items,) if isinstance(items, str) else tuple(items)
+
+    def focus(self, item=None):
+        if item is None:
+            return self.focused
+        self.focused = item
+
+
+def make_table(rows, visible=10, overscan=5):
+    table = VirtualTable.__new__(VirtualTable)
+    table.tree = FakeTree()
+    table.source = rows
+    table.formatter = lambda row: ((row,), ())
+    table.overscan = overscan
+    table.visible = visible
+    table.start = table.count = table.top = 0
+    table._selected = None
+    return table
+
+
+def test_refill_keeps_selection_without_reselecting():
+    table = make_table(list(range(1000)))
+    table._fill(0)
+    table.tree.selection_set('3')
+    table._on_select()
+    calls = table.tree.selection_calls
+
+    # Jendela item bergeser, baris terpilih tetap di dalamnya: item pilihannya pindah
+    table._fill(2)
+    assert table.tree.selection() == ('1',)
+    assert table.tree.selection_calls == calls + 1
+    assert table.selection() == [3]
+
+    # Jendela tidak bergeser relatif ke baris terpilih: selection tidak disentuh
+    table._fill(2)
+    assert table.tree.selection_calls == calls + 1
+
+
+def test_scrolling_without_selection_does_not_touch_selection():
+    table = make_table(list(range(1000)))
+    table._fill(0)
+    for start in range(0, 500, 7):
+        table._fill(start)
+    assert table.tree.selection_calls == 0
+
+
+def test_selected_row_outside_window_is_remembered():
+    table = make_table(list(range(1000)))
+    table._fill(0)
+    table.tree.selection_set('3')
+    table._on_select()
+
+    table._fill(500)
+    assert table.tree.selection() == ()
+    assert table.selection() == [3]
+    table._fill(0)
+    assert table.tree.selection() == ('3',)